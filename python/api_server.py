@@ -0,0 +1,500 @@
+# -*- coding: utf-8 -*-
+"""
+Servidor HTTP de la API JSON de la Pokédex.
+
+Expone las operaciones del `PokemonController` a otros servicios sin pasar
+por la interfaz de Streamlit:
+
+    GET    /pokemons              Página del listado (filtros del Listado y
+                                  paginación por cursor con `after`/`before`)
+    GET    /pokemons/stream       Todo el resultado de un filtro, en JSON Lines
+    GET    /pokemons/search?q=    Búsqueda por nombre
+    GET    /pokemons/changes      Cambios y borrados posteriores a una marca
+                                  (`since`), para mantener copias al día
+    GET    /pokemons/{id}         Un Pokémon, con ETag
+    POST   /pokemons              Crear
+    PATCH  /pokemons/{id}         Actualizar (If-Match opcional)
+    DELETE /pokemons/{id}         Borrar
+
+Todas las peticiones comparten un único `MongoClient` (el de `db.get_db`, con
+su pool de conexiones) y un único controlador con su caché de consultas. Las
+llamadas al controlador, que son bloqueantes, se ejecutan en un pool de
+hilos para no detener el bucle de Tornado. Las respuestas se comprimen con
+gzip si el cliente lo acepta.
+
+El ETag de un Pokémon se calcula a partir de su versión y su `updated_at`,
+sin serializar el documento: con `If-None-Match` la respuesta es un 304 sin
+cuerpo, y con `If-Match` las actualizaciones se rechazan (412) si el
+Pokémon cambió desde que el cliente lo leyó.
+
+Uso (desde el directorio python/):
+    python api_server.py --port 8000
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from bson import ObjectId
+from pydantic import ValidationError
+from pymongo.errors import PyMongoError
+from tornado import web
+from tornado.iostream import StreamClosedError
+from tornado.ioloop import IOLoop
+
+from attacks import AttackCatalog
+from cache import QUERY_CACHE_SIZE, QUERY_CACHE_TTL, QueryCache
+from changes import CHANGES_PAGE_SIZE, StaleWatermarkError
+from controller import (
+    PAGE_SORT_KEYS,
+    STRICT_READS,
+    InvalidPageError,
+    PokemonController,
+    VersionConflictError,
+    listing_filter,
+)
+from db import MONGO_MAX_POOL_SIZE, get_db
+from indexes import ensure_indexes
+from models import Pokemon
+from stats import StatsService
+
+logger = logging.getLogger(__name__)
+
+API_PORT = int(os.getenv("API_PORT", "8000"))
+
+# Hilos que ejecutan las llamadas al controlador; más allá del tamaño del
+# pool de conexiones solo esperarían a que se libere una conexión
+API_WORKERS = int(os.getenv("API_WORKERS", str(min(32, MONGO_MAX_POOL_SIZE))))
+
+# Tamaño máximo de página de `GET /pokemons`
+API_MAX_PAGE_SIZE = 500
+
+# Documentos leídos (y enviados al cliente) en cada tramo de `/pokemons/stream`
+STREAM_BATCH_SIZE = 1000
+
+# Campos que se pueden escribir desde la API
+EDITABLE_FIELDS = frozenset(Pokemon.model_fields) - {"id", "created_at", "updated_at", "version"}
+
+
+def _json_default(value: Any) -> Any:
+    """
+    Serializa los tipos de MongoDB que `json` no conoce.
+    """
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} no es serializable")
+
+
+def to_document(item: Any) -> Dict[str, Any]:
+    """
+    Convierte un Pokémon leído por el controlador (registro ligero o modelo
+    Pydantic) en un documento con los nombres de campo de MongoDB.
+    """
+    if hasattr(item, "to_dict"):
+        return item.to_dict()
+    return item.model_dump(by_alias=True)
+
+
+def dumps(data: Any) -> str:
+    """
+    Serializa una respuesta como JSON.
+    """
+    return json.dumps(data, default=_json_default, ensure_ascii=False)
+
+
+def pokemon_etag(pokemon: Any) -> str:
+    """
+    ETag de un Pokémon a partir de su id, versión y `updated_at`.
+
+    Es un ETag fuerte, porque `If-Match` solo admite la comparación fuerte:
+    la versión cambia con cada escritura y el JSON de una versión es siempre
+    el mismo.
+    """
+    stamp = ""
+    if pokemon.updated_at:
+        # MongoDB guarda las fechas con precisión de milisegundos: se trunca
+        # igual para que coincidan el ETag de una escritura y el de una lectura
+        at = pokemon.updated_at
+        stamp = f"{at:%Y%m%d%H%M%S}{at.microsecond // 1000:03d}"
+    return f'"{pokemon.id}-{pokemon.version}-{stamp}"'
+
+
+def if_match(header: str, etag: str) -> bool:
+    """
+    Comprueba una cabecera `If-Match` con la comparación fuerte de la RFC
+    7232: `*` o alguno de los ETags de la lista, sin el prefijo débil `W/`.
+    """
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+def validation_message(error: ValidationError) -> str:
+    """
+    Resume los errores de validación de Pydantic en una línea.
+    """
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors()
+    )
+
+
+class _GZipContentEncoding(web.GZipContentEncoding):
+    """
+    Compresión gzip de Tornado, ampliada a las respuestas en JSON Lines.
+    """
+
+    CONTENT_TYPES = web.GZipContentEncoding.CONTENT_TYPES | {"application/x-ndjson"}
+
+
+# -------------------
+# MANEJADORES
+# -------------------
+class BaseHandler(web.RequestHandler):
+    """
+    Parte común de los manejadores: acceso al controlador desde el pool de
+    hilos, lectura del cuerpo JSON y errores en JSON.
+    """
+
+    def initialize(self, controller: PokemonController, executor: ThreadPoolExecutor):
+        self.controller = controller
+        self.executor = executor
+
+    def compute_etag(self) -> Optional[str]:
+        # Los ETags se calculan a partir de `updated_at` (ver `pokemon_etag`),
+        # no con un hash de cada cuerpo
+        return None
+
+    async def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Ejecuta una llamada bloqueante del controlador en el pool de hilos.
+        """
+        try:
+            return await IOLoop.current().run_in_executor(
+                self.executor, functools.partial(fn, *args, **kwargs)
+            )
+        except StaleWatermarkError as e:
+            # Las lápidas de esa época ya no existen: la copia debe releerlo todo
+            raise web.HTTPError(410, str(e))
+        except InvalidPageError as e:
+            # Ordenaciones o tokens de página inválidos; cualquier otro error
+            # es del servidor y sale como un 500
+            raise web.HTTPError(400, str(e))
+
+    def send_json(self, data: Any, status: int = 200) -> None:
+        self.set_status(status)
+        self.set_header("Content-Type", "application/json; charset=utf-8")
+        self.finish(dumps(data))
+
+    def json_body(self) -> Dict[str, Any]:
+        """
+        El cuerpo de la petición como objeto JSON.
+
+        Raises:
+            HTTPError: 400 si no es un objeto JSON o incluye campos que no se
+                pueden escribir.
+        """
+        try:
+            body = json.loads(self.request.body or b"{}")
+        except ValueError:
+            raise web.HTTPError(400, "El cuerpo no es JSON válido")
+        if not isinstance(body, dict):
+            raise web.HTTPError(400, "El cuerpo debe ser un objeto JSON")
+        unknown = set(body) - EDITABLE_FIELDS
+        if unknown:
+            raise web.HTTPError(400, f"Campos no admitidos: {', '.join(sorted(unknown))}")
+        return body
+
+    def write_error(self, status_code: int, **kwargs: Any) -> None:
+        # El mensaje de un `HTTPError` propio va en el cuerpo; el de otras
+        # excepciones no se expone
+        error = kwargs.get("exc_info", (None, None))[1]
+        message = isinstance(error, web.HTTPError) and error.get_message() or self._reason
+        self.set_header("Content-Type", "application/json; charset=utf-8")
+        self.finish(dumps({"error": message}))
+
+    def listing_args(self) -> Dict[str, Any]:
+        """
+        Filtro y ordenación de las consultas del listado, con los mismos
+        filtros que la página de Listado.
+        """
+        try:
+            min_pokedex = int(self.get_argument("min_pokedex", "0"))
+        except ValueError:
+            raise web.HTTPError(400, "min_pokedex debe ser un número")
+        sort_by = self.get_argument("sort", PAGE_SORT_KEYS[0])
+        if sort_by not in PAGE_SORT_KEYS:
+            raise web.HTTPError(400, f"Ordenación no admitida: {sort_by}")
+        return {
+            "filter": listing_filter(
+                nombre=self.get_argument("nombre", ""),
+                region=self.get_argument("region", ""),
+                min_pokedex=min_pokedex,
+                ataque=self.get_argument("ataque", ""),
+                tipo_ataque=self.get_argument("tipo_ataque", ""),
+            ),
+            "sort_by": sort_by,
+            # Sin ataques ni marcas de tiempo salvo con `full=1`
+            "summary": self.get_argument("full", "0") != "1",
+        }
+
+
+class PokemonListHandler(BaseHandler):
+    """
+    `GET /pokemons`: una página del listado. `POST /pokemons`: crear.
+    """
+
+    async def get(self):
+        try:
+            page_size = int(self.get_argument("page_size", "50"))
+        except ValueError:
+            raise web.HTTPError(400, "page_size debe ser un número")
+        page = await self.call(
+            self.controller.find_page,
+            page_size=max(1, min(page_size, API_MAX_PAGE_SIZE)),
+            after=self.get_argument("after", None),
+            before=self.get_argument("before", None),
+            **self.listing_args(),
+        )
+        self.send_json(
+            {
+                "items": [to_document(p) for p in page.items],
+                "prev": page.prev_token,
+                "next": page.next_token,
+            }
+        )
+
+    async def post(self):
+        try:
+            pokemon = Pokemon.model_validate(self.json_body())
+        except ValidationError as e:
+            raise web.HTTPError(400, validation_message(e))
+        created = await self.call(
+            self.controller.insert, pokemon.model_dump(include=EDITABLE_FIELDS)
+        )
+        self.set_header("Location", f"{self.request.path}/{created.id}")
+        self.set_header("ETag", pokemon_etag(created))
+        self.send_json(to_document(created), status=201)
+
+
+class PokemonStreamHandler(BaseHandler):
+    """
+    `GET /pokemons/stream`: todos los Pokémon de un filtro en JSON Lines.
+
+    Se leen por tramos con la paginación por cursor, sin pasar por la caché
+    de consultas, y cada tramo se envía en cuanto se lee, de modo que la
+    memoria no depende del tamaño del resultado.
+    """
+
+    async def get(self):
+        args = self.listing_args()
+        self.set_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        token = None
+        while True:
+            page = await self.call(
+                self.controller.find_page,
+                page_size=STREAM_BATCH_SIZE,
+                after=token,
+                cached=False,
+                **args,
+            )
+            if page.items:
+                self.write("".join(dumps(to_document(p)) + "\n" for p in page.items))
+                try:
+                    await self.flush()
+                except StreamClosedError:
+                    # El cliente cerró la conexión: no se leen más tramos
+                    return
+            token = page.next_token
+            if not token:
+                break
+        self.finish()
+
+
+class PokemonSearchHandler(BaseHandler):
+    """
+    `GET /pokemons/search?q=texto[&exact=1]`: búsqueda por nombre.
+    """
+
+    async def get(self):
+        name = self.get_argument("q", "")
+        if not name.strip():
+            raise web.HTTPError(400, "Falta el parámetro q")
+        results = await self.call(
+            self.controller.find_by_name,
+            name,
+            exact=self.get_argument("exact", "0") == "1",
+            summary=self.get_argument("full", "0") != "1",
+        )
+        self.send_json({"items": [to_document(p) for p in results]})
+
+
+class PokemonChangesHandler(BaseHandler):
+    """
+    `GET /pokemons/changes?since=token[&limit=n]`: Pokémon creados o
+    modificados y lápidas de los borrados posteriores a la marca `since`
+    (sin ella, toda la colección). `next` es la marca de la siguiente
+    petición; con `has_more`, hay más cambios ya disponibles.
+    """
+
+    async def get(self):
+        try:
+            limit = int(self.get_argument("limit", str(CHANGES_PAGE_SIZE)))
+        except ValueError:
+            raise web.HTTPError(400, "limit debe ser un número")
+        page = await self.call(
+            self.controller.changes_since,
+            self.get_argument("since", None),
+            limit=max(1, min(limit, CHANGES_PAGE_SIZE)),
+        )
+        self.send_json(
+            {
+                "items": [to_document(p) for p in page.items],
+                "deleted": page.deleted,
+                "next": page.next_token,
+                "has_more": page.has_more,
+            }
+        )
+
+
+class PokemonHandler(BaseHandler):
+    """
+    `GET`, `PATCH` y `DELETE` de `/pokemons/{id}`.
+    """
+
+    async def load(self, id_str: str) -> Any:
+        """
+        El Pokémon completo, o un 404.
+        """
+        pokemon = await self.call(self.controller.find_by_id, id_str)
+        if pokemon is None:
+            raise web.HTTPError(404, f"No existe el Pokémon {id_str}")
+        return pokemon
+
+    async def get(self, id_str: str):
+        pokemon = await self.load(id_str)
+        self.set_header("ETag", pokemon_etag(pokemon))
+        if self.check_etag_header():
+            # El cliente ya tiene esta versión: ni se serializa ni se envía
+            self.set_status(304)
+            self.finish()
+            return
+        self.send_json(to_document(pokemon))
+
+    async def patch(self, id_str: str):
+        body = self.json_body()
+        original = await self.load(id_str)
+        condition = self.request.headers.get("If-Match")
+        if condition and not if_match(condition, pokemon_etag(original)):
+            raise web.HTTPError(412, "El Pokémon ha cambiado desde que se leyó")
+        try:
+            merged = Pokemon.model_validate({**to_document(original), **body})
+        except ValidationError as e:
+            raise web.HTTPError(400, validation_message(e))
+
+        fields = merged.model_dump(include=set(body))
+        try:
+            # Con `original`, solo se escriben los campos que cambian y la
+            # escritura se rechaza si otro proceso lo modificó entretanto
+            updated = await self.call(self.controller.update, id_str, fields, original=original)
+        except VersionConflictError:
+            status = 412 if condition else 409
+            raise web.HTTPError(status, "El Pokémon ha cambiado desde que se leyó")
+        if updated is None:
+            raise web.HTTPError(404, f"No existe el Pokémon {id_str}")
+        self.set_header("ETag", pokemon_etag(updated))
+        self.send_json(to_document(updated))
+
+    async def delete(self, id_str: str):
+        if not await self.call(self.controller.delete, id_str):
+            raise web.HTTPError(404, f"No existe el Pokémon {id_str}")
+        self.set_status(204)
+        self.finish()
+
+
+# -------------------
+# APLICACIÓN
+# -------------------
+def make_controller() -> PokemonController:
+    """
+    Construye el controlador del servidor: la colección 'pokemons' del
+    cliente compartido, una caché de consultas propia y los hooks que
+    mantienen al día las estadísticas y el catálogo de ataques.
+
+    Los servicios en memoria de la aplicación de Streamlit (enfrentamientos,
+    búsqueda aproximada) viven en su proceso y no se construyen aquí.
+
+    Returns:
+        PokemonController: El controlador.
+    """
+    db = get_db()
+    try:
+        ensure_indexes(db)
+    except PyMongoError:
+        logger.exception("No se pudieron aplicar los índices")
+    cache = QueryCache(QUERY_CACHE_SIZE, QUERY_CACHE_TTL) if QUERY_CACHE_SIZE > 0 else None
+    return PokemonController(
+        db["pokemons"],
+        cache=cache,
+        hooks=[StatsService(db), AttackCatalog(db)],
+        strict_reads=STRICT_READS,
+    )
+
+
+def make_app(
+    controller: PokemonController, executor: Optional[ThreadPoolExecutor] = None
+) -> web.Application:
+    """
+    Crea la aplicación de Tornado con las rutas de la API.
+
+    Args:
+        controller (PokemonController): El controlador compartido.
+        executor (Optional[ThreadPoolExecutor], optional): Pool de hilos para
+            las llamadas al controlador. Defaults to None (uno de
+            `API_WORKERS` hilos).
+
+    Returns:
+        web.Application: La aplicación, sin escuchar todavía.
+    """
+    executor = executor or ThreadPoolExecutor(API_WORKERS, thread_name_prefix="api")
+    deps = {"controller": controller, "executor": executor}
+    return web.Application(
+        [
+            (r"/pokemons", PokemonListHandler, deps),
+            (r"/pokemons/stream", PokemonStreamHandler, deps),
+            (r"/pokemons/search", PokemonSearchHandler, deps),
+            (r"/pokemons/changes", PokemonChangesHandler, deps),
+            (r"/pokemons/([^/]+)", PokemonHandler, deps),
+        ],
+        transforms=[_GZipContentEncoding],
+    )
+
+
+async def serve(port: int, address: str = "") -> None:
+    """
+    Escucha en `port` hasta que se detenga el proceso.
+    """
+    app = make_app(make_controller())
+    app.listen(port, address=address, xheaders=True)
+    logger.info("API escuchando en el puerto %d", port)
+    await asyncio.Event().wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="API JSON de la Pokédex.")
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--address", default="", help="Dirección en la que escuchar")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(serve(args.port, args.address))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,10 @@ mostrando un mensaje de bienvenida y una guía de uso.
 
 import streamlit as st
 
+# Solo Streamlit y la biblioteca estándar: la portada se muestra sin importar
+# pymongo, pydantic ni pyarrow y sin esperar a la base de datos
+from startup import start_prewarm
+
 # Configuración de la página de Streamlit
 st.set_page_config(
     page_title="Pokedex Profesional - Inicio",
@@ -15,6 +19,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Conecta con MongoDB y llena las cachés de las demás páginas en segundo plano
+start_prewarm()
+
 # Título de la página principal
 st.title("¡Bienvenido al Pokedex Profesional!")
 
@@ -0,0 +1,705 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo del controlador asíncrono de Pokémon.
+
+Define `AsyncPokemonController`, con los mismos métodos que
+`PokemonController` pero como corrutinas sobre el `AsyncMongoClient` de
+PyMongo, y `AsyncRunner`, un bucle de eventos en un hilo propio que permite
+a las páginas de Streamlit (que son síncronas) lanzar varias consultas a la
+vez y esperar a todas con `gather`:
+
+    page, total = runner.gather(
+        controller.find_page_table(filtro), controller.count(filtro)
+    )
+
+El tiempo de la página pasa a ser el de la consulta más lenta en lugar de
+la suma de todas. La caché de consultas, los hooks de escritura y la
+decodificación de documentos son los mismos que los del controlador síncrono.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from changes import CHANGES_PAGE_SIZE, tombstone_op
+from controller import (
+    ATTACK_SORT,
+    BULK_BATCH_SIZE,
+    CHANGES_SORT,
+    NAME_SEARCH_LIMIT,
+    TOMBSTONES_SORT,
+    UPSERT_KEYS,
+    VersionConflictError,
+    WriteBatch,
+    _BaseController,
+    _apply_update,
+    _backfill_op,
+    _changes_queries,
+    _chunks,
+    _count_by_pipeline,
+    _delete_batches,
+    _delete_ids,
+    _insert_ops,
+    _page_query,
+    _page_result,
+    _read_shape,
+    _stored_hashes_query,
+    _sync_pending,
+    _text_query,
+    _upsert_ops,
+    attack_filter,
+)
+from models import BulkResult, ChangesPage, Page, Pokemon, PyObjectId, SyncResult, TablePage
+from monitoring import get_context, set_context
+from normalize import NORMALIZED_FIELD, name_prefix_filter, normalize_name
+from sync import CONTENT_HASH_FIELD
+from tables import ATTACKS_TEXT, table_projection, to_arrow
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------
+# BUCLE DE EVENTOS
+# -------------------
+async def _tagged(awaitable: Awaitable[Any], page: str, rerun: Optional[str]) -> Any:
+    """
+    Ejecuta `awaitable` etiquetando sus comandos con la página que lo lanzó.
+    """
+    set_context(page, rerun)
+    return await awaitable
+
+
+async def _gather(*awaitables: Optional[Awaitable[Any]]) -> List[Any]:
+    """
+    Espera a varios awaitables lanzados a la vez y devuelve sus resultados.
+    Los None se conservan en su posición sin esperar nada.
+    """
+    results = iter(await asyncio.gather(*(a for a in awaitables if a is not None)))
+    return [None if a is None else next(results) for a in awaitables]
+
+
+async def _call(fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Llama a una función síncrona desde el bucle de eventos.
+    """
+    return fn(*args)
+
+
+async def _batches_of(batches: Iterable[WriteBatch]) -> AsyncIterator[WriteBatch]:
+    """
+    Recorre lotes ya construidos como un iterador asíncrono (ver
+    `AsyncPokemonController._write_batches`).
+    """
+    for batch in batches:
+        yield batch
+
+
+class AsyncRunner:
+    """
+    Bucle de eventos de asyncio en un hilo en segundo plano.
+
+    El `AsyncMongoClient` queda ligado al bucle en el que se usa por primera
+    vez, así que el cliente se crea con `call` y todas sus consultas se
+    ejecutan con `run` o `gather` en este mismo bucle, desde cualquier hilo.
+    """
+
+    def __init__(self):
+        """
+        Inicializa el bucle, sin arrancarlo.
+        """
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="pokedex-async", daemon=True
+        )
+
+    def start(self) -> "AsyncRunner":
+        """
+        Arranca el hilo del bucle de eventos.
+
+        Returns:
+            AsyncRunner: El mismo objeto, para encadenar llamadas.
+        """
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Detiene el bucle de eventos y espera a que termine su hilo.
+        """
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def run(self, awaitable: Awaitable[Any]) -> Any:
+        """
+        Ejecuta una corrutina en el bucle y espera su resultado.
+
+        Los comandos que lance se etiquetan con la página y la ejecución del
+        hilo que llama (ver `monitoring.set_context`).
+
+        Raises:
+            Exception: La excepción de la corrutina, si falla.
+        """
+        page, rerun = get_context()
+        future = asyncio.run_coroutine_threadsafe(
+            _tagged(awaitable, page, rerun), self._loop
+        )
+        return future.result()
+
+    def gather(self, *awaitables: Optional[Awaitable[Any]]) -> List[Any]:
+        """
+        Ejecuta varias corrutinas a la vez y devuelve sus resultados en el
+        mismo orden. Si alguna falla, se propaga su excepción.
+
+        Se puede pasar None en lugar de una consulta que no haga falta en
+        esta ejecución; su resultado es None.
+
+        Returns:
+            List[Any]: El resultado de cada corrutina.
+        """
+        return self.run(_gather(*awaitables))
+
+    def call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Llama a `fn(*args)` dentro del bucle (p. ej. para crear el cliente).
+        """
+        return self.run(_call(fn, *args))
+
+
+class AsyncPokemonController(_BaseController):
+    """
+    Versión asíncrona de `PokemonController` para una `AsyncCollection`.
+
+    Cada método es una corrutina con los mismos argumentos y resultados que
+    su equivalente síncrono. Los hooks de escritura son síncronos, así que
+    se ejecutan en un hilo aparte para no bloquear el bucle de eventos.
+    """
+
+    async def _cached(
+        self, key_parts: Tuple[Any, ...], loader, oid: Optional[ObjectId] = None
+    ):
+        """
+        Sirve una lectura desde la caché o la ejecuta con el `loader` asíncrono.
+
+        Los valores devueltos se comparten entre sesiones: no deben modificarse.
+        """
+        if self.cache is None:
+            return await loader()
+        key, tags = self._cache_entry(key_parts, oid)
+        return await self.cache.get_or_load_async(key, loader, tags)
+
+    async def _notify_async(
+        self, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]
+    ) -> None:
+        """
+        Avisa a los hooks de una escritura individual desde otro hilo.
+        """
+        if self.hooks:
+            await asyncio.to_thread(self._notify, before, after)
+
+    async def _notify_bulk_async(self) -> None:
+        """
+        Avisa a los hooks de una escritura masiva desde otro hilo.
+        """
+        if self.hooks:
+            await asyncio.to_thread(self._notify_bulk)
+
+    # -------------------
+    # CREATE
+    # -------------------
+    async def insert(self, payload: Dict[str, Any]) -> Pokemon:
+        """
+        Inserta un nuevo Pokémon en la base de datos (ver `PokemonController.insert`).
+        """
+        now = self._now()
+        payload.update({"created_at": now, "updated_at": now, "version": 0})
+        self._with_search_keys(payload)
+
+        res = await self.col.insert_one(payload)
+        self._invalidate()
+        doc = await self.col.find_one({"_id": res.inserted_id})
+        await self._notify_async(None, doc)
+        return Pokemon.model_validate(doc)
+
+    # -------------------
+    # READ
+    # -------------------
+    async def find_by_id(self, id_str: str) -> Optional[Pokemon]:
+        """
+        Busca un Pokémon por su ObjectId (ver `PokemonController.find_by_id`).
+        """
+        try:
+            oid = PyObjectId.validate(id_str)
+        except Exception:
+            return None
+
+        async def load() -> Optional[Pokemon]:
+            doc = await self.col.find_one({"_id": oid})
+            return self.decode(Pokemon, doc) if doc else None
+
+        return await self._cached(("find_by_id", oid), load, oid=oid)
+
+    async def find(
+        self,
+        filter: Optional[Dict[str, Any]] = None,
+        limit: int = 50,
+        skip: int = 0,
+        summary: bool = False,
+    ) -> List[Pokemon]:
+        """
+        Busca Pokémon con un filtro opcional y paginación (ver
+        `PokemonController.find`).
+        """
+        f = filter or {}
+        projection, model = _read_shape(summary)
+
+        async def load() -> List[Pokemon]:
+            cursor = self.col.find(f, projection).skip(skip).limit(limit)
+            return [self.decode(model, d) for d in await cursor.to_list(None)]
+
+        return await self._cached(("find", f, limit, skip, summary), load)
+
+    async def find_page(
+        self,
+        filter: Optional[Dict[str, Any]] = None,
+        sort_by: str = "pokedex_nacional",
+        page_size: int = 50,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        summary: bool = False,
+        cached: bool = True,
+    ) -> Page:
+        """
+        Busca una página de Pokémon con paginación por cursor (ver
+        `PokemonController.find_page`).
+
+        Raises:
+            InvalidPageError: Si `sort_by` no está admitido o un token es inválido.
+        """
+        projection, model = _read_shape(summary)
+
+        async def load() -> Page:
+            docs, prev_token, next_token = await self._fetch_page(
+                filter, sort_by, page_size, after, before, projection
+            )
+            return Page(
+                items=[self.decode(model, d) for d in docs],
+                prev_token=prev_token,
+                next_token=next_token,
+            )
+
+        self._check_sort(sort_by)
+        if not cached:
+            return await load()
+        return await self._cached(
+            ("find_page", filter or {}, sort_by, page_size, after, before, summary),
+            load,
+        )
+
+    async def find_page_table(
+        self,
+        filter: Optional[Dict[str, Any]] = None,
+        sort_by: str = "pokedex_nacional",
+        page_size: int = 50,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        attacks: Optional[str] = ATTACKS_TEXT,
+    ) -> TablePage:
+        """
+        Igual que `find_page`, pero como tabla de Arrow (ver
+        `PokemonController.find_page_table`).
+
+        Raises:
+            InvalidPageError: Si `sort_by` no está admitido o un token es inválido.
+        """
+        projection = table_projection(attacks)
+
+        async def load() -> TablePage:
+            docs, prev_token, next_token = await self._fetch_page(
+                filter, sort_by, page_size, after, before, projection
+            )
+            return TablePage(
+                table=to_arrow(docs, attacks=attacks),
+                prev_token=prev_token,
+                next_token=next_token,
+            )
+
+        self._check_sort(sort_by)
+        return await self._cached(
+            ("find_page_table", filter or {}, sort_by, page_size, after, before, attacks),
+            load,
+        )
+
+    async def _fetch_page(
+        self,
+        filter: Optional[Dict[str, Any]],
+        sort_by: str,
+        page_size: int,
+        after: Optional[str],
+        before: Optional[str],
+        projection: Optional[Dict[str, int]],
+    ) -> Tuple[List[Dict[str, Any]], Optional[str], Optional[str]]:
+        """
+        Lee los documentos de una página por cursor (keyset).
+        """
+        query, sort, forward, token = _page_query(filter, sort_by, after, before)
+        cursor = self.col.find(query, projection).sort(sort).limit(page_size + 1)
+        docs = await cursor.to_list(page_size + 1)
+        return _page_result(docs, sort_by, page_size, forward, token)
+
+    async def find_by_name(
+        self, name: str, exact: bool = False, summary: bool = False
+    ) -> List[Pokemon]:
+        """
+        Busca Pokémon por nombre, por prefijo y por palabras (ver
+        `PokemonController.find_by_name`).
+        """
+        if exact:
+            return await self.find({"nombre": name}, limit=NAME_SEARCH_LIMIT, summary=summary)
+
+        prefix_filter = name_prefix_filter(name)
+        if not prefix_filter:
+            return await self.find({}, limit=NAME_SEARCH_LIMIT, summary=summary)
+        projection, model = _read_shape(summary)
+
+        async def load() -> List[Pokemon]:
+            cursor = (
+                self.col.find(prefix_filter, projection)
+                .sort(NORMALIZED_FIELD, 1)
+                .limit(NAME_SEARCH_LIMIT)
+            )
+            docs = await cursor.to_list(NAME_SEARCH_LIMIT)
+            if len(docs) < NAME_SEARCH_LIMIT:
+                text_query = _text_query(name, [d["_id"] for d in docs])
+                remaining = NAME_SEARCH_LIMIT - len(docs)
+                cursor = self.col.find(text_query, projection).limit(remaining)
+                docs.extend(await cursor.to_list(remaining))
+            return [self.decode(model, d) for d in docs]
+
+        return await self._cached(("find_by_name", normalize_name(name), summary), load)
+
+    async def find_by_attack(
+        self,
+        nombre: str = "",
+        tipo: str = "",
+        limit: int = NAME_SEARCH_LIMIT,
+        summary: bool = False,
+    ) -> List[Pokemon]:
+        """
+        Busca los Pokémon que conocen un ataque (ver
+        `PokemonController.find_by_attack`).
+        """
+        f = attack_filter(nombre, tipo)
+        if not f:
+            return []
+        projection, model = _read_shape(summary)
+
+        async def load() -> List[Pokemon]:
+            cursor = self.col.find(f, projection).sort(ATTACK_SORT).limit(limit)
+            return [self.decode(model, d) for d in await cursor.to_list(None)]
+
+        return await self._cached(("find_by_attack", f, limit, summary), load)
+
+    async def count(self, filter: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Cuenta los Pokémon que cumplen un filtro.
+        """
+        f = filter or {}
+        return await self._cached(("count", f), lambda: self.col.count_documents(f))
+
+    async def count_by(self, field: str) -> List[Dict[str, Any]]:
+        """
+        Agrupa los Pokémon por el valor de un campo y cuenta cada grupo (ver
+        `PokemonController.count_by`).
+        """
+        pipeline = _count_by_pipeline(field)
+
+        async def load() -> List[Dict[str, Any]]:
+            cursor = await self.col.aggregate(pipeline)
+            return await cursor.to_list(None)
+
+        return await self._cached(("count_by", field), load)
+
+    # -------------------
+    # CAMBIOS
+    # -------------------
+    async def changes_since(
+        self, token: Optional[str] = None, limit: int = CHANGES_PAGE_SIZE
+    ) -> ChangesPage:
+        """
+        Devuelve los cambios posteriores a una marca (ver
+        `PokemonController.changes_since`).
+
+        Raises:
+            InvalidPageError: Si el token es inválido.
+            StaleWatermarkError: Si la marca es anterior a las lápidas que se
+                conservan.
+        """
+        docs_query, tombstones_query = _changes_queries(token, self._now())
+        docs = await self.col.find(docs_query).sort(CHANGES_SORT).limit(limit + 1).to_list(None)
+        cursor = self.tombstones.find(tombstones_query).sort(TOMBSTONES_SORT).limit(limit + 1)
+        tombstones = await cursor.to_list(None)
+        return self._changes_page(docs, tombstones, limit, token)
+
+    # -------------------
+    # UPDATE
+    # -------------------
+    async def update(
+        self, id_str: str, update_fields: Dict[str, Any], original: Optional[Any] = None
+    ) -> Optional[Pokemon]:
+        """
+        Actualiza un Pokémon por su ObjectId (ver `PokemonController.update`).
+
+        Raises:
+            VersionConflictError: Si el Pokémon cambió desde que se cargó `original`.
+        """
+        try:
+            oid = PyObjectId.validate(id_str)
+        except Exception:
+            return None
+
+        filter, update = self._update_plan(oid, update_fields, original)
+        if not update:
+            return original if isinstance(original, Pokemon) else original.to_model()
+
+        before = await self.col.find_one_and_update(
+            filter, update, return_document=ReturnDocument.BEFORE
+        )
+        self._invalidate(oid)
+        if not before:
+            if original is not None and await self.col.count_documents({"_id": oid}, limit=1):
+                raise VersionConflictError(f"El Pokémon {id_str} ha cambiado")
+            return None
+        doc = _apply_update(before, update, update_fields)
+        await self._notify_async(before, doc)
+        return Pokemon.model_validate(doc)
+
+    # -------------------
+    # DELETE
+    # -------------------
+    async def delete(self, id_str: str) -> bool:
+        """
+        Borra un Pokémon por su ObjectId.
+
+        Returns:
+            bool: True si se eliminó correctamente, False si no existía.
+        """
+        try:
+            oid = PyObjectId.validate(id_str)
+        except Exception:
+            return False
+
+        doc = await self.col.find_one_and_delete({"_id": oid})
+        self._invalidate(oid)
+        if doc is None:
+            return False
+        await self._bury([oid])
+        await self._notify_async(doc, None)
+        return True
+
+    async def delete_many(self, filter: Dict[str, Any]) -> int:
+        """
+        Borra múltiples Pokémon según un filtro, por lotes de `_id` y dejando
+        sus lápidas (ver `PokemonController.delete_many`).
+
+        Returns:
+            int: La cantidad de documentos eliminados.
+        """
+        async def delete_chunk(chunk: List[ObjectId]) -> int:
+            res = await self.col.delete_many({"$and": [filter, {"_id": {"$in": chunk}}]})
+            await self._bury(chunk)
+            return res.deleted_count
+
+        deleted = 0
+        chunk: List[ObjectId] = []
+        async for d in self.col.find(filter, {"_id": 1}):
+            chunk.append(d["_id"])
+            if len(chunk) >= BULK_BATCH_SIZE:
+                deleted += await delete_chunk(chunk)
+                chunk = []
+        if chunk:
+            deleted += await delete_chunk(chunk)
+        self._invalidate(everything=True)
+        await self._notify_bulk_async()
+        return deleted
+
+    async def _bury(self, ids: List[ObjectId]) -> None:
+        """
+        Guarda las lápidas de los Pokémon borrados de `ids` (ver
+        `PokemonController._bury`).
+        """
+        if not ids:
+            return
+        try:
+            cursor = self.col.find({"_id": {"$in": ids}}, {"_id": 1})
+            alive = {d["_id"] for d in await cursor.to_list(None)}
+            now = self._now()
+            ops = [tombstone_op(oid, now) for oid in ids if oid not in alive]
+            if ops:
+                await self.tombstones.bulk_write(ops, ordered=False)
+        except PyMongoError:
+            logger.exception("No se pudieron guardar las lápidas de %d Pokémon", len(ids))
+
+    # -------------------
+    # BULK
+    # -------------------
+    async def _bulk_write(
+        self, ops: Iterable[Any], result: BulkResult, batch_size: int
+    ) -> BulkResult:
+        """
+        Ejecuta operaciones con `bulk_write` no ordenado en lotes acotados.
+        """
+        batches = ((b, []) for b in _chunks(ops, batch_size))
+        return await self._write_batches(_batches_of(batches), result)
+
+    async def _write_batches(
+        self, batches: AsyncIterator[WriteBatch], result: BulkResult
+    ) -> BulkResult:
+        """
+        Ejecuta cada lote de operaciones con un `bulk_write` no ordenado; la
+        caché se invalida y los hooks se avisan una sola vez, al terminar.
+        Los lotes se piden de uno en uno, así que pueden leerse de la base de
+        datos mientras se escriben los anteriores (ver `sync`).
+        """
+        wrote = False
+        try:
+            async for batch, deleted in batches:
+                if not batch:
+                    continue
+                wrote = True
+                try:
+                    res = await self.col.bulk_write(batch, ordered=False)
+                    result.merge(res.bulk_api_result)
+                except BulkWriteError as e:
+                    result.merge(e.details)
+                await self._bury(deleted)
+        finally:
+            if wrote:
+                self._invalidate(everything=True)
+                await self._notify_bulk_async()
+        return result
+
+    async def bulk_insert(
+        self, payloads: Iterable[Dict[str, Any]], batch_size: int = BULK_BATCH_SIZE
+    ) -> BulkResult:
+        """
+        Inserta muchos Pokémon con una llamada a `bulk_write` por lote.
+        """
+        result = BulkResult()
+        ops = _insert_ops(self._validated_fields(payloads, result), self._now)
+        return await self._bulk_write(ops, result, batch_size)
+
+    async def bulk_upsert(
+        self,
+        payloads: Iterable[Dict[str, Any]],
+        key: str = "nombre",
+        batch_size: int = BULK_BATCH_SIZE,
+    ) -> BulkResult:
+        """
+        Inserta o actualiza muchos Pokémon identificándolos por `key`.
+
+        Raises:
+            ValueError: Si `key` no es una clave de upsert admitida.
+        """
+        if key not in UPSERT_KEYS:
+            raise ValueError(f"Clave de upsert no admitida: {key}")
+
+        result = BulkResult()
+        batches = (
+            (_upsert_ops(chunk, key, result, self._now()), [])
+            for chunk in _chunks(self._validated_fields(payloads, result), batch_size)
+        )
+        return await self._write_batches(_batches_of(batches), result)
+
+    async def sync(
+        self,
+        payloads: Iterable[Dict[str, Any]],
+        key: str = "nombre",
+        delete_missing: bool = False,
+        batch_size: int = BULK_BATCH_SIZE,
+    ) -> SyncResult:
+        """
+        Sincroniza la colección con un origen de forma incremental e
+        idempotente (ver `PokemonController.sync`).
+
+        Raises:
+            ValueError: Si `key` no es una clave de upsert admitida.
+        """
+        if key not in UPSERT_KEYS:
+            raise ValueError(f"Clave de upsert no admitida: {key}")
+
+        result = SyncResult()
+        seen: Set[Any] = set()
+
+        async def batches() -> AsyncIterator[WriteBatch]:
+            for chunk in _chunks(payloads, batch_size):
+                pending = _sync_pending(chunk, key, seen, result)
+                if not pending:
+                    continue
+                cursor = self.col.find(*_stored_hashes_query(key, pending))
+                stored = {d[key]: d.get(CONTENT_HASH_FIELD) async for d in cursor}
+                yield list(self._sync_ops(pending, stored, key, seen, result)), []
+            if not delete_missing:
+                return
+            # Tras recorrer todo el origen: las claves guardadas que no aparecen
+            missing: List[ObjectId] = []
+            async for d in self.col.find({}, {key: 1}).batch_size(batch_size):
+                if d.get(key) not in seen:
+                    missing.append(d["_id"])
+                if len(missing) >= batch_size:
+                    for batch in _delete_batches(missing, batch_size):
+                        yield batch
+                    missing = []
+            for batch in _delete_batches(missing, batch_size):
+                yield batch
+
+        await self._write_batches(batches(), result)
+        return result
+
+    async def bulk_delete(
+        self, ids: Iterable[str], batch_size: int = BULK_BATCH_SIZE
+    ) -> BulkResult:
+        """
+        Borra muchos Pokémon por su ObjectId en lotes de `bulk_write`.
+        """
+        result = BulkResult()
+        batches = _delete_batches(_delete_ids(ids, result), batch_size)
+        return await self._write_batches(_batches_of(batches), result)
+
+    # -------------------
+    # MANTENIMIENTO
+    # -------------------
+    async def backfill_search_keys(self, batch_size: int = BULK_BATCH_SIZE) -> BulkResult:
+        """
+        Calcula `nombre_norm` en los documentos existentes que no lo tengan;
+        cada lote se escribe en cuanto se llena, como en la versión síncrona.
+        """
+        cursor = self.col.find(
+            {NORMALIZED_FIELD: {"$exists": False}}, {"nombre": 1}
+        ).batch_size(batch_size)
+
+        async def batches() -> AsyncIterator[WriteBatch]:
+            ops: List[Any] = []
+            async for d in cursor:
+                ops.append(_backfill_op(d))
+                if len(ops) >= batch_size:
+                    yield ops, []
+                    ops = []
+            yield ops, []
+
+        return await self._write_batches(batches(), BulkResult())
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo del catálogo de ataques materializado.
+
+Define `AttackCatalog`, que mantiene en la colección 'attacks' un documento
+por ataque distinto (`nombre`, `tipo`) con el número de Pokémon que lo
+conocen. El catálogo alimenta el autocompletado de ataques del formulario y
+los filtros por ataque del Listado sin recorrer la colección de Pokémon.
+
+Igual que las estadísticas, el catálogo se reconstruye por completo con una
+agregación que termina en `$out` (comando `rebuild-attacks`) y se mantiene
+al día de forma incremental con `$inc` desde las escrituras del
+`PokemonController`. Las lecturas del catálogo, que las páginas repiten en
+cada ejecución, se sirven desde la caché de consultas si se indica una.
+"""
+
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import DESCENDING, UpdateOne
+from pymongo.database import Database
+
+from cache import QueryCache, make_key
+
+ATTACKS_COLLECTION = "attacks"
+
+# Máximo de ataques ofrecidos en el autocompletado (los más usados)
+ATTACK_OPTIONS_LIMIT = 1000
+
+
+def attack_counts(doc: Optional[Dict[str, Any]]) -> Counter:
+    """
+    Cuenta los ataques de un documento de Pokémon.
+
+    Un ataque repetido en el mismo Pokémon cuenta una sola vez, igual que en
+    la reconstrucción completa.
+
+    Args:
+        doc (Optional[Dict[str, Any]]): El documento (None no aporta nada).
+
+    Returns:
+        Counter: (nombre, tipo) -> 1 por cada ataque distinto.
+    """
+    if not doc:
+        return Counter()
+    keys = set()
+    for ataque in doc.get("ataques") or []:
+        if isinstance(ataque, dict) and ataque.get("nombre"):
+            keys.add((ataque["nombre"], ataque.get("tipo")))
+    return Counter(keys)
+
+
+def rebuild_pipeline() -> List[Dict[str, Any]]:
+    """
+    Pipeline que recalcula el catálogo y reemplaza la colección con `$out`.
+
+    `$out` conserva los índices de la colección destino y elimina los ataques
+    que ya no conoce ningún Pokémon.
+
+    Returns:
+        List[Dict[str, Any]]: Las etapas de la agregación.
+    """
+    return [
+        {"$unwind": "$ataques"},
+        {"$match": {"ataques.nombre": {"$nin": [None, ""]}}},
+        # Primero por Pokémon, para no contar dos veces un ataque repetido
+        {
+            "$group": {
+                "_id": {"p": "$_id", "nombre": "$ataques.nombre", "tipo": "$ataques.tipo"}
+            }
+        },
+        {
+            "$group": {
+                "_id": {"nombre": "$_id.nombre", "tipo": "$_id.tipo"},
+                "count": {"$sum": 1},
+            }
+        },
+        {
+            "$project": {
+                "_id": 0,
+                "nombre": "$_id.nombre",
+                "tipo": "$_id.tipo",
+                "count": 1,
+                "updated_at": "$$NOW",
+            }
+        },
+        {"$out": ATTACKS_COLLECTION},
+    ]
+
+
+class AttackCatalog:
+    """
+    Mantiene y lee el catálogo de ataques materializado.
+
+    Se registra como hook de escritura del `PokemonController`: cada
+    escritura individual aplica su diferencia con `$inc`, y las escrituras
+    masivas lanzan una reconstrucción completa.
+    """
+
+    def __init__(
+        self, db: Database, source: str = "pokemons", cache: Optional[QueryCache] = None
+    ):
+        """
+        Inicializa el catálogo.
+
+        Args:
+            db (Database): La base de datos.
+            source (str, optional): La colección de Pokémon. Defaults to "pokemons".
+            cache (Optional[QueryCache], optional): Caché de lecturas compartida.
+                Las lecturas se etiquetan con el espacio de nombres del
+                catálogo, que se invalida tras cada cambio. Defaults to None.
+        """
+        self.source = db[source]
+        self.target = db[ATTACKS_COLLECTION]
+        self.cache = cache
+
+    def _cached(self, key_parts: Tuple[Any, ...], loader) -> Any:
+        """
+        Sirve una lectura desde la caché o la ejecuta con `loader`.
+
+        Los valores devueltos se comparten entre sesiones: no deben modificarse.
+        """
+        if self.cache is None:
+            return loader()
+        ns = self.target.full_name
+        return self.cache.get_or_load(make_key(ns, *key_parts), loader, (ns,))
+
+    def _invalidate(self) -> None:
+        """
+        Invalida las lecturas del catálogo en la caché.
+        """
+        if self.cache is not None:
+            self.cache.invalidate(self.target.full_name)
+
+    def top(self, limit: int = ATTACK_OPTIONS_LIMIT) -> List[Dict[str, Any]]:
+        """
+        Los ataques más usados, para el autocompletado.
+
+        Args:
+            limit (int, optional): Máximo de ataques. Defaults to 1000.
+
+        Returns:
+            List[Dict[str, Any]]: Documentos `{nombre, tipo, count}` ordenados
+                de mayor a menor uso.
+        """
+        def load() -> List[Dict[str, Any]]:
+            cursor = (
+                self.target.find({}, {"_id": 0, "nombre": 1, "tipo": 1, "count": 1})
+                .sort([("count", DESCENDING), ("nombre", 1)])
+                .limit(limit)
+            )
+            return list(cursor)
+
+        return self._cached(("top", limit), load)
+
+    def types(self) -> List[str]:
+        """
+        Los tipos de ataque distintos del catálogo, ordenados.
+        """
+        return self._cached(
+            ("types",), lambda: sorted(t for t in self.target.distinct("tipo") if t)
+        )
+
+    def rebuild(self) -> int:
+        """
+        Recalcula el catálogo completo en el servidor.
+
+        Returns:
+            int: El número de ataques distintos.
+        """
+        try:
+            self.source.aggregate(rebuild_pipeline())
+        finally:
+            self._invalidate()
+        return self.target.count_documents({})
+
+    # -------------------
+    # HOOKS DE ESCRITURA
+    # -------------------
+    def _apply(self, diff: Iterable[Tuple[Tuple[str, Optional[str]], int]]) -> None:
+        """
+        Aplica incrementos de uso por ataque y elimina los que quedan a cero.
+        """
+        now = datetime.utcnow()
+        ops, removed = [], []
+        for (nombre, tipo), n in diff:
+            key = {"nombre": nombre, "tipo": tipo}
+            ops.append(
+                UpdateOne(key, {"$inc": {"count": n}, "$set": {"updated_at": now}}, upsert=True)
+            )
+            if n < 0:
+                removed.append(key)
+        try:
+            if ops:
+                self.target.bulk_write(ops, ordered=False)
+            if removed:
+                self.target.delete_many({"$or": removed, "count": {"$lte": 0}})
+        finally:
+            if ops:
+                self._invalidate()
+
+    def on_write(
+        self, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]
+    ) -> None:
+        """
+        Aplica la diferencia de ataques entre la versión anterior y la nueva
+        de un documento.
+
+        Args:
+            before (Optional[Dict[str, Any]]): El documento antes de la
+                escritura (None en inserciones).
+            after (Optional[Dict[str, Any]]): El documento tras la escritura
+                (None en borrados).
+        """
+        diff = attack_counts(after)
+        diff.subtract(attack_counts(before))
+        self._apply((key, n) for key, n in diff.items() if n)
+
+    def on_bulk_write(self) -> None:
+        """
+        Tras una escritura masiva los documentos afectados no se conocen:
+        se reconstruye el catálogo completo.
+        """
+        self.rebuild()
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Prueba de carga de la API JSON (`api_server.py`).
+
+Lanza `--requests` peticiones con `--concurrency` clientes simultáneos contra
+una API en marcha, con una mezcla de lecturas parecida a la de otro servicio:
+Pokémon por id (la mitad de ellos con `If-None-Match`, que deben responderse
+con un 304), páginas del listado y búsquedas por nombre. Publica las
+peticiones por segundo del conjunto y la latencia p50/p95/p99 de cada tipo.
+
+Requiere la API en marcha sobre una colección con datos, p. ej.:
+    python api_server.py --port 8000
+
+Uso (desde el directorio python/):
+    python -m benchmarks.api_load --url http://localhost:8000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, Dict, List, Tuple
+from urllib.parse import quote
+
+from tornado.httpclient import AsyncHTTPClient, HTTPClientError
+
+from benchmarks.run import summarize
+
+# Tipo de petición -> peso en la mezcla
+MIX = {"get": 40, "get_304": 30, "list": 20, "search": 10}
+
+
+async def sample(client: AsyncHTTPClient, url: str) -> List[Tuple[str, str, str]]:
+    """
+    Ids, ETags y nombres de una página del listado, para construir las
+    peticiones.
+    """
+    response = await client.fetch(f"{url}/pokemons?page_size=500")
+    items = json.loads(response.body)["items"]
+    if not items:
+        raise SystemExit("La colección está vacía: carga datos antes de la prueba")
+    out = []
+    for item in items[:100]:
+        one = await client.fetch(f"{url}/pokemons/{item['_id']}")
+        out.append((item["_id"], one.headers["ETag"], item["nombre"]))
+    return out
+
+
+def build_request(kind: str, pokemon: Tuple[str, str, str], url: str) -> Dict[str, Any]:
+    """
+    Argumentos de `AsyncHTTPClient.fetch` para una petición de tipo `kind`.
+    """
+    id_str, etag, nombre = pokemon
+    if kind == "get":
+        return {"request": f"{url}/pokemons/{id_str}"}
+    if kind == "get_304":
+        return {"request": f"{url}/pokemons/{id_str}", "headers": {"If-None-Match": etag}}
+    if kind == "list":
+        query = f"page_size=50&sort=nombre&nombre={quote(nombre[:1])}"
+        return {"request": f"{url}/pokemons?{query}"}
+    return {"request": f"{url}/pokemons/search?q={quote(nombre[:3])}"}
+
+
+async def load(url: str, requests: int, concurrency: int, seed: int) -> Dict[str, Any]:
+    """
+    Ejecuta la prueba de carga.
+
+    Returns:
+        Dict[str, Any]: Peticiones por segundo, errores y el resumen de
+            latencias de cada tipo de petición.
+    """
+    client = AsyncHTTPClient(max_clients=concurrency)
+    pokemons = await sample(client, url)
+    rng = random.Random(seed)
+    kinds = rng.choices(list(MIX), weights=list(MIX.values()), k=requests)
+    plan = [(kind, build_request(kind, rng.choice(pokemons), url)) for kind in kinds]
+
+    latencies: Dict[str, List[float]] = {kind: [] for kind in MIX}
+    errors = 0
+    queue = iter(plan)
+
+    async def worker() -> None:
+        nonlocal errors
+        for kind, args in queue:
+            start = time.perf_counter()
+            try:
+                await client.fetch(**args)
+            except HTTPClientError as e:
+                # El 304 llega como excepción y es la respuesta esperada
+                if e.code != 304:
+                    errors += 1
+                    continue
+            latencies[kind].append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    client.close()
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "elapsed_s": elapsed,
+        "requests_per_s": requests / elapsed,
+        "errors": errors,
+        "latency": {kind: summarize(values) for kind, values in latencies.items() if values},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API JSON.")
+    parser.add_argument("--url", default="http://localhost:8000", help="URL base de la API")
+    parser.add_argument("--requests", type=int, default=5000, help="Peticiones en total")
+    parser.add_argument("--concurrency", type=int, default=32, help="Clientes simultáneos")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados")
+    args = parser.parse_args()
+
+    results = asyncio.run(load(args.url.rstrip("/"), args.requests, args.concurrency, args.seed))
+    print(
+        f"{results['requests']} peticiones con {results['concurrency']} clientes en "
+        f"{results['elapsed_s']:.2f}s: {results['requests_per_s']:.1f} peticiones/s, "
+        f"{results['errors']} errores"
+    )
+    print(f"{'petición':<12}{'n':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for kind, r in results["latency"].items():
+        print(
+            f"{kind:<12}{r['n']:>8}{r['p50_ms']:>10.2f}"
+            f"{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+        )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de decodificación de documentos de Pokémon.
+
+Compara el coste de convertir documentos BSON leídos de la colección en
+objetos de Python con las distintas estrategias de lectura:
+
+- `bson`: solo decodificar el BSON a diccionarios (cota inferior).
+- `raw`: `RawBSONDocument`, decodificación perezosa accediendo a un campo.
+- `validate`: diccionario + `Pokemon.model_validate` (lecturas estrictas).
+- `construct`: diccionario + `Pokemon.model_construct` (sin validación).
+- `record`: diccionario + `from_trusted`, el registro con `__slots__` que
+  usan las lecturas de confianza del controlador.
+- `summary_*`: lo mismo con `PokemonSummary` sobre la proyección ligera.
+
+No necesita MongoDB: los documentos se generan y codifican en memoria.
+
+Uso (desde el directorio python/):
+    python -m benchmarks.decode --docs 10000 --repeat 5
+"""
+
+import argparse
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+import bson
+from bson import ObjectId
+from bson.raw_bson import RawBSONDocument
+
+from benchmarks.generator import generate
+from models import SUMMARY_PROJECTION, Pokemon, PokemonSummary, from_trusted
+from normalize import NORMALIZED_FIELD, normalize_name
+
+def make_documents(n: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Genera `n` documentos tal y como quedan guardados en la colección
+    'pokemons' (con '_id', nombre normalizado y marcas de tiempo).
+    """
+    now = datetime.utcnow()
+    docs = []
+    for doc in generate(n, seed=seed):
+        doc.update(
+            {
+                "_id": ObjectId(),
+                NORMALIZED_FIELD: normalize_name(doc["nombre"]),
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        docs.append(doc)
+    return docs
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> float:
+    """
+    Ejecuta `fn` `repeat` veces y devuelve el mejor tiempo en segundos.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--docs", type=int, default=10000, help="Documentos por pasada")
+    parser.add_argument("--repeat", type=int, default=5, help="Pasadas por estrategia")
+    args = parser.parse_args()
+
+    docs = make_documents(args.docs)
+    full = [bson.encode(d) for d in docs]
+    summary_fields = set(SUMMARY_PROJECTION) | {"_id"}
+    slim = [bson.encode({k: v for k, v in d.items() if k in summary_fields}) for d in docs]
+
+    def decode_all(blobs: List[bytes]) -> List[Dict[str, Any]]:
+        return [bson.decode(b) for b in blobs]
+
+    cases = {
+        "bson": lambda: decode_all(full),
+        "raw": lambda: [RawBSONDocument(b)["nombre"] for b in full],
+        "validate": lambda: [Pokemon.model_validate(d) for d in decode_all(full)],
+        "construct": lambda: [Pokemon.model_construct(**d) for d in decode_all(full)],
+        "record": lambda: [from_trusted(Pokemon, d) for d in decode_all(full)],
+        "summary_validate": lambda: [
+            PokemonSummary.model_validate(d) for d in decode_all(slim)
+        ],
+        "summary_record": lambda: [
+            from_trusted(PokemonSummary, d) for d in decode_all(slim)
+        ],
+    }
+
+    per_10k = 10000 / args.docs
+    print(f"{'estrategia':<20}{'ms / 10k docs':>16}{'docs/s':>14}{'vs validate':>14}")
+    results = {name: measure(fn, args.repeat) for name, fn in cases.items()}
+    baseline = results["validate"]
+    for name, seconds in results.items():
+        print(
+            f"{name:<20}{seconds * per_10k * 1000:>16.1f}"
+            f"{args.docs / seconds:>14,.0f}{baseline / seconds:>13.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de la búsqueda aproximada de nombres.
+
+Construye un `FuzzyIndex` con los nombres de una Pokédex sintética y mide la
+latencia p50/p95/p99 de buscar nombres existentes con una o dos erratas
+(letras cambiadas, borradas, añadidas o intercambiadas), y qué parte de las
+búsquedas devuelve el nombre original en primera posición.
+
+No necesita MongoDB: los nombres se generan en memoria.
+
+Uso (desde el directorio python/):
+    python -m benchmarks.fuzzy --size 1000000 --ops 500
+"""
+
+import argparse
+import json
+import random
+import string
+import time
+from typing import Any, Dict
+
+from benchmarks.generator import generate
+from benchmarks.run import DEFAULT_OPS, summarize
+from fuzzy import FuzzyIndex, max_typos
+from normalize import normalize_name
+
+
+def typo(name: str, rng: random.Random, n: int = 1) -> str:
+    """
+    Introduce `n` erratas aleatorias en un nombre.
+    """
+    chars = list(name)
+    for _ in range(n):
+        i = rng.randrange(len(chars))
+        op = rng.choice(("cambio", "borrado", "inserción", "intercambio"))
+        if op == "cambio":
+            chars[i] = rng.choice(string.ascii_lowercase)
+        elif op == "borrado" and len(chars) > 1:
+            del chars[i]
+        elif op == "inserción":
+            chars.insert(i, rng.choice(string.ascii_lowercase))
+        elif i + 1 < len(chars):
+            chars[i], chars[i + 1] = chars[i + 1], chars[i]
+    return "".join(chars)
+
+
+def run(size: int, ops: int, seed: int) -> Dict[str, Any]:
+    """
+    Indexa `size` nombres sintéticos y mide `ops` búsquedas con erratas.
+
+    Returns:
+        Dict[str, Any]: Segundos de construcción, el resumen de las búsquedas
+            y la fracción de aciertos en primera posición.
+    """
+    names = [doc["nombre"] for doc in generate(size, seed=seed)]
+    index = FuzzyIndex()
+    start = time.perf_counter()
+    for name in names:
+        index.add(name)
+    build = time.perf_counter() - start
+
+    rng = random.Random(seed)
+    timings, hits = [], 0
+    for _ in range(ops):
+        name = rng.choice(names)
+        query = typo(name, rng, n=rng.choice((1, 2)))
+        start = time.perf_counter()
+        matches = index.search(query, max_distance=max_typos(query))
+        timings.append(time.perf_counter() - start)
+        hits += bool(matches) and matches[0].term == normalize_name(name)
+
+    return {
+        "size": size,
+        "terms": len(index),
+        "build_s": build,
+        "search": summarize(timings),
+        "top1": hits / ops if ops else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Búsqueda de nombres con erratas en el índice de trigramas."
+    )
+    parser.add_argument("--size", type=int, default=1000000)
+    parser.add_argument("--ops", type=int, default=DEFAULT_OPS, help="Búsquedas a medir")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados")
+    args = parser.parse_args()
+
+    results = run(args.size, args.ops, args.seed)
+    print(
+        f"{results['terms']} nombres distintos de {results['size']} Pokémon "
+        f"indexados en {results['build_s']:.2f}s"
+    )
+    r = results["search"]
+    print(f"{'consulta':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>10}")
+    print(
+        f"{'search':<12}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}"
+        f"{r['p99_ms']:>10.2f}{r['ops_per_s']:>10.1f}"
+    )
+    print(f"nombre original en primera posición: {results['top1']:.0%}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
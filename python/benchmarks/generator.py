@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Generador determinista de Pokédex sintéticas para los benchmarks.
+
+Produce Pokémon con el mismo esquema que `data/pokemons.json` (tipos,
+regiones, niveles y de 1 a 4 ataques) en la cantidad que se pida. Con la
+misma semilla, la secuencia generada es siempre idéntica, de modo que los
+resultados de distintas versiones son comparables.
+
+Uso (desde el directorio python/):
+    python -m benchmarks.generator 100000 -o /tmp/pokedex_100k.jsonl
+"""
+
+import argparse
+import json
+import random
+from typing import Any, Dict, Iterator, List
+
+TIPOS = [
+    "Normal", "Fuego", "Agua", "Planta", "Eléctrico", "Hielo", "Lucha", "Veneno",
+    "Tierra", "Volador", "Psíquico", "Bicho", "Roca", "Fantasma", "Dragón",
+    "Siniestro", "Acero", "Hada",
+]
+
+REGIONES = [
+    "Kanto", "Johto", "Hoenn", "Sinnoh", "Teselia", "Kalos", "Alola", "Galar", "Paldea",
+]
+
+# Ataques de ejemplo por tipo
+ATAQUES = {
+    "Normal": ["Placaje", "Arañazo", "Ataque Rápido", "Hiperrayo"],
+    "Fuego": ["Ascuas", "Lanzallamas", "Llamarada", "Rueda Fuego"],
+    "Agua": ["Pistola Agua", "Hidrobomba", "Surf", "Burbuja"],
+    "Planta": ["Látigo Cepa", "Hoja Afilada", "Rayo Solar", "Drenadoras"],
+    "Eléctrico": ["Impactrueno", "Rayo", "Trueno", "Chispa"],
+    "Hielo": ["Rayo Hielo", "Ventisca", "Canto Helado", "Colmillo Hielo"],
+    "Lucha": ["Patada Baja", "Demolición", "A Bocajarro", "Puño Dinámico"],
+    "Veneno": ["Picotazo Ven", "Bomba Lodo", "Ácido", "Tóxico"],
+    "Tierra": ["Terremoto", "Excavar", "Bofetón Lodo", "Tierra Viva"],
+    "Volador": ["Picotazo", "Tornado", "Pájaro Osado", "Vuelo"],
+    "Psíquico": ["Confusión", "Psíquico", "Psicocorte", "Cabezazo Zen"],
+    "Bicho": ["Picadura", "Tijera X", "Zumbido", "Ida y Vuelta"],
+    "Roca": ["Lanzarrocas", "Avalancha", "Roca Afilada", "Joya de Luz"],
+    "Fantasma": ["Lengüetazo", "Bola Sombra", "Sombra Vil", "Tinieblas"],
+    "Dragón": ["Furia Dragón", "Garra Dragón", "Enfado", "Cometa Draco"],
+    "Siniestro": ["Mordisco", "Triturar", "Pulso Umbrío", "Juego Sucio"],
+    "Acero": ["Garra Metal", "Cabeza de Hierro", "Foco Resplandor", "Cola Férrea"],
+    "Hada": ["Viento Feérico", "Fuerza Lunar", "Brillo Mágico", "Beso Drenaje"],
+}
+
+_SILABAS = [
+    "pi", "ka", "chu", "bul", "ba", "saur", "char", "man", "der", "squi", "rtle",
+    "mew", "two", "gar", "dos", "zu", "bat", "eev", "ee", "lu", "cario", "dra",
+    "go", "nite", "gen", "sno", "lax", "ly", "ra", "on", "tyr", "ani", "tar",
+    "ñu", "é", "zor", "ark", "vee", "ma", "rill", "tog", "epi", "gi", "ze", "kro",
+]
+
+
+def make_name(rng: random.Random, index: int) -> str:
+    """
+    Genera un nombre pronunciable y único (el índice lo desambigua).
+    """
+    silabas = "".join(rng.choice(_SILABAS) for _ in range(rng.randint(2, 4)))
+    nombre = silabas.capitalize()
+    if rng.random() < 0.1:
+        # Algunos nombres de varias palabras, como "Tapu Koko"
+        nombre += " " + "".join(rng.choice(_SILABAS) for _ in range(2)).capitalize()
+    return f"{nombre} {index}"
+
+
+def make_attacks(rng: random.Random, tipos: List[str]) -> List[Dict[str, str]]:
+    """
+    Genera de 1 a 4 ataques, con preferencia por los tipos del Pokémon.
+    """
+    ataques = []
+    nombres = set()
+    for _ in range(rng.randint(1, 4)):
+        tipo = rng.choice(tipos) if rng.random() < 0.7 else rng.choice(TIPOS)
+        nombre = rng.choice(ATAQUES[tipo])
+        if nombre in nombres:
+            continue
+        nombres.add(nombre)
+        ataques.append({"nombre": nombre, "tipo": tipo})
+    return ataques
+
+
+def generate(n: int, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """
+    Genera `n` Pokémon sintéticos con el esquema de la colección.
+
+    Los documentos no llevan '_id' ni marcas de tiempo, igual que los del
+    archivo JSON de carga inicial.
+
+    Args:
+        n (int): Número de Pokémon.
+        seed (int, optional): Semilla del generador. Defaults to 42.
+
+    Yields:
+        Dict[str, Any]: Cada Pokémon.
+    """
+    rng = random.Random(seed)
+    for i in range(n):
+        tipo_primario = rng.choice(TIPOS)
+        tipo_secundario = rng.choice(TIPOS) if rng.random() < 0.5 else None
+        if tipo_secundario == tipo_primario:
+            tipo_secundario = None
+        tipos = [t for t in (tipo_primario, tipo_secundario) if t]
+        yield {
+            "nombre": make_name(rng, i),
+            "region": rng.choice(REGIONES),
+            "pokedex_nacional": i + 1,
+            "tipo_primario": tipo_primario,
+            "tipo_secundario": tipo_secundario,
+            "nivel": min(100, max(1, int(rng.gauss(40, 20)))),
+            "ataques": make_attacks(rng, tipos),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Genera una Pokédex sintética en JSON Lines.")
+    parser.add_argument("n", type=int, help="Número de Pokémon, p. ej. 10000, 100000 o 1000000")
+    parser.add_argument("-o", "--output", required=True, help="Archivo JSON Lines de salida")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        for doc in generate(args.n, seed=args.seed):
+            f.write(json.dumps(doc, ensure_ascii=False))
+            f.write("\n")
+    print(f"{args.n} Pokémon escritos en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark del motor de enfrentamientos.
+
+Mide, sobre una plantilla sintética, el tiempo de codificar la plantilla
+(`Roster.from_documents`) y la latencia p50/p95/p99 de `counters` para
+Pokémon elegidos al azar y de `coverage` para equipos de seis.
+
+No necesita MongoDB: los documentos se generan en memoria.
+
+Uso (desde el directorio python/):
+    python -m benchmarks.matchups --size 100000 --ops 200
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Any, Dict
+
+from bson import ObjectId
+
+from benchmarks.generator import generate
+from benchmarks.run import DEFAULT_OPS, summarize
+from matchups import MatchupEngine, Roster
+
+
+def run(size: int, ops: int, seed: int) -> Dict[str, Any]:
+    """
+    Codifica `size` Pokémon sintéticos y mide `ops` consultas de cada tipo.
+
+    Returns:
+        Dict[str, Any]: Segundos de codificación y el resumen de cada consulta.
+    """
+    docs = [dict(d, _id=ObjectId()) for d in generate(size, seed=seed)]
+    start = time.perf_counter()
+    roster = Roster.from_documents(docs)
+    encode = time.perf_counter() - start
+
+    engine = MatchupEngine(collection=None, roster=roster)
+    rng = random.Random(seed)
+    ids = roster.ids.tolist()
+
+    counters, coverage = [], []
+    for _ in range(ops):
+        target = rng.choice(ids)
+        start = time.perf_counter()
+        engine.counters(target, limit=20)
+        counters.append(time.perf_counter() - start)
+
+        team = rng.sample(ids, 6)
+        start = time.perf_counter()
+        engine.coverage(team)
+        coverage.append(time.perf_counter() - start)
+
+    return {
+        "size": size,
+        "encode_s": encode,
+        "counters": summarize(counters),
+        "coverage": summarize(coverage),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Counters y cobertura sobre toda la plantilla."
+    )
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--ops", type=int, default=DEFAULT_OPS, help="Consultas de cada tipo")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados")
+    args = parser.parse_args()
+
+    results = run(args.size, args.ops, args.seed)
+    print(f"plantilla de {results['size']} Pokémon codificada en {results['encode_s']:.2f}s")
+    print(f"{'consulta':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>10}")
+    for name in ("counters", "coverage"):
+        r = results[name]
+        print(
+            f"{name:<12}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}"
+            f"{r['p99_ms']:>10.2f}{r['ops_per_s']:>10.1f}"
+        )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de las páginas que lanzan varias consultas por ejecución.
+
+Para cada página mide su conjunto de consultas de dos formas: una tras otra
+con el `PokemonController` y todas a la vez con el `AsyncPokemonController`
+(`AsyncRunner.gather`), y publica la latencia p50/p95/p99 de cada forma y la
+mejora. Ambos controladores usan las mismas opciones de pool de conexiones
+(`db.client_options`) y ninguno usa la caché de consultas.
+
+Requiere un mongod (el cliente asíncrono no funciona con mongomock).
+
+Uso (desde el directorio python/):
+    python -m benchmarks.pages --size 100000 --output pages.json
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from pymongo import MongoClient
+
+from async_controller import AsyncPokemonController, AsyncRunner
+from benchmarks.generator import REGIONES, generate
+from benchmarks.run import BENCH_DB, DEFAULT_OPS, DEFAULT_SIZE, summarize
+from controller import PokemonController, listing_filter
+from db import MONGO_URI, client_options, make_async_client
+from import_json import bulk_import
+from indexes import ensure_indexes
+
+# Una consulta de página: (método del controlador, args, kwargs)
+Query = Tuple[str, tuple, Dict[str, Any]]
+
+
+def listado(args: Dict[str, Any]) -> List[Query]:
+    """
+    Listado: la página de la tabla y el total de resultados del filtro.
+    """
+    filtro = listing_filter(region=args["region"], min_pokedex=args["min_pokedex"])
+    return [
+        ("find_page_table", (filtro,), {"page_size": 50}),
+        ("count", (filtro,), {}),
+    ]
+
+
+def editar(args: Dict[str, Any]) -> List[Query]:
+    """
+    Editar: la búsqueda por nombre y el Pokémon seleccionado.
+    """
+    return [
+        ("find_by_name", (args["name"][:3],), {"summary": True}),
+        ("find_by_id", (args["id"],), {}),
+    ]
+
+
+def resumen(args: Dict[str, Any]) -> List[Query]:
+    """
+    Un panel con varios agregados calculados al vuelo.
+    """
+    return [
+        ("count", ({"region": args["region"]},), {}),
+        ("count_by", ("tipo_primario",), {}),
+        ("count_by", ("region",), {}),
+    ]
+
+
+# Página -> consultas de una ejecución, según los argumentos elegidos
+PAGES: Dict[str, Callable[[Dict[str, Any]], List[Query]]] = {
+    "listado": listado,
+    "editar": editar,
+    "resumen": resumen,
+}
+
+
+def run(uri: str, size: int, ops: int, seed: int) -> Dict[str, Any]:
+    """
+    Carga `size` Pokémon sintéticos y mide cada página `ops` veces, en
+    secuencia y en paralelo.
+
+    Args:
+        uri (str): URI de MongoDB (la base de datos `BENCH_DB` se borra).
+        size (int): Tamaño de la Pokédex.
+        ops (int): Ejecuciones por página y forma.
+        seed (int): Semilla del generador y de la elección de argumentos.
+
+    Returns:
+        Dict[str, Any]: Por página, el resumen secuencial, el concurrente y
+            la mejora del p50.
+    """
+    client = MongoClient(uri, **client_options())
+    runner = AsyncRunner().start()
+    async_client = runner.call(make_async_client, uri)
+    try:
+        client.drop_database(BENCH_DB)
+        col = client[BENCH_DB]["pokemons"]
+        bulk_import(col, generate(size, seed=seed), progress=None)
+        ensure_indexes(client[BENCH_DB])
+
+        sync = PokemonController(col)
+        concurrent = AsyncPokemonController(async_client[BENCH_DB]["pokemons"])
+
+        rng = random.Random(seed)
+        numbers = rng.sample(range(1, size + 1), min(ops, size))
+        sample = list(col.find({"pokedex_nacional": {"$in": numbers}}, {"nombre": 1}))
+        choices = [
+            {
+                "id": str(d["_id"]),
+                "name": d["nombre"],
+                "region": rng.choice(REGIONES),
+                "min_pokedex": rng.randint(0, size),
+            }
+            for d in sample
+        ]
+
+        results: Dict[str, Dict[str, Any]] = {}
+        for name, page in PAGES.items():
+            sequential, parallel = [], []
+            for args in choices:
+                queries = page(args)
+                start = time.perf_counter()
+                for method, a, kw in queries:
+                    getattr(sync, method)(*a, **kw)
+                sequential.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                runner.gather(*(getattr(concurrent, m)(*a, **kw) for m, a, kw in queries))
+                parallel.append(time.perf_counter() - start)
+
+            seq, par = summarize(sequential), summarize(parallel)
+            results[name] = {
+                "queries": len(page(choices[0])) if choices else 0,
+                "sequential": seq,
+                "concurrent": par,
+                "speedup_p50": seq["p50_ms"] / par["p50_ms"] if par["p50_ms"] else 0.0,
+            }
+        return results
+    finally:
+        client.drop_database(BENCH_DB)
+        client.close()
+        runner.run(async_client.close())
+        runner.stop()
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    """
+    Muestra los resultados como una tabla.
+    """
+    print(
+        f"{'página':<12}{'consultas':>10}{'sec p50':>10}{'sec p95':>10}"
+        f"{'par p50':>10}{'par p95':>10}{'mejora':>8}"
+    )
+    for name, r in results.items():
+        seq, par = r["sequential"], r["concurrent"]
+        print(
+            f"{name:<12}{r['queries']:>10}{seq['p50_ms']:>10.2f}{seq['p95_ms']:>10.2f}"
+            f"{par['p50_ms']:>10.2f}{par['p95_ms']:>10.2f}{r['speedup_p50']:>7.1f}x"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Consultas de página en secuencia frente a concurrentes."
+    )
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE)
+    parser.add_argument("--ops", type=int, default=DEFAULT_OPS, help="Ejecuciones por página")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--uri", default=MONGO_URI, help="URI de MongoDB")
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados")
+    args = parser.parse_args()
+
+    results = run(args.uri, args.size, args.ops, args.seed)
+    print_report(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+"""
+Suite de benchmarks del `PokemonController`, la importación masiva y las
+consultas de las páginas.
+
+Carga una Pokédex sintética (ver `benchmarks/generator.py`) en una base de
+datos aparte, mide cada operación llamada a llamada y publica la latencia
+p50/p95/p99 y el rendimiento en operaciones por segundo. Los resultados se
+guardan en JSON y se pueden comparar con los de una ejecución anterior para
+detectar regresiones entre versiones.
+
+Se puede ejecutar contra un mongod local (por defecto, con `MONGO_URI`) o
+contra `mongomock` en el propio proceso (`--backend mongomock`, no incluido
+en requirements.txt). En mongomock no existen índices reales ni algunas
+etapas de agregación, así que solo sirve para comprobar la suite.
+
+Uso (desde el directorio python/):
+    python -m benchmarks.run --size 100000 --output bench.json
+    python -m benchmarks.run --size 100000 --baseline bench.json
+"""
+
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import pymongo
+from pymongo import MongoClient
+
+from benchmarks.generator import REGIONES, generate
+from controller import PokemonController, listing_filter
+from db import MONGO_URI
+from import_json import bulk_import
+from indexes import ensure_indexes
+from stats import StatsService
+
+BENCH_DB = "pokedex_bench"
+DEFAULT_SIZE = 10000
+DEFAULT_OPS = 200
+
+# Margen sobre el p95 de la línea base a partir del cual se considera regresión
+DEFAULT_TOLERANCE = 0.2
+
+
+def percentile(values: List[float], p: float) -> float:
+    """
+    Percentil `p` (0-100) por el método del rango más cercano.
+
+    Args:
+        values (List[float]): Valores ordenados de menor a mayor.
+        p (float): El percentil.
+
+    Returns:
+        float: El valor del percentil (0 si no hay valores).
+    """
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(values)))
+    return values[rank - 1]
+
+
+def summarize(latencies: List[float]) -> Dict[str, Any]:
+    """
+    Resume las latencias (en segundos) de una operación.
+
+    Returns:
+        Dict[str, Any]: Número de llamadas, media, p50, p95 y p99 en
+            milisegundos y operaciones por segundo.
+    """
+    values = sorted(latencies)
+    total = sum(values)
+    return {
+        "n": len(values),
+        "mean_ms": total / len(values) * 1000 if values else 0.0,
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "ops_per_s": len(values) / total if total else 0.0,
+    }
+
+
+def timed(fn: Callable[..., Any], calls: Iterable[tuple]) -> Dict[str, Any]:
+    """
+    Ejecuta `fn` una vez por cada tupla de argumentos de `calls` y resume
+    sus latencias. Si una llamada falla, la operación se marca con el error.
+    """
+    latencies = []
+    try:
+        for args in calls:
+            start = time.perf_counter()
+            fn(*args)
+            latencies.append(time.perf_counter() - start)
+    except Exception as e:
+        return {**summarize(latencies), "error": f"{type(e).__name__}: {e}"}
+    return summarize(latencies)
+
+
+def connect(backend: str, uri: str) -> MongoClient:
+    """
+    Crea el cliente del backend elegido.
+
+    Raises:
+        SystemExit: Si el backend no está disponible.
+    """
+    if backend == "mongomock":
+        try:
+            import mongomock
+        except ImportError:
+            raise SystemExit("El backend 'mongomock' requiere `pip install mongomock`")
+        return mongomock.MongoClient()
+    client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+    client.admin.command("ping")
+    return client
+
+
+def run(client: MongoClient, size: int, ops: int, seed: int) -> Dict[str, Any]:
+    """
+    Carga `size` Pokémon sintéticos y mide cada operación `ops` veces.
+
+    Args:
+        client (MongoClient): El cliente (la base de datos `BENCH_DB` se borra).
+        size (int): Tamaño de la Pokédex.
+        ops (int): Llamadas por operación.
+        seed (int): Semilla del generador y de la elección de argumentos.
+
+    Returns:
+        Dict[str, Any]: La importación y el resumen de cada operación.
+    """
+    client.drop_database(BENCH_DB)
+    db = client[BENCH_DB]
+    col = db["pokemons"]
+    rng = random.Random(seed)
+
+    start = time.perf_counter()
+    imported = bulk_import(col, generate(size, seed=seed), progress=None)
+    import_seconds = time.perf_counter() - start
+
+    # Los índices se construyen tras la carga, como en un despliegue nuevo
+    start = time.perf_counter()
+    ensure_indexes(db)
+    index_seconds = time.perf_counter() - start
+
+    # Sin caché ni hooks: se mide el acceso a la base de datos
+    controller = PokemonController(col)
+    stats = StatsService(db)
+
+    numbers = rng.sample(range(1, size + 1), min(ops, size))
+    sample = list(col.find({"pokedex_nacional": {"$in": numbers}}, {"nombre": 1}))
+    rng.shuffle(sample)
+    ids = [(str(d["_id"]),) for d in sample]
+    names = [d["nombre"] for d in sample]
+
+    results: Dict[str, Dict[str, Any]] = {}
+    inserted: List[str] = []
+
+    def insert(payload: Dict[str, Any]) -> None:
+        inserted.append(str(controller.insert(payload).id))
+
+    new = generate(ops, seed=seed + 1)
+    results["insert"] = timed(insert, ((p,) for p in new))
+    results["find_by_id"] = timed(controller.find_by_id, ids)
+    results["find_by_name_exact"] = timed(
+        lambda n: controller.find_by_name(n, exact=True), ((n,) for n in names)
+    )
+    results["find_by_name_prefix"] = timed(
+        controller.find_by_name, ((n[:3],) for n in names)
+    )
+    results["find_regex"] = timed(
+        lambda n: controller.find({"nombre": {"$regex": n[1:4], "$options": "i"}}),
+        ((n,) for n in names),
+    )
+    results["listing_filtered"] = timed(
+        lambda region, min_pokedex: controller.find_page_table(
+            listing_filter(region=region, min_pokedex=min_pokedex), page_size=50
+        ),
+        ((rng.choice(REGIONES), rng.randint(0, size)) for _ in range(ops)),
+    )
+
+    cursor: Dict[str, Optional[str]] = {"after": None}
+
+    def next_page() -> None:
+        page = controller.find_page_table(
+            sort_by="nombre", page_size=50, after=cursor["after"]
+        )
+        cursor["after"] = page.next_token
+
+    results["listing_paginated"] = timed(next_page, (() for _ in range(ops)))
+    results["update"] = timed(
+        lambda id_str: controller.update(id_str, {"nivel": rng.randint(1, 100)}), ids
+    )
+    results["delete"] = timed(controller.delete, ((i,) for i in inserted))
+    results["count_by"] = timed(
+        controller.count_by, (("tipo_primario",) for _ in range(max(3, ops // 20)))
+    )
+    results["stats_rebuild"] = timed(stats.rebuild, (() for _ in range(max(3, ops // 20))))
+
+    return {
+        "import": {
+            "docs": imported.read,
+            "inserted": imported.inserted,
+            "invalid": imported.invalid,
+            "failed": imported.failed,
+            "seconds": import_seconds,
+            "docs_per_s": imported.read / import_seconds if import_seconds else 0.0,
+            "index_seconds": index_seconds,
+        },
+        "operations": results,
+    }
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float
+) -> List[str]:
+    """
+    Compara el p95 de cada operación con el de una ejecución anterior.
+
+    Returns:
+        List[str]: Una línea por cada operación cuyo p95 empeora más de
+            `tolerance` (p. ej. 0.2 = 20 %).
+    """
+    regressions = []
+    base_ops = baseline.get("operations", {})
+    for name, result in current["operations"].items():
+        base = base_ops.get(name)
+        if not base or "error" in result or "error" in base or not base["p95_ms"]:
+            continue
+        ratio = result["p95_ms"] / base["p95_ms"]
+        if ratio > 1 + tolerance:
+            regressions.append(
+                f"{name}: p95 {base['p95_ms']:.2f} ms -> {result['p95_ms']:.2f} ms "
+                f"({(ratio - 1) * 100:+.0f} %)"
+            )
+    return regressions
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """
+    Muestra los resultados como una tabla.
+    """
+    imp = report["import"]
+    print(
+        f"importación: {imp['inserted']}/{imp['docs']} documentos en "
+        f"{imp['seconds']:.1f}s ({imp['docs_per_s']:.0f} docs/s), "
+        f"índices en {imp['index_seconds']:.1f}s"
+    )
+    print(f"{'operación':<22}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>10}")
+    for name, r in report["operations"].items():
+        line = (
+            f"{name:<22}{r['n']:>6}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}"
+            f"{r['p99_ms']:>10.2f}{r['ops_per_s']:>10.0f}"
+        )
+        if "error" in r:
+            line += f"  ({r['error']})"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks de la Pokédex.")
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE,
+                        help="Pokémon sintéticos, p. ej. 10000, 100000 o 1000000")
+    parser.add_argument("--ops", type=int, default=DEFAULT_OPS, help="Llamadas por operación")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--backend", choices=("mongod", "mongomock"), default="mongod")
+    parser.add_argument("--uri", default=MONGO_URI, help="URI de MongoDB (backend mongod)")
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--baseline", help="Resultados JSON anteriores con los que comparar")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Empeoramiento del p95 admitido antes de fallar (0.2 = 20 %%)")
+    args = parser.parse_args()
+
+    client = connect(args.backend, args.uri)
+    try:
+        report = run(client, args.size, args.ops, args.seed)
+    finally:
+        client.drop_database(BENCH_DB)
+
+    report["meta"] = {
+        "size": args.size,
+        "ops": args.ops,
+        "seed": args.seed,
+        "backend": args.backend,
+        "server": client.server_info().get("version") if args.backend == "mongod" else None,
+        "python": platform.python_version(),
+        "pymongo": pymongo.version,
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Resultados guardados en {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print("Regresiones respecto a la línea base:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("Sin regresiones respecto a la línea base.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark del arranque en frío de la aplicación.
+
+Cada medición se hace en un proceso de Python nuevo, para que no haya nada
+importado ni cacheado de antes:
+
+- tiempo de importación de los módulos de la aplicación (`streamlit`, `db`,
+  `controller`, `services`, `startup`...);
+- tiempo hasta el primer render de cada página con `streamlit.testing`,
+  contado desde que Streamlit ya está importado (como en un servidor recién
+  arrancado, donde es la primera sesión la que ejecuta la página);
+- el mismo primer render tras cargar la portada y esperar al
+  precalentamiento (`startup.start_prewarm`), como lo vería un usuario que
+  llega a la página después del primero.
+
+Publica el p50/p95/p99 de cada medición y, con `--baseline`, falla si el p95
+de alguna empeora más de `--tolerance` respecto a una ejecución anterior.
+
+Las páginas consultan la base de datos configurada (`MONGO_URI`, `DB_NAME`),
+que debe estar en marcha y con datos; la portada no la necesita.
+
+Uso (desde el directorio python/):
+    python -m benchmarks.startup --repeat 5 --output startup.json
+    python -m benchmarks.startup --repeat 5 --baseline startup.json
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+from benchmarks.run import DEFAULT_TOLERANCE, compare, summarize
+
+# Módulos cuya importación se mide, de más ligero a más pesado
+MODULES = ("streamlit", "startup", "db", "models", "controller", "services")
+
+# Páginas cuyo primer render se mide
+PAGES = ("app.py", "pages/1_Listado.py", "pages/4_Estadísticas.py")
+
+# Segundos máximos de cada render
+RENDER_TIMEOUT = 60
+
+IMPORT_CODE = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+RENDER_CODE = """
+import time
+from streamlit.testing.v1 import AppTest
+if {prewarm}:
+    from startup import start_prewarm
+    AppTest.from_file("app.py", default_timeout={timeout}).run()
+    start_prewarm().wait({timeout})
+start = time.perf_counter()
+at = AppTest.from_file({page!r}, default_timeout={timeout}).run()
+elapsed = time.perf_counter() - start
+errors = [str(e.value) for e in at.exception] + [str(e.value) for e in at.error]
+print(elapsed if not errors else "error: " + errors[0])
+"""
+
+
+def measure(code: str, repeat: int) -> Dict[str, Any]:
+    """
+    Ejecuta `code` en `repeat` procesos nuevos; cada uno imprime los segundos
+    medidos en su última línea, o un error.
+
+    Returns:
+        Dict[str, Any]: El resumen de `summarize`, con "error" si alguna
+            ejecución falló.
+    """
+    timings: List[float] = []
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=False
+        )
+        lines = proc.stdout.strip().splitlines()
+        if lines and lines[-1].startswith("error"):
+            return {**summarize(timings), "error": lines[-1][len("error: "):]}
+        if proc.returncode != 0 or not lines:
+            stderr = proc.stderr.strip().splitlines() or ["sin salida"]
+            return {**summarize(timings), "error": stderr[-1]}
+        timings.append(float(lines[-1]))
+    return summarize(timings)
+
+
+def run(repeat: int) -> Dict[str, Any]:
+    """
+    Mide la importación de `MODULES` y el primer render de `PAGES`, en frío
+    y tras el precalentamiento.
+
+    Returns:
+        Dict[str, Any]: Un resumen por medición, en "operations".
+    """
+    results: Dict[str, Any] = {}
+    for module in MODULES:
+        results[f"import {module}"] = measure(IMPORT_CODE.format(module=module), repeat)
+    for page in PAGES:
+        name = page.split("/")[-1]
+        for prewarm in (False, True):
+            if prewarm and page == "app.py":
+                continue
+            code = RENDER_CODE.format(page=page, prewarm=prewarm, timeout=RENDER_TIMEOUT)
+            label = f"render {name}" + (" (precalentado)" if prewarm else "")
+            results[label] = measure(code, repeat)
+    return {"operations": results}
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """
+    Muestra los resultados como una tabla.
+    """
+    print(f"{'medición':<36}{'n':>4}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, r in report["operations"].items():
+        line = (
+            f"{name:<36}{r['n']:>4}{r['p50_ms']:>10.1f}"
+            f"{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}"
+        )
+        if "error" in r:
+            line += f"  ({r['error']})"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Arranque en frío de la aplicación.")
+    parser.add_argument("--repeat", type=int, default=5, help="Procesos por medición")
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--baseline", help="Resultados JSON anteriores con los que comparar")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Empeoramiento del p95 admitido antes de fallar (0.2 = 20 %%)")
+    args = parser.parse_args()
+
+    report = run(args.repeat)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Resultados guardados en {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print("Regresiones respecto a la línea base:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("Sin regresiones respecto a la línea base.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo de caché de consultas.
+
+Define `QueryCache`, una caché en memoria de resultados de consultas con
+expiración por tiempo (TTL) y desalojo LRU acotado por número de entradas.
+Cada entrada lleva asociadas unas etiquetas que permiten invalidar de golpe
+todos los resultados afectados por una escritura.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Set, Tuple
+
+from bson import json_util
+
+# Tamaño máximo (en entradas) y tiempo de vida (en segundos) de la caché de
+# consultas. Un tamaño de 0 desactiva la caché.
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "30"))
+
+_MISSING = object()
+
+
+def make_key(*parts: Any) -> str:
+    """
+    Construye una clave de caché estable a partir de los parámetros de una
+    consulta (filtro, proyección, orden, página...).
+
+    Los diccionarios se serializan con las claves ordenadas, de modo que dos
+    filtros equivalentes escritos en distinto orden comparten entrada.
+
+    Returns:
+        str: La clave normalizada.
+    """
+    return json_util.dumps(parts, sort_keys=True)
+
+
+class QueryCache:
+    """
+    Caché LRU con TTL, segura para hilos y compartida entre sesiones.
+
+    Lleva contadores de aciertos, fallos, desalojos e invalidaciones.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 30.0, clock=time.monotonic):
+        """
+        Inicializa la caché.
+
+        Args:
+            max_entries (int, optional): Número máximo de entradas. Defaults to 1024.
+            ttl (float, optional): Segundos de vida de cada entrada. Defaults to 30.
+            clock (optional): Función que devuelve el tiempo actual en segundos.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[str, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._by_tag: Dict[str, Set[str]] = {}
+        # Se incrementa con cada invalidación; permite descartar resultados
+        # cargados mientras se producía una escritura
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _drop(self, key: str) -> None:
+        """
+        Elimina una entrada y sus referencias desde las etiquetas.
+        """
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Devuelve el valor en caché para `key`, o `default` si no existe o ha
+        expirado.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires, value, _ = entry
+            if expires <= self._clock():
+                self._drop(key)
+                self.evictions += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, tags: Iterable[str] = ()) -> None:
+        """
+        Guarda un valor, desalojando las entradas menos usadas si se supera
+        el tamaño máximo.
+
+        Args:
+            key (str): La clave de la entrada.
+            value (Any): El valor a guardar.
+            tags (Iterable[str], optional): Etiquetas para la invalidación.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            tags = tuple(tags)
+            self._entries[key] = (self._clock() + self.ttl, value, tags)
+            for tag in tags:
+                self._by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def get_or_load(self, key: str, loader: Callable[[], Any], tags: Iterable[str] = ()) -> Any:
+        """
+        Devuelve el valor en caché o lo calcula con `loader` y lo guarda.
+
+        Si durante la carga se invalida cualquier entrada, el resultado se
+        devuelve pero no se guarda, porque podría no reflejar esa escritura.
+
+        Args:
+            key (str): La clave de la entrada.
+            loader (Callable[[], Any]): Función que obtiene el valor real.
+            tags (Iterable[str], optional): Etiquetas para la invalidación.
+
+        Returns:
+            Any: El valor en caché o el recién cargado.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        generation = self._generation
+        value = loader()
+        with self._lock:
+            if generation == self._generation:
+                self.set(key, value, tags)
+        return value
+
+    async def get_or_load_async(
+        self, key: str, loader: Callable[[], Awaitable[Any]], tags: Iterable[str] = ()
+    ) -> Any:
+        """
+        Igual que `get_or_load`, pero con un `loader` asíncrono (una función
+        que devuelve un awaitable), para el `AsyncPokemonController`.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        generation = self._generation
+        value = await loader()
+        with self._lock:
+            if generation == self._generation:
+                self.set(key, value, tags)
+        return value
+
+    def invalidate(self, tag: str) -> int:
+        """
+        Elimina todas las entradas marcadas con `tag`.
+
+        Args:
+            tag (str): La etiqueta a invalidar.
+
+        Returns:
+            int: El número de entradas eliminadas.
+        """
+        with self._lock:
+            self._generation += 1
+            keys = list(self._by_tag.get(tag, ()))
+            for key in keys:
+                self._drop(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        """
+        Vacía la caché por completo (los contadores se conservan).
+        """
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._by_tag.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Devuelve los contadores de la caché.
+
+        Returns:
+            Dict[str, Any]: Entradas, aciertos, fallos, desalojos,
+                invalidaciones y tasa de aciertos.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo del registro de cambios para la sincronización incremental de copias.
+
+Los servicios que mantienen su propia copia de la Pokédex no necesitan
+releer la colección entera: `PokemonController.changes_since` devuelve los
+Pokémon creados o modificados después de una marca (`updated_at`, `_id`),
+en ese orden y a través del índice (`updated_at`, `_id`), junto con las
+lápidas de los borrados posteriores a la marca.
+
+Cada borrado del controlador (`delete`, `delete_many`, `bulk_delete` y los
+de `sync`) deja una lápida con el `_id` del Pokémon y la fecha del borrado
+en la colección `TOMBSTONES_COLLECTION`. Un índice TTL elimina las lápidas
+pasados `TOMBSTONE_TTL_DAYS` días: una copia cuya marca sea más antigua ya
+no puede saber qué se borró y debe volver a leerlo todo (ver
+`StaleWatermarkError`).
+"""
+
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+TOMBSTONES_COLLECTION = "pokemon_tombstones"
+
+# Días que se conservan las lápidas (y antigüedad máxima de una marca)
+TOMBSTONE_TTL_DAYS = float(os.getenv("TOMBSTONE_TTL_DAYS", "30"))
+
+# Segundos más recientes que no se devuelven todavía: una escritura sellada
+# con una fecha anterior a otra ya confirmada puede tardar en ser visible, y
+# una marca que ya la hubiera superado se la saltaría
+CHANGES_SETTLE_SECONDS = float(os.getenv("CHANGES_SETTLE_SECONDS", "5"))
+
+# Cambios por página de `changes_since`
+CHANGES_PAGE_SIZE = 1000
+
+# Campo de las marcas de los tokens de cambios (ver `controller.encode_cursor`)
+CHANGES_CURSOR = "updated_at"
+
+
+class StaleWatermarkError(ValueError):
+    """
+    La marca es más antigua que las lápidas que se conservan: los borrados
+    anteriores pueden haberse perdido y hace falta una lectura completa.
+    """
+
+
+def tombstone_op(oid: ObjectId, now: datetime) -> UpdateOne:
+    """
+    Operación que guarda (o renueva) la lápida de un Pokémon borrado con la
+    fecha `now`, del mismo reloj que se pasa a `check_watermark`.
+    """
+    return UpdateOne({"_id": oid}, {"$set": {"deleted_at": now}}, upsert=True)
+
+
+def check_watermark(since: Optional[datetime], now: datetime) -> None:
+    """
+    Comprueba que las lápidas posteriores a `since` no han caducado.
+
+    Raises:
+        StaleWatermarkError: Si `since` es anterior a la retención de las lápidas.
+    """
+    if since is not None and since < now - timedelta(days=TOMBSTONE_TTL_DAYS):
+        raise StaleWatermarkError(
+            f"La marca {since:%Y-%m-%d %H:%M} es anterior a los {TOMBSTONE_TTL_DAYS:g} "
+            "días de lápidas que se conservan: hace falta una lectura completa"
+        )
+
+
+def merge_changes(
+    docs: List[Dict[str, Any]], tombstones: List[Dict[str, Any]], limit: int
+) -> List[Dict[str, Any]]:
+    """
+    Mezcla los documentos y las lápidas, cada lista ya ordenada por
+    (fecha, `_id`), y se queda con los `limit` primeros cambios.
+
+    Los documentos sin `updated_at` (escritos antes de que existiera) van
+    primero, como en el orden de MongoDB.
+
+    Returns:
+        List[Dict[str, Any]]: Los cambios en orden; las lápidas llevan
+            'deleted_at' y los documentos 'updated_at'.
+    """
+    def position(change: Dict[str, Any]) -> Any:
+        at = change.get("deleted_at", change.get("updated_at"))
+        return (at is not None, at or datetime.min, change["_id"])
+
+    return sorted(docs + tombstones, key=position)[:limit]
@@ -7,37 +7,595 @@ la interacción con la base de datos de MongoDB para realizar
 operaciones CRUD (Crear, Leer, Actualizar, Eliminar) sobre los Pokémon.
 """
 
-from typing import List, Optional, Dict, Any
-from pymongo.collection import Collection
-from pymongo import ReturnDocument
-from datetime import datetime
-from bson import ObjectId
-from models import Pokemon, PyObjectId
+import base64
+import itertools
+import logging
+import os
+from typing import List, Optional, Dict, Any, Callable, Iterable, Iterator, Sequence, Set, Tuple
+from pymongo import ReturnDocument, UpdateOne, DeleteOne
+from pymongo.errors import BulkWriteError, PyMongoError
+from pydantic import ValidationError
+from datetime import datetime, timedelta
+from bson import ObjectId, json_util
+from cache import QueryCache, make_key
+from changes import (
+    CHANGES_CURSOR,
+    CHANGES_PAGE_SIZE,
+    CHANGES_SETTLE_SECONDS,
+    TOMBSTONES_COLLECTION,
+    check_watermark,
+    merge_changes,
+    tombstone_op,
+)
+from models import (
+    BulkResult,
+    ChangesPage,
+    Page,
+    Pokemon,
+    PokemonSummary,
+    PyObjectId,
+    SUMMARY_PROJECTION,
+    SyncResult,
+    TablePage,
+    from_trusted,
+)
+from tables import ATTACKS_TEXT, table_projection, to_arrow
+from normalize import NORMALIZED_FIELD, name_prefix_filter, normalize_name
+from sync import CONTENT_HASH_FIELD, content_hash, sync_key
 
+logger = logging.getLogger(__name__)
 
-class PokemonController:
+# Número máximo de operaciones por cada llamada a `bulk_write`
+BULK_BATCH_SIZE = 1000
+
+# Campos por los que se puede identificar un Pokémon en `bulk_upsert`
+UPSERT_KEYS = ("nombre", "pokedex_nacional")
+
+# Campos por los que se puede ordenar en la paginación por cursor. Cada uno
+# tiene un índice compuesto (campo, _id) que resuelve la consulta de página
+# (ver `indexes.py`).
+PAGE_SORT_KEYS = ("pokedex_nacional", "nombre", "nivel")
+
+# Número máximo de resultados de una búsqueda por nombre
+NAME_SEARCH_LIMIT = 200
+
+# Valida con Pydantic cada documento leído (solo para depurar: las lecturas
+# normales confían en los datos de la colección, que se validan al escribir)
+STRICT_READS = os.getenv("STRICT_READS", "0") == "1"
+
+# Orden de las búsquedas por ataque: el de sus índices multikey
+ATTACK_SORT = [("pokedex_nacional", 1), ("_id", 1)]
+
+# Un lote de `bulk_write` y los `_id` que borra, para dejar sus lápidas
+WriteBatch = Tuple[List[Any], List[ObjectId]]
+
+
+def _chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
     """
-    Controlador para manejar la colección 'pokemons' en MongoDB.
+    Divide un iterable en listas de como mucho `size` elementos.
+    """
+    chunk: List[Any] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
 
-    Proporciona un conjunto completo de métodos para realizar operaciones
-    CRUD (Crear, Leer, Actualizar, Eliminar) y búsqueda por nombre.
+
+class InvalidPageError(ValueError):
+    """
+    La ordenación o el token de una página no son válidos: es un error de
+    los argumentos de quien llama, no de la base de datos.
+    """
+
+
+def encode_cursor(sort_by: str, value: Any, oid: ObjectId) -> str:
+    """
+    Codifica la posición de un documento en un token de continuación opaco.
+
+    Args:
+        sort_by (str): El campo de ordenación de la página.
+        value (Any): El valor de ese campo en el documento.
+        oid (ObjectId): El `_id` del documento, que desempata valores iguales.
+
+    Returns:
+        str: El token en base64 apto para URLs.
+    """
+    raw = json_util.dumps({"s": sort_by, "v": value, "id": oid})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, sort_by: str) -> Tuple[Any, ObjectId]:
+    """
+    Decodifica un token generado por `encode_cursor`.
+
+    Args:
+        token (str): El token de continuación.
+        sort_by (str): El campo de ordenación esperado.
+
+    Raises:
+        InvalidPageError: Si el token está mal formado o es de otra ordenación.
+
+    Returns:
+        Tuple[Any, ObjectId]: El valor de ordenación y el `_id`.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json_util.loads(raw.decode("utf-8"))
+        value, oid = data["v"], data["id"]
+    except Exception:
+        raise InvalidPageError("Token de paginación inválido")
+    if data.get("s") != sort_by or not isinstance(oid, ObjectId):
+        raise InvalidPageError("El token de paginación no corresponde a esta ordenación")
+    return value, oid
+
+
+def _keyset_filter(sort_by: str, value: Any, oid: ObjectId, forward: bool) -> Dict[str, Any]:
+    """
+    Filtro que selecciona los documentos posteriores (o anteriores) a la
+    posición (`value`, `oid`) en el orden ascendente (sort_by, _id).
+
+    MongoDB ordena los nulos y los campos ausentes antes que cualquier otro
+    valor, así que se tratan como el menor valor posible.
+    """
+    op = "$gt" if forward else "$lt"
+    if value is None:
+        tie = {sort_by: None, "_id": {op: oid}}
+        return {"$or": [tie, {sort_by: {"$ne": None}}]} if forward else tie
+    clauses = [{sort_by: {op: value}}, {sort_by: value, "_id": {op: oid}}]
+    if not forward:
+        clauses.append({sort_by: None})
+    return {"$or": clauses}
+
+
+def _read_shape(summary: bool) -> Tuple[Optional[Dict[str, int]], Any]:
+    """
+    Proyección y modelo de lectura para una consulta.
+
+    Args:
+        summary (bool): Si es True, la versión ligera (`PokemonSummary`).
+
+    Returns:
+        Tuple[Optional[Dict[str, int]], Any]: La proyección de MongoDB (None
+            para el documento completo) y la clase del modelo.
+    """
+    return (SUMMARY_PROJECTION, PokemonSummary) if summary else (None, Pokemon)
+
+
+def attack_filter(nombre: str = "", tipo: str = "") -> Dict[str, Any]:
+    """
+    Construye el filtro de los Pokémon que conocen un ataque.
+
+    Se resuelve con los índices multikey de `ataques.nombre` y `ataques.tipo`
+    (ver `indexes.py`). Con nombre y tipo a la vez, ambos deben coincidir en
+    el mismo ataque.
+
+    Args:
+        nombre (str, optional): Nombre exacto del ataque.
+        tipo (str, optional): Tipo exacto del ataque.
+
+    Returns:
+        Dict[str, Any]: El filtro de MongoDB (vacío si no se indica nada).
+    """
+    if nombre and tipo:
+        return {"ataques": {"$elemMatch": {"nombre": nombre, "tipo": tipo}}}
+    if nombre:
+        return {"ataques.nombre": nombre}
+    if tipo:
+        return {"ataques.tipo": tipo}
+    return {}
+
+
+def listing_filter(
+    nombre: str = "",
+    region: str = "",
+    min_pokedex: int = 0,
+    ataque: str = "",
+    tipo_ataque: str = "",
+) -> Dict[str, Any]:
+    """
+    Construye el filtro de MongoDB de la página de Listado.
+
+    Args:
+        nombre (str, optional): Prefijo del nombre, sin acentos ni mayúsculas.
+        region (str, optional): Texto contenido en la región (sin distinguir
+            mayúsculas).
+        min_pokedex (int, optional): Pokedex nacional mínimo (0 = sin filtro).
+        ataque (str, optional): Nombre exacto de un ataque que deben conocer.
+        tipo_ataque (str, optional): Tipo de alguno de sus ataques.
+
+    Returns:
+        Dict[str, Any]: El filtro de MongoDB.
+    """
+    filtro: Dict[str, Any] = {}
+    if nombre:
+        # Búsqueda por prefijo sin acentos ni mayúsculas, resuelta con índice
+        filtro.update(name_prefix_filter(nombre))
+    if region:
+        filtro["region"] = {"$regex": region, "$options": "i"}
+    if min_pokedex > 0:
+        filtro["pokedex_nacional"] = {"$gte": min_pokedex}
+    filtro.update(attack_filter(ataque, tipo_ataque))
+    return filtro
+
+
+def _stamped_pipeline(fields: Dict[str, Any], now: datetime) -> List[Dict[str, Any]]:
+    """
+    Construye un pipeline de actualización que asigna `fields` y sella las
+    marcas de tiempo con `now`.
+
+    `now` sale de `_now()` del controlador, el mismo reloj que usan
+    `insert`, `update` y la ventana de asentamiento de `changes_since`; con
+    `$$NOW` las escrituras masivas quedarían fechadas con otro reloj y
+    podrían caer al otro lado de una marca de agua.
+
+    'created_at' solo se asigna si el documento no lo tenía (inserción), y
+    'updated_at' se asigna siempre. La versión empieza en 0 al insertar y se
+    incrementa al sobrescribir. Los valores se envuelven en `$literal` para
+    que cadenas que empiecen por '$' no se interpreten como rutas.
+
+    Salvo que `fields` la incluya (ver `PokemonController.sync`), se elimina
+    la huella de contenido: el documento ya no coincide con su origen.
+    """
+    values = {k: {"$literal": v} for k, v in fields.items()}
+    values.setdefault(CONTENT_HASH_FIELD, "$$REMOVE")
+    values["created_at"] = {"$ifNull": ["$created_at", {"$literal": now}]}
+    values["updated_at"] = {"$literal": now}
+    values["version"] = {"$add": [{"$ifNull": ["$version", -1]}, 1]}
+    return [{"$set": values}]
+
+
+def _attack_dicts(ataques: Optional[Iterable[Any]]) -> List[Dict[str, Any]]:
+    """
+    Convierte los ataques de un modelo (o de un payload) en diccionarios.
+    """
+    return [
+        a if isinstance(a, dict) else {"nombre": a.nombre, "tipo": a.tipo}
+        for a in ataques or []
+    ]
+
+
+def diff_update(original: Any, fields: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Construye la actualización mínima que lleva `original` a `fields`.
+
+    Solo se escriben los campos que cambian. Si los ataques solo se añaden al
+    final se usa `$push`, y si solo se quitan, `$pull`; cualquier otro cambio
+    (reordenar, o añadir y quitar a la vez, que MongoDB no admite sobre la
+    misma ruta) reescribe la lista con `$set`.
+
+    Args:
+        original (Any): El Pokémon tal como se cargó (modelo o registro).
+        fields (Dict[str, Any]): Los valores nuevos, p. ej. los del formulario.
+
+    Returns:
+        Dict[str, Any]: La actualización de MongoDB (vacía si no hay cambios),
+            sin las marcas de tiempo ni la versión.
+    """
+    changes: Dict[str, Any] = {
+        k: v for k, v in fields.items() if k != "ataques" and getattr(original, k, None) != v
+    }
+    if changes.get("nombre"):
+        changes[NORMALIZED_FIELD] = normalize_name(changes["nombre"])
+    update: Dict[str, Any] = {"$set": changes} if changes else {}
+
+    if "ataques" in fields:
+        old, new = _attack_dicts(original.ataques), _attack_dicts(fields["ataques"])
+        removed = [a for a in old if a not in new]
+        if old == new:
+            pass
+        elif not removed and new[:len(old)] == old:
+            update["$push"] = {"ataques": {"$each": new[len(old):]}}
+        elif len(new) < len(old) and [a for a in old if a not in removed] == new:
+            update["$pull"] = {"ataques": {"$in": removed}}
+        else:
+            update.setdefault("$set", {})["ataques"] = new
+    return update
+
+
+def _apply_update(
+    doc: Dict[str, Any], update: Dict[str, Any], fields: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Aplica en local una actualización de `diff_update` al documento anterior,
+    para obtener el documento nuevo sin volver a leerlo.
+    """
+    new = {**doc, **update.get("$set", {})}
+    for key in update.get("$unset", {}):
+        new.pop(key, None)
+    if "$push" in update or "$pull" in update:
+        new["ataques"] = _attack_dicts(fields["ataques"])
+    for key, amount in update.get("$inc", {}).items():
+        new[key] = (new.get(key) or 0) + amount
+    return new
+
+
+def _version_filter(oid: ObjectId, version: int) -> Dict[str, Any]:
+    """
+    Filtro de un documento en una versión concreta. Los documentos escritos
+    antes de existir el campo no lo tienen y se consideran de la versión 0.
+    """
+    if version == 0:
+        return {"_id": oid, "version": {"$in": [0, None]}}
+    return {"_id": oid, "version": version}
+
+
+def _page_query(
+    filter: Optional[Dict[str, Any]],
+    sort_by: str,
+    after: Optional[str],
+    before: Optional[str],
+) -> Tuple[Dict[str, Any], List[Tuple[str, int]], bool, Optional[str]]:
+    """
+    Construye la consulta de una página por cursor (keyset).
+
+    Returns:
+        Tuple[Dict[str, Any], List[Tuple[str, int]], bool, Optional[str]]:
+            El filtro, la ordenación, si se avanza (True) o retrocede y el
+            token del que se parte.
+    """
+    forward = before is None
+    token = after if forward else before
+    clauses = [filter] if filter else []
+    if token:
+        value, oid = decode_cursor(token, sort_by)
+        clauses.append(_keyset_filter(sort_by, value, oid, forward))
+    query = {"$and": clauses} if len(clauses) > 1 else (clauses[0] if clauses else {})
+    direction = 1 if forward else -1
+    return query, [(sort_by, direction), ("_id", direction)], forward, token
+
+
+def _page_result(
+    docs: List[Dict[str, Any]],
+    sort_by: str,
+    page_size: int,
+    forward: bool,
+    token: Optional[str],
+) -> Tuple[List[Dict[str, Any]], Optional[str], Optional[str]]:
+    """
+    Recorta los `page_size + 1` documentos leídos para una página y calcula
+    los tokens de las páginas vecinas.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], Optional[str], Optional[str]]: Los
+            documentos en orden ascendente y los tokens de las páginas
+            anterior y siguiente (None si no existen).
+    """
+    has_more = len(docs) > page_size
+    docs = docs[:page_size]
+    if not forward:
+        docs.reverse()
+
+    prev_token = next_token = None
+    if docs:
+        first, last = docs[0], docs[-1]
+        # Al avanzar, hay página anterior si se partió de un token; al
+        # retroceder, siempre hay página siguiente (la que se dejó atrás)
+        has_prev = token is not None if forward else has_more
+        has_next = has_more if forward else True
+        if has_prev:
+            prev_token = encode_cursor(sort_by, first.get(sort_by), first["_id"])
+        if has_next:
+            next_token = encode_cursor(sort_by, last.get(sort_by), last["_id"])
+    return docs, prev_token, next_token
+
+
+def changes_token(since: datetime) -> str:
     """
+    Token de `changes_since` que parte de una fecha, para la primera lectura
+    incremental de una copia cargada por otra vía.
 
-    def __init__(self, collection: Collection):
+    Args:
+        since (datetime): Fecha (UTC) desde la que se quieren los cambios.
+
+    Returns:
+        str: El token.
+    """
+    return encode_cursor(CHANGES_CURSOR, since, ObjectId("0" * 24))
+
+
+# Orden del registro de cambios, servido por los índices (fecha, _id)
+CHANGES_SORT = [("updated_at", 1), ("_id", 1)]
+TOMBSTONES_SORT = [("deleted_at", 1), ("_id", 1)]
+
+
+def _changes_queries(
+    token: Optional[str], now: datetime
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Consultas de los documentos y de las lápidas posteriores a la marca de
+    `token` (todos si es None) y anteriores a los últimos
+    `CHANGES_SETTLE_SECONDS` segundos.
+
+    Raises:
+        InvalidPageError: Si el token es inválido.
+        StaleWatermarkError: Si la marca es anterior a las lápidas conservadas.
+    """
+    settled = now - timedelta(seconds=CHANGES_SETTLE_SECONDS)
+    # `$not $gt` incluye los documentos sin `updated_at`, que van primero
+    docs = [{"updated_at": {"$not": {"$gt": settled}}}]
+    tombstones = [{"deleted_at": {"$lte": settled}}]
+    if token:
+        since, oid = decode_cursor(token, CHANGES_CURSOR)
+        check_watermark(since, now)
+        docs.append(_keyset_filter("updated_at", since, oid, True))
+        tombstones.append(_keyset_filter("deleted_at", since, oid, True))
+    return {"$and": docs}, {"$and": tombstones}
+
+
+def _text_query(name: str, seen: List[ObjectId]) -> Dict[str, Any]:
+    """
+    Consulta de texto que completa una búsqueda por nombre con los Pokémon
+    que contienen alguna palabra del nombre y no se encontraron por prefijo.
+    """
+    return {"$text": {"$search": normalize_name(name)}, "_id": {"$nin": seen}}
+
+
+def _count_by_pipeline(field: str) -> List[Dict[str, Any]]:
+    """
+    Pipeline que agrupa por `field` y cuenta, de mayor a menor recuento.
+    """
+    return [
+        {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+    ]
+
+
+def _insert_ops(
+    fields: Iterable[Dict[str, Any]], clock: Callable[[], datetime]
+) -> Iterator[UpdateOne]:
+    """
+    Operaciones de `bulk_insert`: un upsert sobre un `_id` nuevo por
+    documento, sellado con `clock()` en el momento de generarlo.
+    """
+    for f in fields:
+        yield UpdateOne({"_id": ObjectId()}, _stamped_pipeline(f, clock()), upsert=True)
+
+
+def _upsert_ops(
+    chunk: List[Dict[str, Any]], key: str, result: BulkResult, now: datetime
+) -> List[UpdateOne]:
+    """
+    Operaciones de un lote de `bulk_upsert`, selladas con `now`. Si el lote
+    contiene varias veces la misma clave, solo se conserva la última
+    aparición; los documentos sin clave se cuentan como fallidos en `result`.
+    """
+    by_key: Dict[Any, Dict[str, Any]] = {}
+    for fields in chunk:
+        if fields.get(key) is None:
+            result.failed += 1
+            result.errors.append(f"Falta el campo '{key}' en {fields['nombre']}")
+            continue
+        by_key[fields[key]] = fields
+    return [
+        UpdateOne({key: k}, _stamped_pipeline(fields, now), upsert=True)
+        for k, fields in by_key.items()
+    ]
+
+
+def _sync_pending(
+    chunk: List[Any], key: str, seen: Set[Any], result: SyncResult
+) -> Dict[Any, Dict[str, Any]]:
+    """
+    Registros de un lote de `sync` por su clave, convertida con `sync_key` y
+    ya sustituida en el registro. Los que no tienen clave, la tienen
+    inválida o la repiten (en el lote o en uno anterior, según `seen`) se
+    cuentan como fallidos en `result`.
+    """
+    pending: Dict[Any, Dict[str, Any]] = {}
+    for doc in chunk:
+        raw = doc.get(key) if isinstance(doc, dict) else None
+        try:
+            k = sync_key(raw, key)
+        except ValueError:
+            result.failed += 1
+            result.errors.append(f"Clave inválida en el origen: {raw!r}")
+            continue
+        if k is None:
+            result.failed += 1
+            result.errors.append(f"Falta el campo '{key}'")
+        elif k in seen:
+            result.failed += 1
+            result.errors.append(f"Clave repetida en el origen: {k}")
+        else:
+            seen.add(k)
+            pending[k] = {**doc, key: k}
+    return pending
+
+
+def _stored_hashes_query(
+    key: str, pending: Dict[Any, Dict[str, Any]]
+) -> Tuple[Dict[str, Any], Dict[str, int]]:
+    """
+    Filtro y proyección que leen las huellas guardadas de las claves de un
+    lote de `sync`, a través del índice (`key`, `content_hash`).
+    """
+    return {key: {"$in": list(pending)}}, {key: 1, CONTENT_HASH_FIELD: 1, "_id": 0}
+
+
+def _delete_ids(ids: Iterable[str], result: BulkResult) -> Iterator[ObjectId]:
+    """
+    ObjectId de `bulk_delete`; los IDs inválidos se cuentan como fallidos.
+    """
+    for id_str in ids:
+        try:
+            yield PyObjectId.validate(id_str)
+        except ValueError:
+            result.failed += 1
+            result.errors.append(f"ID inválido: {id_str}")
+
+
+def _delete_batches(oids: Iterable[ObjectId], size: int) -> Iterator[WriteBatch]:
+    """
+    Lotes de `DeleteOne` por `_id`, cada uno con la lista de los `_id` que
+    borra.
+    """
+    for chunk in _chunks(oids, size):
+        yield [DeleteOne({"_id": oid}) for oid in chunk], chunk
+
+
+def _backfill_op(doc: Dict[str, Any]) -> UpdateOne:
+    """
+    Operación que calcula el nombre normalizado de un documento existente.
+    """
+    return UpdateOne(
+        {"_id": doc["_id"]},
+        {"$set": {NORMALIZED_FIELD: normalize_name(doc.get("nombre"))}},
+    )
+
+
+class VersionConflictError(Exception):
+    """
+    El Pokémon se modificó desde que se cargó: la actualización se rechaza
+    para no sobrescribir esos cambios.
+    """
+
+
+class _BaseController:
+    """
+    Parte común de `PokemonController` y `AsyncPokemonController`: la
+    configuración, la decodificación de documentos, la caché, los hooks y la
+    validación, es decir, todo lo que no realiza operaciones de E/S.
+    """
+
+    def __init__(
+        self,
+        collection: Any,
+        cache: Optional[QueryCache] = None,
+        hooks: Sequence[Any] = (),
+        strict_reads: bool = False,
+    ):
         """
         Inicializa el controlador con una colección de PyMongo.
 
-        Además, crea índices en la colección para mejorar el rendimiento
-        de las consultas más frecuentes.
+        No realiza ninguna operación contra el servidor: los índices que
+        necesitan las consultas se declaran en `indexes.py` y se aplican una
+        vez por proceso.
 
         Args:
-            collection (Collection): La colección de MongoDB a utilizar.
+            collection (Any): La colección de MongoDB a utilizar (síncrona o
+                asíncrona, según el controlador).
+            cache (Optional[QueryCache], optional): Caché de lecturas compartida.
+                Si se indica, las consultas se sirven desde ella y las escrituras
+                de este controlador invalidan las entradas afectadas.
+                Defaults to None.
+            hooks (Sequence[Any], optional): Objetos avisados tras cada
+                escritura. Deben implementar `on_write(before, after)` con los
+                documentos antes y después de una escritura individual, y
+                `on_bulk_write()` tras una escritura masiva. Defaults to ().
+            strict_reads (bool, optional): Si es True, los documentos leídos
+                se validan con Pydantic como en las escrituras, en lugar de
+                construirse directamente (útil para depurar datos escritos
+                fuera de la aplicación). Defaults to False.
         """
         self.col = collection
-
-        # Índices recomendados para optimizar las búsquedas
-        self.col.create_index("nombre", unique=False)
-        self.col.create_index("pokedex_nacional", unique=False)
+        # Lápidas de los borrados, para `changes_since` (ver `changes.py`)
+        self.tombstones = collection.database[TOMBSTONES_COLLECTION]
+        self.cache = cache
+        self.hooks = list(hooks)
+        self.strict_reads = strict_reads
 
     def _now(self) -> datetime:
         """
@@ -48,6 +606,226 @@ class PokemonController:
         """
         return datetime.utcnow()
 
+    def decode(self, model: Any, doc: Dict[str, Any]) -> Any:
+        """
+        Convierte un documento leído de la colección en una instancia de `model`.
+
+        Las lecturas confían en los datos de la colección (solo se escriben
+        tras validarlos) y usan `from_trusted`; con `strict_reads` se validan.
+
+        Args:
+            model (Any): La clase del modelo, p. ej. `Pokemon`.
+            doc (Dict[str, Any]): El documento de MongoDB.
+
+        Returns:
+            Any: La instancia del modelo.
+        """
+        if self.strict_reads:
+            return model.model_validate(doc)
+        return from_trusted(model, doc)
+
+    @staticmethod
+    def _with_search_keys(fields: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Añade (o recalcula) el nombre normalizado si `fields` incluye el nombre.
+
+        Args:
+            fields (Dict[str, Any]): Los campos a escribir; se modifican en sitio.
+
+        Returns:
+            Dict[str, Any]: El mismo diccionario.
+        """
+        if fields.get("nombre"):
+            fields[NORMALIZED_FIELD] = normalize_name(fields["nombre"])
+        return fields
+
+    # -------------------
+    # CACHÉ
+    # -------------------
+    def _cache_entry(
+        self, key_parts: Tuple[Any, ...], oid: Optional[ObjectId] = None
+    ) -> Tuple[str, Tuple[str, str]]:
+        """
+        Clave y etiquetas de caché de una lectura.
+
+        Las lecturas de un documento concreto se etiquetan con su `_id`; el
+        resto, como consultas de la colección. Todas llevan además la
+        etiqueta del espacio de nombres para poder invalidarlas en bloque.
+        """
+        ns = self.col.full_name
+        tag = f"{ns}:id:{oid}" if oid is not None else f"{ns}:queries"
+        return make_key(ns, *key_parts), (ns, tag)
+
+    def _invalidate(self, oid: Optional[ObjectId] = None, everything: bool = False) -> None:
+        """
+        Invalida las entradas de la caché afectadas por una escritura.
+
+        Args:
+            oid (Optional[ObjectId], optional): El documento modificado; sus
+                lecturas por id también se invalidan. Defaults to None.
+            everything (bool, optional): Invalida todo el espacio de nombres,
+                para escrituras que afectan a documentos no conocidos.
+        """
+        if self.cache is None:
+            return
+        ns = self.col.full_name
+        if everything:
+            self.cache.invalidate(ns)
+            return
+        self.cache.invalidate(f"{ns}:queries")
+        if oid is not None:
+            self.cache.invalidate(f"{ns}:id:{oid}")
+
+    def _notify(
+        self, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]
+    ) -> None:
+        """
+        Avisa a los hooks de una escritura individual. Un fallo en un hook
+        se registra pero no anula la escritura, que ya se ha realizado.
+        """
+        for hook in self.hooks:
+            try:
+                hook.on_write(before, after)
+            except Exception:
+                logger.exception("Error en el hook de escritura %r", hook)
+
+    def _notify_bulk(self) -> None:
+        """
+        Avisa a los hooks de una escritura masiva.
+        """
+        for hook in self.hooks:
+            try:
+                hook.on_bulk_write()
+            except Exception:
+                logger.exception("Error en el hook de escritura %r", hook)
+
+    def _update_plan(
+        self, oid: ObjectId, update_fields: Dict[str, Any], original: Optional[Any]
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Filtro y actualización de MongoDB de `update`.
+
+        Sin `original`, se asignan todos los campos con `$set`. Con él, solo
+        los que cambian (ver `diff_update`) y el filtro exige que la versión
+        no haya cambiado desde que se cargó.
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, Any]]: El filtro y la
+                actualización (vacía si no hay nada que escribir).
+        """
+        if original is None:
+            update: Dict[str, Any] = {"$set": self._with_search_keys(update_fields)}
+            filter = {"_id": oid}
+        else:
+            update = diff_update(original, update_fields)
+            filter = _version_filter(oid, original.version)
+        if update:
+            update.setdefault("$set", {})["updated_at"] = self._now()
+            update["$inc"] = {"version": 1}
+            # Editado fuera de la sincronización: ya no coincide con su origen
+            update["$unset"] = {CONTENT_HASH_FIELD: ""}
+        return filter, update
+
+    # -------------------
+    # VALIDACIÓN
+    # -------------------
+    @staticmethod
+    def _check_sort(sort_by: str) -> None:
+        """
+        Comprueba que `sort_by` es una ordenación de página admitida.
+
+        Raises:
+            InvalidPageError: Si no está en `PAGE_SORT_KEYS`.
+        """
+        if sort_by not in PAGE_SORT_KEYS:
+            raise InvalidPageError(f"Ordenación no admitida: {sort_by}")
+
+    def _validated_fields(
+        self, payloads: Iterable[Dict[str, Any]], result: BulkResult
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Valida cada payload con el modelo `Pokemon` y devuelve sus campos
+        listos para escribir, sin '_id' ni marcas de tiempo.
+
+        Los payloads inválidos se contabilizan como fallidos en `result`.
+        """
+        for payload in payloads:
+            try:
+                pokemon = Pokemon.model_validate(payload)
+            except ValidationError as e:
+                result.failed += 1
+                result.errors.append(str(e))
+                continue
+            fields = pokemon.model_dump(exclude={"id", "created_at", "updated_at", "version"})
+            yield self._with_search_keys(fields)
+
+    def _sync_ops(
+        self,
+        pending: Dict[Any, Dict[str, Any]],
+        stored: Dict[Any, Optional[str]],
+        key: str,
+        seen: Set[Any],
+        result: SyncResult,
+    ) -> Iterator[UpdateOne]:
+        """
+        Upserts de los registros de un lote de `sync` que son nuevos o cuya
+        huella no coincide con la guardada en `stored`; el resto se cuentan
+        como sin cambios.
+        """
+        for k, doc in pending.items():
+            digest = content_hash(doc)
+            if stored.get(k) == digest:
+                result.unchanged += 1
+                continue
+            for fields in self._validated_fields([doc], result):
+                fields[CONTENT_HASH_FIELD] = digest
+                stamped = _stamped_pipeline(fields, self._now())
+                yield UpdateOne({key: fields[key]}, stamped, upsert=True)
+
+    def _changes_page(
+        self,
+        docs: List[Dict[str, Any]],
+        tombstones: List[Dict[str, Any]],
+        limit: int,
+        token: Optional[str],
+    ) -> ChangesPage:
+        """
+        Construye una página del registro de cambios a partir de los
+        `limit + 1` documentos y lápidas leídos de cada colección.
+        """
+        changes = merge_changes(docs, tombstones, limit)
+        next_token = token
+        if changes:
+            last = changes[-1]
+            at = last.get("deleted_at", last.get("updated_at"))
+            next_token = encode_cursor(CHANGES_CURSOR, at, last["_id"])
+        return ChangesPage(
+            items=[self.decode(Pokemon, d) for d in changes if "deleted_at" not in d],
+            deleted=[d for d in changes if "deleted_at" in d],
+            next_token=next_token,
+            has_more=len(docs) + len(tombstones) > limit,
+        )
+
+
+class PokemonController(_BaseController):
+    """
+    Controlador para manejar la colección 'pokemons' en MongoDB.
+
+    Proporciona un conjunto completo de métodos para realizar operaciones
+    CRUD (Crear, Leer, Actualizar, Eliminar) y búsqueda por nombre.
+    """
+
+    def _cached(self, key_parts: Tuple[Any, ...], loader, oid: Optional[ObjectId] = None):
+        """
+        Sirve una lectura desde la caché o la ejecuta con `loader`.
+
+        Los valores devueltos se comparten entre sesiones: no deben modificarse.
+        """
+        if self.cache is None:
+            return loader()
+        key, tags = self._cache_entry(key_parts, oid)
+        return self.cache.get_or_load(key, loader, tags)
+
     # -------------------
     # CREATE
     # -------------------
@@ -65,10 +843,13 @@ class PokemonController:
             Pokemon: El objeto Pokémon insertado, validado con Pydantic.
         """
         now = self._now()
-        payload.update({"created_at": now, "updated_at": now})
+        payload.update({"created_at": now, "updated_at": now, "version": 0})
+        self._with_search_keys(payload)
 
         res = self.col.insert_one(payload)
+        self._invalidate()
         doc = self.col.find_one({"_id": res.inserted_id})
+        self._notify(None, doc)
         return Pokemon.model_validate(doc)  # Pydantic v2
 
     # -------------------
@@ -90,11 +871,18 @@ class PokemonController:
         except Exception:
             return None
 
-        doc = self.col.find_one({"_id": oid})
-        return Pokemon.model_validate(doc) if doc else None
+        def load() -> Optional[Pokemon]:
+            doc = self.col.find_one({"_id": oid})
+            return self.decode(Pokemon, doc) if doc else None
+
+        return self._cached(("find_by_id", oid), load, oid=oid)
 
     def find(
-        self, filter: Optional[Dict[str, Any]] = None, limit: int = 50, skip: int = 0
+        self,
+        filter: Optional[Dict[str, Any]] = None,
+        limit: int = 50,
+        skip: int = 0,
+        summary: bool = False,
     ) -> List[Pokemon]:
         """
         Busca Pokémon con un filtro opcional y paginación.
@@ -105,46 +893,330 @@ class PokemonController:
             limit (int, optional): Número máximo de documentos a retornar. Defaults to 50.
             skip (int, optional): Número de documentos a saltar (para paginación).
                                   Defaults to 0.
+            summary (bool, optional): Si es True, solo se leen los campos de
+                                      `PokemonSummary`. Defaults to False.
 
         Returns:
-            List[Pokemon]: Una lista de instancias de Pokémon.
+            List[Pokemon]: Una lista de instancias de Pokémon (o de
+                           `PokemonSummary` si `summary` es True).
         """
         f = filter or {}
-        cursor = self.col.find(f).skip(skip).limit(limit)
-        return [Pokemon.model_validate(d) for d in cursor]
+        projection, model = _read_shape(summary)
+
+        def load() -> List[Pokemon]:
+            cursor = self.col.find(f, projection).skip(skip).limit(limit)
+            return [self.decode(model, d) for d in cursor]
+
+        return self._cached(("find", f, limit, skip, summary), load)
 
-    def find_by_name(self, name: str, exact: bool = False) -> List[Pokemon]:
+    def find_page(
+        self,
+        filter: Optional[Dict[str, Any]] = None,
+        sort_by: str = "pokedex_nacional",
+        page_size: int = 50,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        summary: bool = False,
+        cached: bool = True,
+    ) -> Page:
+        """
+        Busca una página de Pokémon con paginación por cursor (keyset).
+
+        En lugar de saltar documentos con `skip`, cada página continúa desde
+        la posición (valor de ordenación, `_id`) codificada en el token, de
+        modo que el coste de la página N es el mismo que el de la primera.
+
+        Args:
+            filter (Optional[Dict[str, Any]], optional): Diccionario de consulta
+                de MongoDB. Defaults to None.
+            sort_by (str, optional): Uno de `PAGE_SORT_KEYS`.
+                Defaults to "pokedex_nacional".
+            page_size (int, optional): Documentos por página. Defaults to 50.
+            after (Optional[str], optional): Token `next_token` de una página
+                anterior, para avanzar. Defaults to None.
+            before (Optional[str], optional): Token `prev_token` de una página
+                anterior, para retroceder. Defaults to None.
+            summary (bool, optional): Si es True, la página contiene
+                `PokemonSummary` en lugar de documentos completos.
+                Defaults to False.
+            cached (bool, optional): Si es False, la página se lee sin pasar
+                por la caché de consultas (p. ej. al recorrer todo un
+                resultado, cuyas páginas no se vuelven a pedir y desalojarían
+                las de los usuarios). Defaults to True.
+
+        Raises:
+            InvalidPageError: Si `sort_by` no está admitido o un token es inválido.
+
+        Returns:
+            Page: Los Pokémon de la página y los tokens de las páginas vecinas.
+        """
+        projection, model = _read_shape(summary)
+
+        def load() -> Page:
+            docs, prev_token, next_token = self._fetch_page(
+                filter, sort_by, page_size, after, before, projection
+            )
+            return Page(
+                items=[self.decode(model, d) for d in docs],
+                prev_token=prev_token,
+                next_token=next_token,
+            )
+
+        self._check_sort(sort_by)
+        if not cached:
+            return load()
+        return self._cached(
+            ("find_page", filter or {}, sort_by, page_size, after, before, summary),
+            load,
+        )
+
+    def find_page_table(
+        self,
+        filter: Optional[Dict[str, Any]] = None,
+        sort_by: str = "pokedex_nacional",
+        page_size: int = 50,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        attacks: Optional[str] = ATTACKS_TEXT,
+    ) -> TablePage:
+        """
+        Igual que `find_page`, pero devuelve las filas como una tabla de Arrow
+        construida directamente de los documentos, sin modelos intermedios.
+
+        Args:
+            filter (Optional[Dict[str, Any]], optional): Diccionario de consulta
+                de MongoDB. Defaults to None.
+            sort_by (str, optional): Uno de `PAGE_SORT_KEYS`.
+                Defaults to "pokedex_nacional".
+            page_size (int, optional): Documentos por página. Defaults to 50.
+            after (Optional[str], optional): Token para avanzar. Defaults to None.
+            before (Optional[str], optional): Token para retroceder. Defaults to None.
+            attacks (Optional[str], optional): Representación de los ataques
+                (ver `tables.table_schema`). Defaults to texto.
+
+        Raises:
+            InvalidPageError: Si `sort_by` no está admitido o un token es inválido.
+
+        Returns:
+            TablePage: La tabla de la página y los tokens de las páginas vecinas.
+        """
+        projection = table_projection(attacks)
+
+        def load() -> TablePage:
+            docs, prev_token, next_token = self._fetch_page(
+                filter, sort_by, page_size, after, before, projection
+            )
+            return TablePage(
+                table=to_arrow(docs, attacks=attacks),
+                prev_token=prev_token,
+                next_token=next_token,
+            )
+
+        self._check_sort(sort_by)
+        return self._cached(
+            ("find_page_table", filter or {}, sort_by, page_size, after, before, attacks),
+            load,
+        )
+
+    def _fetch_page(
+        self,
+        filter: Optional[Dict[str, Any]],
+        sort_by: str,
+        page_size: int,
+        after: Optional[str],
+        before: Optional[str],
+        projection: Optional[Dict[str, int]],
+    ) -> Tuple[List[Dict[str, Any]], Optional[str], Optional[str]]:
+        """
+        Lee los documentos de una página por cursor (keyset).
+
+        Returns:
+            Tuple[List[Dict[str, Any]], Optional[str], Optional[str]]: Los
+                documentos en orden ascendente y los tokens de las páginas
+                anterior y siguiente (None si no existen).
+        """
+        query, sort, forward, token = _page_query(filter, sort_by, after, before)
+        docs = list(self.col.find(query, projection).sort(sort).limit(page_size + 1))
+        return _page_result(docs, sort_by, page_size, forward, token)
+
+    def find_by_name(
+        self, name: str, exact: bool = False, summary: bool = False
+    ) -> List[Pokemon]:
         """
         Busca Pokémon por nombre.
 
+        La búsqueda parcial no distingue mayúsculas ni acentos y siempre usa un
+        índice: primero busca los nombres que empiezan por el texto (rango
+        sobre `nombre_norm`) y, si quedan huecos, completa con el índice de
+        texto, que encuentra palabras completas en cualquier posición del
+        nombre (p. ej. "koko" en "Tapu Koko").
+
         Args:
             name (str): El nombre del Pokémon a buscar.
             exact (bool, optional): Si es True, busca el nombre exacto. Si es False,
-                                    realiza una búsqueda parcial (regex, case-insensitive).
+                                    realiza una búsqueda por prefijo y por palabras.
                                     Defaults to False.
+            summary (bool, optional): Si es True, devuelve `PokemonSummary`.
+                                      Defaults to False.
 
         Returns:
             List[Pokemon]: Una lista de Pokémon que coinciden con la búsqueda.
         """
         if exact:
-            filter_query = {"nombre": name}
-        else:
-            filter_query = {"nombre": {"$regex": name, "$options": "i"}}
+            return self.find({"nombre": name}, limit=NAME_SEARCH_LIMIT, summary=summary)
+
+        prefix_filter = name_prefix_filter(name)
+        if not prefix_filter:
+            return self.find({}, limit=NAME_SEARCH_LIMIT, summary=summary)
+        projection, model = _read_shape(summary)
+
+        def load() -> List[Pokemon]:
+            cursor = (
+                self.col.find(prefix_filter, projection)
+                .sort(NORMALIZED_FIELD, 1)
+                .limit(NAME_SEARCH_LIMIT)
+            )
+            docs = list(cursor)
+            if len(docs) < NAME_SEARCH_LIMIT:
+                text_query = _text_query(name, [d["_id"] for d in docs])
+                remaining = NAME_SEARCH_LIMIT - len(docs)
+                docs.extend(self.col.find(text_query, projection).limit(remaining))
+            return [self.decode(model, d) for d in docs]
+
+        return self._cached(("find_by_name", normalize_name(name), summary), load)
+
+    def find_by_attack(
+        self,
+        nombre: str = "",
+        tipo: str = "",
+        limit: int = NAME_SEARCH_LIMIT,
+        summary: bool = False,
+    ) -> List[Pokemon]:
+        """
+        Busca los Pokémon que conocen un ataque, o un ataque de un tipo.
+
+        La consulta recorre solo las entradas del ataque en el índice multikey
+        (`ataques.nombre` o `ataques.tipo`, seguido de `pokedex_nacional`), que
+        ya devuelve los Pokémon en orden de Pokedex, sin ordenar en memoria.
+
+        Args:
+            nombre (str, optional): Nombre exacto del ataque, p. ej. "Lanzallamas".
+            tipo (str, optional): Tipo exacto del ataque, p. ej. "Fuego".
+            limit (int, optional): Máximo de resultados. Defaults to 200.
+            summary (bool, optional): Si es True, devuelve `PokemonSummary`.
+                                      Defaults to False.
+
+        Returns:
+            List[Pokemon]: Los Pokémon, ordenados por Pokedex nacional (una
+                lista vacía si no se indica ni nombre ni tipo).
+        """
+        f = attack_filter(nombre, tipo)
+        if not f:
+            return []
+        projection, model = _read_shape(summary)
+
+        def load() -> List[Pokemon]:
+            cursor = self.col.find(f, projection).sort(ATTACK_SORT).limit(limit)
+            return [self.decode(model, d) for d in cursor]
+
+        return self._cached(("find_by_attack", f, limit, summary), load)
+
+    def count(self, filter: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Cuenta los Pokémon que cumplen un filtro.
+
+        Args:
+            filter (Optional[Dict[str, Any]], optional): Diccionario de consulta
+                de MongoDB. Defaults to None (todos).
+
+        Returns:
+            int: El número de documentos.
+        """
+        f = filter or {}
+        return self._cached(("count", f), lambda: self.col.count_documents(f))
+
+    def count_by(self, field: str) -> List[Dict[str, Any]]:
+        """
+        Agrupa los Pokémon por el valor de un campo y cuenta cada grupo.
+
+        Args:
+            field (str): El campo por el que agrupar, p. ej. 'tipo_primario'.
 
-        return self.find(filter_query, limit=200)
+        Returns:
+            List[Dict[str, Any]]: Documentos `{"_id": valor, "count": n}`
+                ordenados de mayor a menor recuento.
+        """
+        pipeline = _count_by_pipeline(field)
+        return self._cached(
+            ("count_by", field), lambda: list(self.col.aggregate(pipeline))
+        )
+
+    # -------------------
+    # CAMBIOS
+    # -------------------
+    def changes_since(
+        self, token: Optional[str] = None, limit: int = CHANGES_PAGE_SIZE
+    ) -> ChangesPage:
+        """
+        Devuelve los cambios posteriores a una marca, para mantener al día una
+        copia de la colección sin releerla entera.
+
+        Los Pokémon creados o modificados se leen en orden (`updated_at`, `_id`)
+        con el índice del mismo nombre, y las lápidas de los borrados en orden
+        (`deleted_at`, `_id`); ambos se mezclan y se cortan en `limit` cambios.
+        El coste de cada lectura depende del volumen de cambios, no del tamaño
+        de la colección. No pasa por la caché de consultas.
+
+        La primera llamada, sin token, devuelve toda la colección; cada página
+        trae el token desde el que seguir, que la copia guarda como su marca.
+        Los cambios de los últimos `CHANGES_SETTLE_SECONDS` segundos se
+        devuelven en la llamada siguiente.
+
+        Args:
+            token (Optional[str], optional): El `next_token` de la página
+                anterior, o uno de `changes_token`. Defaults to None.
+            limit (int, optional): Cambios por página. Defaults to 1000.
+
+        Raises:
+            InvalidPageError: Si el token es inválido.
+            StaleWatermarkError: Si la marca es anterior a las lápidas que se
+                conservan; hace falta empezar de nuevo sin token.
+
+        Returns:
+            ChangesPage: Los Pokémon nuevos o modificados, las lápidas de los
+                borrados y el token de la siguiente llamada.
+        """
+        docs_query, tombstones_query = _changes_queries(token, self._now())
+        docs = list(self.col.find(docs_query).sort(CHANGES_SORT).limit(limit + 1))
+        tombstones = list(
+            self.tombstones.find(tombstones_query).sort(TOMBSTONES_SORT).limit(limit + 1)
+        )
+        return self._changes_page(docs, tombstones, limit, token)
 
     # -------------------
     # UPDATE
     # -------------------
-    def update(self, id_str: str, update_fields: Dict[str, Any]) -> Optional[Pokemon]:
+    def update(
+        self, id_str: str, update_fields: Dict[str, Any], original: Optional[Any] = None
+    ) -> Optional[Pokemon]:
         """
         Actualiza un Pokémon por su ObjectId.
 
-        Actualiza automáticamente el campo 'updated_at' con la fecha y hora actual.
+        Actualiza automáticamente el campo 'updated_at' con la fecha y hora
+        actual e incrementa la versión.
+
+        Si se indica `original` (el Pokémon tal como se cargó para editarlo),
+        solo se escriben los campos que difieren de él y la actualización se
+        rechaza si otro usuario lo ha modificado entretanto.
 
         Args:
             id_str (str): El ID del Pokémon a actualizar.
             update_fields (Dict[str, Any]): Un diccionario con los campos a actualizar.
+            original (Optional[Any], optional): El Pokémon cargado antes de
+                editarlo. Defaults to None.
+
+        Raises:
+            VersionConflictError: Si el Pokémon cambió desde que se cargó `original`.
 
         Returns:
             Optional[Pokemon]: El objeto Pokémon actualizado si se encuentra, o None
@@ -155,12 +1227,24 @@ class PokemonController:
         except Exception:
             return None
 
-        update_fields["updated_at"] = self._now()
+        filter, update = self._update_plan(oid, update_fields, original)
+        if not update:
+            # Nada que escribir: el Pokémon sigue como se cargó
+            return original if isinstance(original, Pokemon) else original.to_model()
 
-        doc = self.col.find_one_and_update(
-            {"_id": oid}, {"$set": update_fields}, return_document=ReturnDocument.AFTER
+        # Se pide la versión anterior para los hooks; la nueva se obtiene
+        # aplicando la actualización en local
+        before = self.col.find_one_and_update(
+            filter, update, return_document=ReturnDocument.BEFORE
         )
-        return Pokemon.model_validate(doc) if doc else None
+        self._invalidate(oid)
+        if not before:
+            if original is not None and self.col.count_documents({"_id": oid}, limit=1):
+                raise VersionConflictError(f"El Pokémon {id_str} ha cambiado")
+            return None
+        doc = _apply_update(before, update, update_fields)
+        self._notify(before, doc)
+        return Pokemon.model_validate(doc)
 
     # -------------------
     # DELETE
@@ -180,13 +1264,21 @@ class PokemonController:
         except Exception:
             return False
 
-        res = self.col.delete_one({"_id": oid})
-        return res.deleted_count == 1
+        doc = self.col.find_one_and_delete({"_id": oid})
+        self._invalidate(oid)
+        if doc is None:
+            return False
+        self._bury([oid])
+        self._notify(doc, None)
+        return True
 
     def delete_many(self, filter: Dict[str, Any]) -> int:
         """
         Borra múltiples Pokémon según un filtro.
 
+        Los `_id` que cumplen el filtro se leen y se borran por lotes, para
+        dejar una lápida de cada Pokémon borrado (ver `changes_since`).
+
         Args:
             filter (Dict[str, Any]): El filtro de MongoDB para seleccionar los
                                      documentos a eliminar.
@@ -194,5 +1286,244 @@ class PokemonController:
         Returns:
             int: La cantidad de documentos eliminados.
         """
-        res = self.col.delete_many(filter)
-        return res.deleted_count
\ No newline at end of file
+        deleted = 0
+        ids = (d["_id"] for d in self.col.find(filter, {"_id": 1}))
+        for chunk in _chunks(ids, BULK_BATCH_SIZE):
+            # El filtro se repite por si algún Pokémon ha cambiado desde la lectura
+            res = self.col.delete_many({"$and": [filter, {"_id": {"$in": chunk}}]})
+            deleted += res.deleted_count
+            self._bury(chunk)
+        self._invalidate(everything=True)
+        self._notify_bulk()
+        return deleted
+
+    def _bury(self, ids: List[ObjectId]) -> None:
+        """
+        Guarda las lápidas de los Pokémon borrados de `ids`; los que siguen
+        en la colección (porque su borrado falló) se omiten, y un id que no
+        existía deja una lápida que las copias ignoran. Un fallo se registra
+        pero no anula los borrados, que ya se han realizado.
+
+        Las lápidas se fechan con `_now()`, el mismo reloj con el que
+        `changes_since` calcula la ventana de asentamiento y la caducidad de
+        las marcas.
+        """
+        if not ids:
+            return
+        try:
+            alive = {d["_id"] for d in self.col.find({"_id": {"$in": ids}}, {"_id": 1})}
+            now = self._now()
+            ops = [tombstone_op(oid, now) for oid in ids if oid not in alive]
+            if ops:
+                self.tombstones.bulk_write(ops, ordered=False)
+        except PyMongoError:
+            logger.exception("No se pudieron guardar las lápidas de %d Pokémon", len(ids))
+
+    # -------------------
+    # BULK
+    # -------------------
+    def _bulk_write(
+        self, ops: Iterable[Any], result: BulkResult, batch_size: int
+    ) -> BulkResult:
+        """
+        Ejecuta operaciones con `bulk_write` no ordenado en lotes acotados.
+
+        Args:
+            ops (Iterable[Any]): Las operaciones de escritura de PyMongo.
+            result (BulkResult): El resultado donde acumular los contadores.
+            batch_size (int): Número máximo de operaciones por lote.
+
+        Returns:
+            BulkResult: El mismo `result`, actualizado.
+        """
+        return self._write_batches(((b, []) for b in _chunks(ops, batch_size)), result)
+
+    def _write_batches(self, batches: Iterable[WriteBatch], result: BulkResult) -> BulkResult:
+        """
+        Ejecuta cada lote de operaciones con un `bulk_write` no ordenado.
+
+        La caché se invalida y los hooks se avisan una sola vez, al terminar
+        todos los lotes: con un aviso por lote, las estadísticas y el catálogo
+        de ataques se recalcularían entero tras cada uno.
+
+        Args:
+            batches (Iterable[WriteBatch]): Los lotes de operaciones de PyMongo,
+                cada uno con los `_id` que borra, de los que se guardan lápidas.
+            result (BulkResult): El resultado donde acumular los contadores.
+
+        Returns:
+            BulkResult: El mismo `result`, actualizado.
+        """
+        wrote = False
+        try:
+            for batch, deleted in batches:
+                if not batch:
+                    continue
+                wrote = True
+                try:
+                    res = self.col.bulk_write(batch, ordered=False)
+                    result.merge(res.bulk_api_result)
+                except BulkWriteError as e:
+                    result.merge(e.details)
+                self._bury(deleted)
+        finally:
+            # Sin operaciones no hay nada que invalidar ni que recalcular
+            if wrote:
+                self._invalidate(everything=True)
+                self._notify_bulk()
+        return result
+
+    def bulk_insert(
+        self, payloads: Iterable[Dict[str, Any]], batch_size: int = BULK_BATCH_SIZE
+    ) -> BulkResult:
+        """
+        Inserta muchos Pokémon con una llamada a `bulk_write` por lote.
+
+        Cada inserción se expresa como un upsert sobre un `_id` nuevo con
+        'created_at' y 'updated_at' sellados con `_now()`, como `insert`.
+
+        Args:
+            payloads (Iterable[Dict[str, Any]]): Los datos de los Pokémon.
+            batch_size (int, optional): Operaciones por lote. Defaults to 1000.
+
+        Returns:
+            BulkResult: Los contadores de la operación.
+        """
+        result = BulkResult()
+        ops = _insert_ops(self._validated_fields(payloads, result), self._now)
+        return self._bulk_write(ops, result, batch_size)
+
+    def bulk_upsert(
+        self,
+        payloads: Iterable[Dict[str, Any]],
+        key: str = "nombre",
+        batch_size: int = BULK_BATCH_SIZE,
+    ) -> BulkResult:
+        """
+        Inserta o actualiza muchos Pokémon identificándolos por `key`.
+
+        Si un mismo lote contiene varias veces la misma clave, solo se escribe
+        la última aparición para no crear duplicados.
+
+        Args:
+            payloads (Iterable[Dict[str, Any]]): Los datos de los Pokémon.
+            key (str, optional): 'nombre' o 'pokedex_nacional'. Defaults to "nombre".
+            batch_size (int, optional): Operaciones por lote. Defaults to 1000.
+
+        Raises:
+            ValueError: Si `key` no es una clave de upsert admitida.
+
+        Returns:
+            BulkResult: Los contadores de la operación.
+        """
+        if key not in UPSERT_KEYS:
+            raise ValueError(f"Clave de upsert no admitida: {key}")
+
+        result = BulkResult()
+        # Un `bulk_write` por lote, para que las claves repetidas de un lote
+        # no lleguen en dos escrituras concurrentes
+        batches = (
+            (_upsert_ops(chunk, key, result, self._now()), [])
+            for chunk in _chunks(self._validated_fields(payloads, result), batch_size)
+        )
+        return self._write_batches(batches, result)
+
+    def sync(
+        self,
+        payloads: Iterable[Dict[str, Any]],
+        key: str = "nombre",
+        delete_missing: bool = False,
+        batch_size: int = BULK_BATCH_SIZE,
+    ) -> SyncResult:
+        """
+        Sincroniza la colección con un origen de forma incremental e idempotente.
+
+        Recorre el origen en lotes. Por cada lote, una única consulta `$in`
+        sobre el índice (`key`, `content_hash`) obtiene las huellas guardadas,
+        y solo los registros nuevos o cuya huella ha cambiado se validan y se
+        escriben, con upserts por `key` que guardan la huella nueva. Repetir
+        la sincronización de un origen sin cambios no escribe nada.
+
+        Args:
+            payloads (Iterable[Dict[str, Any]]): Los registros de origen (puede
+                ser un generador, p. ej. `import_json.iter_documents`).
+            key (str, optional): 'nombre' o 'pokedex_nacional'. Defaults to "nombre".
+            delete_missing (bool, optional): Si es True, borra además los
+                Pokémon cuya clave no aparece en el origen. Defaults to False.
+            batch_size (int, optional): Registros por consulta y operaciones
+                por lote de escritura. Defaults to 1000.
+
+        Raises:
+            ValueError: Si `key` no es una clave de upsert admitida.
+
+        Returns:
+            SyncResult: Los contadores de la sincronización; los registros sin
+                clave, con la clave repetida o inválidos se cuentan como fallidos.
+        """
+        if key not in UPSERT_KEYS:
+            raise ValueError(f"Clave de upsert no admitida: {key}")
+
+        result = SyncResult()
+        seen: Set[Any] = set()
+
+        def upserts() -> Iterator[UpdateOne]:
+            for chunk in _chunks(payloads, batch_size):
+                pending = _sync_pending(chunk, key, seen, result)
+                if not pending:
+                    continue
+                cursor = self.col.find(*_stored_hashes_query(key, pending))
+                stored = {d[key]: d.get(CONTENT_HASH_FIELD) for d in cursor}
+                yield from self._sync_ops(pending, stored, key, seen, result)
+
+        def missing() -> Iterator[ObjectId]:
+            # Tras recorrer todo el origen: las claves guardadas que no aparecen
+            cursor = self.col.find({}, {key: 1}).batch_size(batch_size)
+            for d in cursor:
+                if d.get(key) not in seen:
+                    yield d["_id"]
+
+        batches: Iterable[WriteBatch] = ((b, []) for b in _chunks(upserts(), batch_size))
+        if delete_missing:
+            batches = itertools.chain(batches, _delete_batches(missing(), batch_size))
+        self._write_batches(batches, result)
+        return result
+
+    def bulk_delete(
+        self, ids: Iterable[str], batch_size: int = BULK_BATCH_SIZE
+    ) -> BulkResult:
+        """
+        Borra muchos Pokémon por su ObjectId en lotes de `bulk_write`.
+
+        Args:
+            ids (Iterable[str]): Los IDs de los Pokémon a borrar.
+            batch_size (int, optional): IDs por lote. Defaults to 1000.
+
+        Returns:
+            BulkResult: Los contadores de la operación; los IDs inválidos
+                se cuentan como fallidos.
+        """
+        result = BulkResult()
+        batches = _delete_batches(_delete_ids(ids, result), batch_size)
+        return self._write_batches(batches, result)
+
+    # -------------------
+    # MANTENIMIENTO
+    # -------------------
+    def backfill_search_keys(self, batch_size: int = BULK_BATCH_SIZE) -> BulkResult:
+        """
+        Calcula `nombre_norm` en los documentos existentes que no lo tengan.
+
+        Solo es necesario una vez en colecciones creadas antes de que existiera
+        el campo; las escrituras del controlador ya lo mantienen.
+
+        Args:
+            batch_size (int, optional): Operaciones por lote. Defaults to 1000.
+
+        Returns:
+            BulkResult: Los contadores de la operación.
+        """
+        cursor = self.col.find(
+            {NORMALIZED_FIELD: {"$exists": False}}, {"nombre": 1}
+        ).batch_size(batch_size)
+        ops = (_backfill_op(d) for d in cursor)
+        return self._bulk_write(ops, BulkResult(), batch_size)
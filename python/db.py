@@ -4,13 +4,25 @@ Módulo de conexión a la base de datos MongoDB.
 
 Este módulo se encarga de establecer la conexión con la base de datos
 MongoDB, utilizando las variables de entorno para la configuración.
+
+Cada tipo de carga usa un perfil de conexión con nombre (`ui`, `import`,
+`analytics`) y su propio cliente: tamaño del pool, compresión del protocolo,
+preferencia y nivel de lectura, nivel de confirmación de escritura y tamaño
+de lote. Los perfiles se pueden ajustar con un archivo JSON
+(`MONGO_PROFILES_FILE`) o con variables `MONGO_<PERFIL>_<OPCIÓN>`, p. ej.
+`MONGO_IMPORT_WRITE_CONCERN=0` o `MONGO_ANALYTICS_READ_PREFERENCE=secondary`.
 """
 
+import json
 import os
-from pymongo import MongoClient
+from dataclasses import dataclass, fields
+from typing import Any, Dict
+from pymongo import AsyncMongoClient, MongoClient
 from dotenv import load_dotenv
 import streamlit as st
 
+from monitoring import DB_MONITOR_ENABLED, MONITOR, pool_monitor
+
 # Carga las variables de entorno desde un archivo .env
 load_dotenv()
 
@@ -21,29 +33,260 @@ MONGO_URI = os.getenv(
 )
 DB_NAME = os.getenv("DB_NAME", "appdb")
 
+# Tamaño del pool de conexiones, común a los clientes síncrono y asíncrono
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_CONNECTING = int(os.getenv("MONGO_MAX_CONNECTING", "2"))
+
+# Archivo JSON opcional con perfiles de conexión: {"perfil": {"opción": valor}}
+MONGO_PROFILES_FILE = os.getenv("MONGO_PROFILES_FILE", "")
+
+# Perfil de las páginas de Streamlit y de los clientes sin perfil explícito
+DEFAULT_PROFILE = "ui"
+
+
+@dataclass(frozen=True)
+class ClientProfile:
+    """
+    Configuración de un cliente de MongoDB para un tipo de carga.
+
+    Las opciones de texto vacías dejan el valor por defecto del servidor.
+    """
+    name: str
+    max_pool_size: int = MONGO_MAX_POOL_SIZE
+    min_pool_size: int = MONGO_MIN_POOL_SIZE
+    max_connecting: int = MONGO_MAX_CONNECTING
+    # Compresión del protocolo por orden de preferencia, p. ej. "zstd,zlib"
+    # (zstd y snappy requieren sus módulos de Python)
+    compressors: str = ""
+    read_preference: str = "primary"
+    # Nivel de lectura: "local", "majority"...
+    read_concern: str = ""
+    # Confirmación de escritura: "0" (sin confirmar), "1", "majority"...
+    write_concern: str = ""
+    connect_timeout_ms: int = 20000
+    server_selection_timeout_ms: int = 30000
+    # 0 = sin límite
+    socket_timeout_ms: int = 0
+    # Documentos por lote de las lecturas y escrituras masivas del perfil
+    batch_size: int = 1000
+
+    def options(self) -> Dict[str, Any]:
+        """
+        Argumentos del constructor del cliente para este perfil, sin los
+        listeners.
+        """
+        options: Dict[str, Any] = {
+            "maxPoolSize": self.max_pool_size,
+            "minPoolSize": self.min_pool_size,
+            "maxConnecting": self.max_connecting,
+            "readPreference": self.read_preference,
+            "connectTimeoutMS": self.connect_timeout_ms,
+            "serverSelectionTimeoutMS": self.server_selection_timeout_ms,
+            "socketTimeoutMS": self.socket_timeout_ms or None,
+        }
+        if self.compressors:
+            options["compressors"] = self.compressors
+        if self.read_concern:
+            options["readConcernLevel"] = self.read_concern
+        if self.write_concern:
+            w = self.write_concern
+            options["w"] = int(w) if w.isdigit() else w
+        return options
+
+
+# Perfiles predefinidos: solo las opciones que cambian respecto a `ClientProfile`
+_PROFILE_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    # Páginas de Streamlit: muchas consultas pequeñas contra el primario
+    "ui": {},
+    # Importaciones masivas: lotes grandes y comprimidos, confirmados solo
+    # por el primario
+    "import": {"max_pool_size": 16, "compressors": "zlib", "write_concern": "1"},
+    # Exportaciones y lecturas de toda la colección: pueden servirlas los
+    # secundarios, con datos ya confirmados por la mayoría
+    "analytics": {
+        "max_pool_size": 16,
+        "compressors": "zlib",
+        "read_preference": "secondaryPreferred",
+        "read_concern": "majority",
+        "batch_size": 5000,
+    },
+}
+
+
+# Opciones que admiten una lista en el archivo JSON (se unen con comas)
+_LIST_OPTIONS = frozenset({"compressors"})
+
+
+def _option_value(option: str, kind: type, value: Any) -> Any:
+    """
+    Convierte el valor de una opción de perfil al tipo de su campo.
+
+    Los textos (variables de entorno) se convierten; del archivo JSON se
+    aceptan además números para las opciones de texto ("write_concern": 1)
+    y listas para `_LIST_OPTIONS`.
+
+    Raises:
+        ValueError: Si el valor no es del tipo de la opción.
+    """
+    if kind is str:
+        if isinstance(value, list) and option in _LIST_OPTIONS:
+            if all(isinstance(v, str) for v in value):
+                return ",".join(value)
+        elif isinstance(value, str):
+            return value
+        elif isinstance(value, int) and not isinstance(value, bool):
+            return str(value)
+    elif kind is int:
+        if isinstance(value, str):
+            try:
+                return int(value)
+            except ValueError:
+                pass
+        elif isinstance(value, int) and not isinstance(value, bool):
+            return value
+    if option in _LIST_OPTIONS:
+        expected = "una lista de textos o un texto"
+    else:
+        expected = "un texto" if kind is str else "un entero"
+    raise ValueError(f"'{option}' debe ser {expected}, no {value!r}")
+
+
+def load_profiles(path: str = MONGO_PROFILES_FILE) -> Dict[str, ClientProfile]:
+    """
+    Construye los perfiles de conexión.
+
+    Parte de los perfiles predefinidos, aplica encima los del archivo JSON
+    (que también puede definir perfiles nuevos) y, por último, las variables
+    de entorno `MONGO_<PERFIL>_<OPCIÓN>`. En el archivo, `compressors` puede
+    ser una lista (`["zstd", "snappy"]`) o un texto separado por comas.
+
+    Args:
+        path (str, optional): Archivo JSON de perfiles (vacío = ninguno).
+            Defaults to `MONGO_PROFILES_FILE`.
+
+    Raises:
+        ValueError: Si un perfil incluye una opción desconocida o con un
+            valor del tipo equivocado.
+
+    Returns:
+        Dict[str, ClientProfile]: Los perfiles por nombre.
+    """
+    config = {name: dict(values) for name, values in _PROFILE_DEFAULTS.items()}
+    if path:
+        with open(path, encoding="utf-8") as f:
+            for name, values in json.load(f).items():
+                config.setdefault(name, {}).update(values)
+
+    types = {f.name: f.type for f in fields(ClientProfile) if f.name != "name"}
+    profiles = {}
+    for name, values in config.items():
+        for option in types:
+            env = os.getenv(f"MONGO_{name.upper()}_{option.upper()}")
+            if env is not None:
+                values[option] = env
+        unknown = set(values) - set(types)
+        if unknown:
+            raise ValueError(
+                f"Opciones desconocidas en el perfil '{name}': {', '.join(sorted(unknown))}"
+            )
+        try:
+            options = {
+                option: _option_value(option, types[option], v) for option, v in values.items()
+            }
+        except ValueError as e:
+            raise ValueError(f"Valor inválido en el perfil '{name}': {e}")
+        profiles[name] = ClientProfile(name=name, **options)
+    return profiles
+
+
+PROFILES = load_profiles()
+
+
+def get_profile(name: str = DEFAULT_PROFILE) -> ClientProfile:
+    """
+    Devuelve un perfil de conexión por su nombre.
+
+    Raises:
+        ValueError: Si el perfil no existe.
+    """
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Perfil de conexión desconocido: {name}")
+
+
+def client_options(profile: str = DEFAULT_PROFILE) -> Dict[str, Any]:
+    """
+    Opciones de conexión compartidas por `get_client` y `make_async_client`:
+    las del perfil, el registro de su pool de conexiones y, salvo con
+    `DB_MONITOR=0`, el monitor de comandos del proceso.
+
+    Args:
+        profile (str, optional): Nombre del perfil. Defaults to "ui".
+
+    Returns:
+        Dict[str, Any]: Argumentos para el constructor del cliente.
+    """
+    options = get_profile(profile).options()
+    listeners = [MONITOR] if DB_MONITOR_ENABLED else []
+    options["event_listeners"] = listeners + [pool_monitor(profile)]
+    return options
 
-@st.cache_resource
-def get_client() -> MongoClient:
+
+@st.cache_resource(show_spinner=False)
+def get_client(profile: str = DEFAULT_PROFILE) -> MongoClient:
     """
     Establece y devuelve una conexión con el cliente de MongoDB.
 
     Utiliza el decorador `@st.cache_resource` de Streamlit para asegurar que
     la conexión se establezca una sola vez y se reutilice en toda la aplicación.
+    Cada perfil tiene su propio cliente y su propio pool de conexiones.
+
+    El cliente se conecta en segundo plano: crearlo no espera al servidor, y
+    es la primera operación la que espera (hasta el `server_selection_timeout_ms`
+    del perfil) a que haya uno disponible. Un fallo de conexión aparece como
+    `ServerSelectionTimeoutError` en esa operación (`manage.py profiles --check`
+    hace un "ping" explícito para comprobarla).
+
+    Args:
+        profile (str, optional): Nombre del perfil. Defaults to "ui".
 
     Returns:
         MongoClient: Una instancia del cliente de MongoDB.
     """
-    client = MongoClient(MONGO_URI)
-    # Realiza un "ping" a la base de datos para comprobar la conexión
-    client.admin.command("ping")
-    return client
+    return MongoClient(MONGO_URI, **client_options(profile))
+
+
+def make_async_client(
+    uri: str = MONGO_URI, profile: str = DEFAULT_PROFILE
+) -> AsyncMongoClient:
+    """
+    Crea un cliente asíncrono de MongoDB con las mismas opciones que el síncrono.
+
+    El cliente queda ligado al bucle de eventos en el que se use por primera
+    vez, así que debe crearse y usarse siempre desde el mismo bucle (ver
+    `async_controller.AsyncRunner`).
 
+    Args:
+        uri (str, optional): URI de MongoDB. Defaults to `MONGO_URI`.
+        profile (str, optional): Nombre del perfil. Defaults to "ui".
 
-def get_db():
+    Returns:
+        AsyncMongoClient: El cliente, aún sin conectar.
+    """
+    return AsyncMongoClient(uri, **client_options(profile))
+
+
+def get_db(profile: str = DEFAULT_PROFILE):
     """
     Devuelve una instancia de la base de datos.
 
+    Args:
+        profile (str, optional): Perfil de conexión del cliente.
+            Defaults to "ui".
+
     Returns:
         Database: Una instancia de la base de datos de MongoDB.
     """
-    return get_client()[DB_NAME]
\ No newline at end of file
+    return get_client(profile)[DB_NAME]
\ No newline at end of file
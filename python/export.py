@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+"""
+Exportación de la colección de Pokémon a JSON Lines, CSV y Parquet.
+
+La exportación es en streaming: los documentos se leen de un cursor por
+lotes de `batch_size` y cada lote se escribe en el archivo de salida antes de
+leer el siguiente, así que la memoria usada no depende del tamaño de la
+colección. JSON Lines y CSV se pueden comprimir con gzip o zstd; Parquet
+comprime cada columna internamente con el códec elegido.
+
+Un archivo JSON Lines exportado se puede volver a importar con
+`import_json.py`.
+"""
+
+import json
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from pymongo.collection import Collection
+
+from db import get_db, get_profile
+from import_json import iter_batches
+from normalize import NORMALIZED_FIELD
+from tables import ATTACKS_LIST, ATTACKS_TEXT, format_attacks, table_schema
+
+DEFAULT_BATCH_SIZE = 1000
+EXPORT_DIR = os.getenv(
+    "EXPORT_DIR", os.path.join(os.path.dirname(__file__), "data", "exports")
+)
+
+FORMATS = ("jsonl", "csv", "parquet")
+COMPRESSIONS = ("none", "gzip", "zstd")
+
+# Extensión de cada formato y de cada compresión (Parquet comprime por dentro)
+EXTENSIONS = {"jsonl": ".jsonl", "csv": ".csv", "parquet": ".parquet"}
+COMPRESSED_EXTENSIONS = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+# Campos exportados además de los de la tabla (id, escalares y ataques)
+METADATA_COLUMNS = {
+    "created_at": pa.timestamp("ms", tz="UTC"),
+    "updated_at": pa.timestamp("ms", tz="UTC"),
+    "version": pa.int64(),
+}
+
+
+@dataclass
+class ExportStats:
+    """
+    Contadores acumulados de una exportación.
+    """
+    written: int = 0
+    batches: int = 0
+    bytes: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        """
+        Documentos escritos por segundo desde el inicio de la exportación.
+        """
+        return self.written / self.elapsed if self.elapsed else 0.0
+
+
+def export_filename(fmt: str, compression: str = "none") -> str:
+    """
+    Nombre de archivo con la fecha actual y la extensión del formato.
+
+    Args:
+        fmt (str): Uno de `FORMATS`.
+        compression (str, optional): Uno de `COMPRESSIONS`.
+
+    Returns:
+        str: El nombre, p. ej. 'pokemons-20240101-120000.jsonl.gz'.
+    """
+    suffix = EXTENSIONS[fmt]
+    if fmt != "parquet":
+        suffix += COMPRESSED_EXTENSIONS[compression]
+    return f"pokemons-{datetime.now():%Y%m%d-%H%M%S}{suffix}"
+
+
+def export_schema(attacks: str) -> pa.Schema:
+    """
+    Esquema de Arrow de la exportación: el de la tabla más los metadatos.
+
+    Args:
+        attacks (str): `ATTACKS_TEXT` (CSV) o `ATTACKS_LIST` (Parquet).
+
+    Returns:
+        pa.Schema: El esquema.
+    """
+    schema = table_schema(attacks)
+    for name, type_ in METADATA_COLUMNS.items():
+        schema = schema.append(pa.field(name, type_))
+    return schema
+
+
+def _record_batch(docs: List[Dict[str, Any]], schema: pa.Schema) -> pa.RecordBatch:
+    """
+    Convierte un lote de documentos en un `RecordBatch` con `schema`.
+    """
+    arrays = []
+    for field in schema:
+        if field.name == "id":
+            values = [str(d["_id"]) for d in docs]
+        elif field.name == "ataques" and pa.types.is_string(field.type):
+            values = [format_attacks(d.get("ataques")) for d in docs]
+        elif field.name == "ataques":
+            values = [d.get("ataques") or [] for d in docs]
+        else:
+            values = [d.get(field.name) for d in docs]
+        arrays.append(pa.array(values, field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _json_line(doc: Dict[str, Any]) -> str:
+    """
+    Serializa un documento como una línea de JSON Lines.
+
+    El `_id` se escribe como cadena y las fechas en ISO 8601, de modo que el
+    archivo se lee con cualquier herramienta y se puede reimportar.
+    """
+    out = {"_id": str(doc["_id"])}
+    for key, value in doc.items():
+        if key == "_id":
+            continue
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        out[key] = value
+    return json.dumps(out, ensure_ascii=False) + "\n"
+
+
+# -------------------
+# ESCRITORES
+# -------------------
+class _JsonLinesWriter:
+    """
+    Escribe los documentos tal cual, uno por línea.
+    """
+
+    def __init__(self, sink: pa.NativeFile):
+        self.sink = sink
+
+    def write(self, docs: List[Dict[str, Any]]) -> None:
+        self.sink.write("".join(_json_line(d) for d in docs).encode("utf-8"))
+
+    def close(self) -> None:
+        self.sink.close()
+
+
+class _CsvWriter:
+    """
+    Escribe una fila por documento, con los ataques como texto.
+    """
+
+    def __init__(self, sink: pa.NativeFile):
+        self.sink = sink
+        self.schema = export_schema(ATTACKS_TEXT)
+        self.writer = pa_csv.CSVWriter(sink, self.schema)
+
+    def write(self, docs: List[Dict[str, Any]]) -> None:
+        self.writer.write_batch(_record_batch(docs, self.schema))
+
+    def close(self) -> None:
+        self.writer.close()
+        self.sink.close()
+
+
+class _ParquetWriter:
+    """
+    Escribe un grupo de filas de Parquet por lote, con los ataques como
+    listas de structs.
+    """
+
+    def __init__(self, path: str, compression: str):
+        self.schema = export_schema(ATTACKS_LIST)
+        self.writer = pq.ParquetWriter(path, self.schema, compression=compression)
+
+    def write(self, docs: List[Dict[str, Any]]) -> None:
+        self.writer.write_batch(_record_batch(docs, self.schema))
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+def open_writer(path: str, fmt: str, compression: str = "none"):
+    """
+    Abre el escritor de un formato sobre un archivo.
+
+    Args:
+        path (str): El archivo de salida (se sobrescribe si existe).
+        fmt (str): Uno de `FORMATS`.
+        compression (str, optional): Uno de `COMPRESSIONS`.
+
+    Raises:
+        ValueError: Si el formato o la compresión no se admiten, o si el
+            códec no está disponible en esta instalación de pyarrow.
+
+    Returns:
+        Un objeto con los métodos `write(docs)` y `close()`.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato de exportación no admitido: {fmt}")
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Compresión no admitida: {compression}")
+    if compression != "none" and not pa.Codec.is_available(compression):
+        raise ValueError(f"El códec '{compression}' no está disponible en pyarrow")
+
+    if fmt == "parquet":
+        return _ParquetWriter(path, compression)
+    sink = pa.OSFile(path, "wb")
+    if compression != "none":
+        sink = pa.CompressedOutputStream(sink, compression)
+    if fmt == "csv":
+        return _CsvWriter(sink)
+    return _JsonLinesWriter(sink)
+
+
+# -------------------
+# EXPORTACIÓN
+# -------------------
+def print_progress(stats: ExportStats) -> None:
+    """
+    Informe de progreso por defecto: una línea por lote.
+    """
+    print(
+        f"lote {stats.batches}: {stats.written} documentos escritos, "
+        f"{stats.rate:.0f} docs/s"
+    )
+
+
+def export_collection(
+    col: Collection,
+    path: str,
+    fmt: str = "jsonl",
+    compression: str = "none",
+    filter: Optional[Dict[str, Any]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Optional[Callable[[ExportStats], None]] = print_progress,
+) -> ExportStats:
+    """
+    Exporta la colección, o los documentos de un filtro, a un archivo.
+
+    El cursor trae los documentos de `batch_size` en `batch_size` (ordenados
+    por `_id`) y cada lote se escribe antes de pedir el siguiente, así que
+    solo hay un lote en memoria.
+
+    Args:
+        col (Collection): La colección de origen.
+        path (str): El archivo de salida.
+        fmt (str, optional): Uno de `FORMATS`. Defaults to "jsonl".
+        compression (str, optional): Uno de `COMPRESSIONS`. Defaults to "none".
+        filter (Optional[Dict[str, Any]], optional): Filtro de MongoDB.
+        batch_size (int, optional): Documentos por lote.
+        progress (Optional[Callable], optional): Función llamada tras cada lote
+            con los contadores acumulados.
+
+    Raises:
+        ValueError: Si el formato o la compresión no se admiten.
+
+    Returns:
+        ExportStats: Los contadores finales de la exportación.
+    """
+    writer = open_writer(path, fmt, compression)
+    stats = ExportStats()
+    start = time.perf_counter()
+    # El nombre normalizado es un campo interno de búsqueda: no se exporta
+    cursor = col.find(filter or {}, {NORMALIZED_FIELD: 0}, batch_size=batch_size)
+    cursor = cursor.sort("_id", 1)
+    try:
+        for batch in iter_batches(cursor, batch_size):
+            writer.write(batch)
+            stats.written += len(batch)
+            stats.batches += 1
+            stats.elapsed = time.perf_counter() - start
+            if progress:
+                progress(stats)
+    finally:
+        cursor.close()
+        writer.close()
+    stats.elapsed = time.perf_counter() - start
+    stats.bytes = os.path.getsize(path)
+    return stats
+
+
+def export_file(
+    path: str,
+    fmt: str = "jsonl",
+    compression: str = "none",
+    filter: Optional[Dict[str, Any]] = None,
+    batch_size: Optional[int] = None,
+) -> ExportStats:
+    """
+    Exporta la colección 'pokemons' de la base de datos a un archivo.
+
+    Lee con el perfil de conexión 'analytics' (ver `db.py`), que puede
+    servirse desde un secundario.
+
+    Args:
+        path (str): El archivo de salida.
+        fmt (str, optional): Uno de `FORMATS`.
+        compression (str, optional): Uno de `COMPRESSIONS`.
+        filter (Optional[Dict[str, Any]], optional): Filtro de MongoDB.
+        batch_size (Optional[int], optional): Documentos por lote.
+            Defaults to None (el del perfil).
+
+    Returns:
+        ExportStats: Los contadores finales de la exportación.
+    """
+    stats = export_collection(
+        get_db("analytics")["pokemons"], path, fmt=fmt, compression=compression,
+        filter=filter, batch_size=batch_size or get_profile("analytics").batch_size,
+    )
+    print(
+        f"{stats.written} documentos exportados a {path} "
+        f"({stats.bytes / 1024:.0f} KB) en {stats.elapsed:.1f}s ({stats.rate:.0f} docs/s)"
+    )
+    return stats
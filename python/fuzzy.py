@@ -0,0 +1,401 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo de búsqueda aproximada (tolerante a erratas) de nombres.
+
+Define `FuzzyIndex`, un índice de trigramas en memoria sobre un vocabulario
+de nombres normalizados, y `FuzzySearch`, que mantiene uno para los nombres
+de Pokémon y otro para los nombres de ataques.
+
+Una búsqueda cuenta, con NumPy, cuántos trigramas comparte con el texto
+buscado cada término de las listas de sus trigramas (ordenando esas listas
+juntas), elige los más parecidos por coeficiente de Dice y los ordena por
+distancia de edición. Solo se recorren esas listas y los términos que
+aparecen en ellas: el coste no depende del tamaño del vocabulario.
+
+El índice se construye desde la colección en un hilo en segundo plano y se
+mantiene al día como hook de escritura del `PokemonController`.
+"""
+
+import logging
+import threading
+from array import array
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+from pymongo.collection import Collection
+
+from normalize import normalize_name
+
+logger = logging.getLogger(__name__)
+
+# Candidatos por trigramas que se reordenan por distancia de edición, por
+# cada resultado pedido
+CANDIDATE_FACTOR = 3
+
+# Similitud (coeficiente de Dice sobre trigramas) mínima de un candidato
+MIN_SIMILARITY = 0.2
+
+BUILD_BATCH_SIZE = 10000
+
+
+class FuzzyMatch(NamedTuple):
+    """
+    Un término del índice parecido al texto buscado.
+    """
+    text: str  # El término tal y como aparece en la colección
+    term: str  # El término normalizado
+    distance: int  # Distancia de edición al texto buscado (normalizado)
+    similarity: float  # Coeficiente de Dice de trigramas, entre 0 y 1
+    count: int  # Documentos en los que aparece
+
+
+def trigrams(term: str) -> Set[str]:
+    """
+    Trigramas de un término normalizado, con relleno en los extremos para
+    que también cuenten el principio y el final de la palabra.
+    """
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_typos(text: str) -> int:
+    """
+    Distancia de edición que se tolera para un texto: una errata por cada
+    tres caracteres, y al menos una.
+    """
+    return max(1, len(normalize_name(text)) // 3)
+
+
+def edit_distance(a: str, b: str) -> int:
+    """
+    Distancia de Levenshtein entre dos cadenas.
+
+    Usa el algoritmo de vectores de bits de Myers (en la versión de Hyyrö):
+    cada columna de la matriz de distancias se codifica en los bits de un
+    entero, así que el coste es lineal en la longitud de `b`.
+    """
+    if not a or not b:
+        return len(a) + len(b)
+    m = len(a)
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+    peq: Dict[str, int] = {}
+    for i, c in enumerate(a):
+        peq[c] = peq.get(c, 0) | (1 << i)
+    pv, mv, score = full, 0, m
+    for c in b:
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+    return score
+
+
+class FuzzyIndex:
+    """
+    Índice de trigramas sobre un vocabulario de términos.
+
+    Cada término tiene un identificador entero y un recuento de documentos
+    que lo contienen; las listas de cada trigrama son arrays de enteros que
+    NumPy lee sin copiarlos. Los términos que dejan de usarse quedan con
+    recuento 0 (no se devuelven) y se reutilizan si vuelven a aparecer.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._display: List[str] = []
+        self._sizes = array("i")
+        self._counts = array("i")
+        self._postings: Dict[str, array] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(1 for n in self._counts if n > 0)
+
+    def add(self, text: Optional[str], n: int = 1) -> None:
+        """
+        Suma `n` apariciones de un término (lo añade si no existía).
+        """
+        term = normalize_name(text)
+        if not term:
+            return
+        with self._lock:
+            tid = self._ids.get(term)
+            if tid is None:
+                tid = len(self._display)
+                self._ids[term] = tid
+                self._display.append(text)
+                grams = trigrams(term)
+                self._sizes.append(len(grams))
+                self._counts.append(0)
+                for gram in grams:
+                    postings = self._postings.get(gram)
+                    if postings is None:
+                        postings = self._postings[gram] = array("i")
+                    postings.append(tid)
+            elif self._counts[tid] <= 0:
+                self._display[tid] = text
+            self._counts[tid] += n
+
+    def remove(self, text: Optional[str], n: int = 1) -> None:
+        """
+        Resta `n` apariciones de un término.
+        """
+        term = normalize_name(text)
+        with self._lock:
+            tid = self._ids.get(term)
+            if tid is not None:
+                self._counts[tid] = max(0, self._counts[tid] - n)
+
+    def search(
+        self, text: str, limit: int = 10, max_distance: Optional[int] = None
+    ) -> List[FuzzyMatch]:
+        """
+        Busca los términos más parecidos a un texto.
+
+        Args:
+            text (str): El texto buscado (se normaliza).
+            limit (int, optional): Máximo de resultados. Defaults to 10.
+            max_distance (Optional[int], optional): Distancia de edición
+                máxima de los resultados. Defaults to None (sin límite).
+
+        Returns:
+            List[FuzzyMatch]: Los términos, de menor a mayor distancia de
+                edición (y de mayor a menor similitud a igual distancia).
+        """
+        query = normalize_name(text)
+        if not query:
+            return []
+        grams = trigrams(query)
+        with self._lock:
+            lists = [self._postings[g] for g in grams if g in self._postings]
+            if not lists:
+                return []
+            views = [np.frombuffer(p, dtype=np.int32) for p in lists]
+            # Trigramas compartidos con cada término que aparece en las listas
+            # (solo esos: un acumulador disperso, no un array por término del
+            # vocabulario). Solo se consideran los que comparten al menos la
+            # mitad que el mejor: el resto no puede quedar entre los primeros
+            tids, hits = np.unique(np.concatenate(views), return_counts=True)
+            keep = hits >= (hits.max() + 1) // 2
+            tids, hits = tids[keep], hits[keep]
+            sizes = np.frombuffer(self._sizes, dtype=np.int32)[tids]
+            counts = np.frombuffer(self._counts, dtype=np.int32)[tids]
+            # Las vistas de NumPy impiden que los arrays crezcan: se sueltan
+            # antes de liberar el bloqueo
+            del views
+            similarity = 2.0 * hits / (len(grams) + sizes)
+            similarity[counts <= 0] = 0.0
+            k = min(limit * CANDIDATE_FACTOR, len(tids))
+            top = np.argpartition(-similarity, k - 1)[:k]
+            top = top[similarity[top] >= MIN_SIMILARITY]
+            candidates = [
+                (self._display[tids[i]], float(similarity[i]), int(counts[i])) for i in top
+            ]
+
+        matches = []
+        for display, sim, count in candidates:
+            term = normalize_name(display)
+            distance = edit_distance(query, term)
+            if max_distance is None or distance <= max_distance:
+                matches.append(FuzzyMatch(display, term, distance, sim, count))
+        matches.sort(key=lambda m: (m.distance, -m.similarity, -m.count))
+        return matches[:limit]
+
+
+def _attack_names(doc: Optional[Dict[str, Any]]) -> Set[str]:
+    """
+    Nombres de ataque distintos de un documento.
+    """
+    if not doc:
+        return set()
+    ataques = doc.get("ataques") or []
+    return {a["nombre"] for a in ataques if isinstance(a, dict) and a.get("nombre")}
+
+
+class FuzzySearch:
+    """
+    Búsqueda aproximada de nombres de Pokémon y de ataques.
+
+    Mientras el índice se construye (`is_ready` es False) las búsquedas
+    devuelven listas vacías. Se registra como hook de escritura del
+    `PokemonController`: cada escritura individual actualiza los recuentos,
+    y las escrituras masivas lanzan una reconstrucción en segundo plano que
+    sustituye al índice actual al terminar.
+    """
+
+    def __init__(self, collection: Collection):
+        """
+        Inicializa la búsqueda (vacía hasta llamar a `start`).
+
+        Args:
+            collection (Collection): La colección de Pokémon.
+        """
+        self.col = collection
+        self.names = FuzzyIndex()
+        self.attacks = FuzzyIndex()
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stale = False
+        # Escrituras recibidas durante una reconstrucción, para aplicarlas
+        # también al índice nuevo
+        self._pending: Optional[List[Tuple[Optional[Dict], Optional[Dict]]]] = None
+
+    @property
+    def is_ready(self) -> bool:
+        """
+        True cuando el índice está construido.
+        """
+        return self._ready.is_set()
+
+    def start(self) -> "FuzzySearch":
+        """
+        Construye el índice en un hilo en segundo plano.
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                # Ya hay una construcción en curso: se repetirá al terminar
+                self._stale = True
+                return self
+            self._thread = threading.Thread(
+                target=self._run, name="fuzzy-index", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        """
+        Bucle del hilo: construye el índice hasta que no quede ninguna
+        escritura masiva sin recoger.
+        """
+        while True:
+            with self._lock:
+                self._stale = False
+                self._pending = []
+            try:
+                self._build()
+            except Exception:
+                logger.exception("Error al construir el índice de búsqueda aproximada")
+                with self._lock:
+                    self._pending = None
+                return
+            with self._lock:
+                if not self._stale:
+                    return
+
+    def _build(self) -> None:
+        """
+        Lee los nombres de la colección y sustituye los índices actuales.
+
+        Una escritura concurrente con la lectura puede quedar contada dos
+        veces; como mucho deja un término con más apariciones de las reales.
+        """
+        names, attacks = FuzzyIndex(), FuzzyIndex()
+        projection = {"nombre": 1, "ataques.nombre": 1}
+        for doc in self.col.find({}, projection, batch_size=BUILD_BATCH_SIZE):
+            self._index(names, attacks, doc, 1)
+        with self._lock:
+            for before, after in self._pending or []:
+                self._index(names, attacks, before, -1)
+                self._index(names, attacks, after, 1)
+            self.names, self.attacks = names, attacks
+            self._pending = None
+        self._ready.set()
+
+    @staticmethod
+    def _index(
+        names: FuzzyIndex, attacks: FuzzyIndex, doc: Optional[Dict[str, Any]], n: int
+    ) -> None:
+        """
+        Suma (`n` = 1) o resta (`n` = -1) los nombres de un documento.
+        """
+        if not doc:
+            return
+        update_names = names.add if n > 0 else names.remove
+        update_attacks = attacks.add if n > 0 else attacks.remove
+        update_names(doc.get("nombre"))
+        for nombre in _attack_names(doc):
+            update_attacks(nombre)
+
+    def search_names(
+        self, text: str, limit: int = 10, max_distance: Optional[int] = None
+    ) -> List[FuzzyMatch]:
+        """
+        Nombres de Pokémon parecidos a `text` (ver `FuzzyIndex.search`).
+        """
+        return self.names.search(text, limit=limit, max_distance=max_distance)
+
+    def search_attacks(
+        self, text: str, limit: int = 10, max_distance: Optional[int] = None
+    ) -> List[FuzzyMatch]:
+        """
+        Nombres de ataques parecidos a `text` (ver `FuzzyIndex.search`).
+        """
+        return self.attacks.search(text, limit=limit, max_distance=max_distance)
+
+    @staticmethod
+    def _suggestion(text: str, matches: Iterable[FuzzyMatch]) -> Optional[str]:
+        """
+        La mejor corrección de `text`: la más cercana dentro de `max_typos`
+        (y distinta del propio texto).
+        """
+        limit = max_typos(text)
+        for match in matches:
+            if 0 < match.distance <= limit:
+                return match.text
+        return None
+
+    def suggest_name(self, text: str) -> Optional[str]:
+        """
+        "¿Quisiste decir...?" para un nombre de Pokémon.
+
+        Returns:
+            Optional[str]: El nombre sugerido, o None si no hay ninguno
+                suficientemente cercano.
+        """
+        return self._suggestion(text, self.search_names(text, limit=3))
+
+    def suggest_attack(self, text: str) -> Optional[str]:
+        """
+        "¿Quisiste decir...?" para un nombre de ataque.
+        """
+        return self._suggestion(text, self.search_attacks(text, limit=3))
+
+    # -------------------
+    # HOOKS DE ESCRITURA
+    # -------------------
+    def on_write(
+        self, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]
+    ) -> None:
+        """
+        Aplica los cambios de nombres de una escritura individual.
+
+        Args:
+            before (Optional[Dict[str, Any]]): El documento antes de la
+                escritura (None en inserciones).
+            after (Optional[Dict[str, Any]]): El documento tras la escritura
+                (None en borrados).
+        """
+        with self._lock:
+            self._index(self.names, self.attacks, before, -1)
+            self._index(self.names, self.attacks, after, 1)
+            if self._pending is not None:
+                self._pending.append((before, after))
+
+    def on_bulk_write(self) -> None:
+        """
+        Tras una escritura masiva se reconstruye el índice en segundo plano
+        (mientras tanto se sigue usando el anterior).
+        """
+        self.start()
@@ -4,35 +4,441 @@ Script para importar datos de un archivo JSON a la base de datos.
 
 Este script se utiliza para leer un archivo JSON que contiene datos de Pokémon
 y los inserta en la colección 'pokemons' de la base de datos MongoDB.
+
+La importación es masiva y en streaming: el archivo se lee de forma
+incremental (admite tanto un array JSON como JSON Lines), los documentos se
+validan por lotes y se escriben con `insert_many` no ordenados repartidos
+entre un pool de hilos. La memoria usada queda acotada por
+`batch_size * workers`, independientemente del tamaño del archivo.
+
+Al terminar se avisa a los hooks indicados (`on_bulk_write`), como tras las
+escrituras masivas del controlador, para que las estadísticas y el catálogo
+de ataques materializados incluyan los documentos importados.
 """
 
 import json
-from db import get_db
-from controller import PokemonController
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from pydantic import ValidationError
+from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from attacks import AttackCatalog
+from db import get_db, get_profile
+from models import Pokemon
+from normalize import NORMALIZED_FIELD, normalize_name
+from stats import StatsService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_WORKERS = 4
+READ_CHUNK_SIZE = 1 << 16
+_DELIMITERS = frozenset(",] \t\r\n")
+# Caracteres del token más largo que puede quedar cortado al final del búfer
+# ("-Infinity"; un escape "\uXXXX" ocupa menos)
+_MAX_TOKEN = 9
+# Tamaño máximo de un elemento del array: el de un documento de MongoDB
+MAX_ELEMENT_CHARS = 16 * 1024 * 1024
+
+
+@dataclass
+class BatchResult:
+    """
+    Resultado de la escritura de un lote de documentos.
+    """
+    index: int
+    size: int
+    inserted: int = 0
+    invalid: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class ImportStats:
+    """
+    Contadores acumulados de una importación masiva.
+    """
+    read: int = 0
+    inserted: int = 0
+    invalid: int = 0
+    failed: int = 0
+    batches: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        """
+        Documentos procesados por segundo desde el inicio de la importación.
+        """
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+
+# -------------------
+# LECTURA INCREMENTAL
+# -------------------
+def _is_truncated(error: json.JSONDecodeError) -> bool:
+    """
+    Indica si un error de decodificación puede deberse solo a que el valor
+    está cortado al final del búfer, es decir, si leer más datos podría
+    resolverlo.
+    """
+    if error.msg.startswith("Unterminated string"):
+        return True
+    return error.pos > len(error.doc) - _MAX_TOKEN
+
+
+def _iter_json_array(f, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Decodifica de forma incremental los elementos de un array JSON.
+
+    Solo mantiene en memoria el fragmento del archivo que todavía no se ha
+    decodificado, por lo que el consumo no depende del tamaño del array. Un
+    error de sintaxis se detecta en cuanto el fragmento que lo contiene está
+    completo, sin leer el resto del archivo.
 
+    Args:
+        f: Archivo de texto abierto y posicionado al inicio.
+        chunk_size (int, optional): Caracteres leídos en cada lectura.
 
-def import_file(path="./"):
+    Raises:
+        ValueError: Si el contenido no es un array JSON bien formado, o si un
+            elemento supera `MAX_ELEMENT_CHARS`.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+    opened = False
+    expect_value = True
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    while True:
+        # Saltar espacios en blanco, leyendo más datos si hace falta
+        while True:
+            while pos < len(buf) and buf[pos].isspace():
+                pos += 1
+            if pos < len(buf) or not fill():
+                break
+        if pos >= len(buf):
+            raise ValueError("Fin de archivo inesperado: el array JSON no está cerrado")
+
+        ch = buf[pos]
+        if not opened:
+            if ch != "[":
+                raise ValueError("Se esperaba un array JSON")
+            opened = True
+            pos += 1
+            continue
+        if ch == "]":
+            return
+        if ch == ",":
+            if expect_value:
+                raise ValueError("Coma inesperada en el array JSON")
+            expect_value = True
+            pos += 1
+            continue
+        if not expect_value:
+            raise ValueError("Falta una coma entre elementos del array JSON")
+
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError as e:
+            if not _is_truncated(e):
+                raise
+            if len(buf) - pos > MAX_ELEMENT_CHARS:
+                raise ValueError(
+                    f"Un elemento del array JSON supera los {MAX_ELEMENT_CHARS} caracteres"
+                ) from e
+            if fill():
+                continue
+            raise
+        # Un número al final del búfer podría estar truncado: si tras el valor
+        # no hay un delimitador, leer más datos y volver a decodificar
+        truncated = end == len(buf) or buf[end] not in _DELIMITERS
+        if truncated and not eof and fill():
+            continue
+        pos = end
+        expect_value = False
+        yield value
+
+
+def _iter_json_lines(f) -> Iterator[Any]:
+    """
+    Decodifica un archivo JSON Lines (un documento por línea).
+
+    Args:
+        f: Archivo de texto abierto.
+
+    Raises:
+        ValueError: Si alguna línea no contiene JSON válido.
+    """
+    for lineno, line in enumerate(f, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"JSON inválido en la línea {lineno}: {e}") from e
+
+
+def iter_documents(path: str) -> Iterator[Any]:
+    """
+    Itera los documentos de un archivo JSON sin cargarlo entero en memoria.
+
+    Detecta automáticamente el formato: si el primer carácter significativo
+    es `[` se trata como un array JSON; en otro caso, como JSON Lines.
+
+    Args:
+        path (str): La ruta al archivo.
+
+    Yields:
+        Any: Cada documento decodificado.
+    """
+    with open(path, "r", encoding="utf-8-sig") as f:
+        first = ""
+        while True:
+            ch = f.read(1)
+            if not ch or not ch.isspace():
+                first = ch
+                break
+        f.seek(0)
+        if first == "[":
+            yield from _iter_json_array(f)
+        else:
+            yield from _iter_json_lines(f)
+
+
+def iter_batches(docs: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """
+    Agrupa un iterable de documentos en listas de tamaño `size`.
+
+    Args:
+        docs (Iterable[Any]): Documentos de entrada.
+        size (int): Tamaño máximo de cada lote.
+    """
+    batch: List[Any] = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# -------------------
+# VALIDACIÓN Y ESCRITURA
+# -------------------
+def prepare_batch(docs: List[Any], now: datetime) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Valida un lote de documentos con el modelo `Pokemon`.
+
+    Args:
+        docs (List[Any]): Documentos tal y como se leyeron del archivo.
+        now (datetime): Marca de tiempo para 'created_at' y 'updated_at'.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], int]: Los documentos válidos, listos para
+            insertar, y el número de documentos descartados.
+    """
+    valid = []
+    invalid = 0
+    for raw in docs:
+        if not isinstance(raw, dict):
+            invalid += 1
+            continue
+        try:
+            pokemon = Pokemon.model_validate(raw)
+        except ValidationError:
+            invalid += 1
+            continue
+        doc = pokemon.model_dump(exclude={"id", "created_at", "updated_at"})
+        doc.update({"created_at": now, "updated_at": now})
+        doc[NORMALIZED_FIELD] = normalize_name(doc["nombre"])
+        valid.append(doc)
+    return valid, invalid
+
+
+def write_batch(col: Collection, index: int, docs: List[Any]) -> BatchResult:
+    """
+    Valida y escribe un lote con un único `insert_many` no ordenado.
+
+    Los errores de escritura de documentos individuales no detienen el lote:
+    se contabilizan como fallidos y el resto de documentos se inserta.
+
+    Args:
+        col (Collection): La colección destino.
+        index (int): Número de lote (para los informes de progreso).
+        docs (List[Any]): Los documentos del lote.
+
+    Returns:
+        BatchResult: Los contadores del lote.
+    """
+    start = time.perf_counter()
+    result = BatchResult(index=index, size=len(docs))
+    valid, result.invalid = prepare_batch(docs, datetime.utcnow())
+    if valid:
+        try:
+            res = col.insert_many(valid, ordered=False)
+            result.inserted = len(res.inserted_ids)
+        except BulkWriteError as e:
+            result.inserted = e.details.get("nInserted", 0)
+            result.failed = len(valid) - result.inserted
+        except PyMongoError:
+            result.failed = len(valid)
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def print_progress(batch: BatchResult, stats: ImportStats) -> None:
+    """
+    Informe de progreso por defecto: una línea por lote.
+    """
+    print(
+        f"lote {batch.index}: {batch.inserted}/{batch.size} insertados, "
+        f"{batch.invalid} inválidos, {batch.failed} fallidos "
+        f"({batch.seconds:.2f}s) | total {stats.inserted} insertados, "
+        f"{stats.rate:.0f} docs/s"
+    )
+
+
+def bulk_import(
+    col: Collection,
+    docs: Iterable[Any],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = DEFAULT_WORKERS,
+    progress: Optional[Callable[[BatchResult, ImportStats], None]] = print_progress,
+    hooks: Sequence[Any] = (),
+) -> ImportStats:
+    """
+    Importa documentos en lotes paralelos con `insert_many` no ordenados.
+
+    Como mucho hay `2 * workers` lotes en vuelo: cuando se alcanza ese límite
+    se espera a que termine alguno antes de seguir leyendo la entrada, de modo
+    que la memoria queda acotada.
+
+    Args:
+        col (Collection): La colección destino.
+        docs (Iterable[Any]): Documentos a importar (puede ser un generador).
+        batch_size (int, optional): Documentos por `insert_many`.
+        workers (int, optional): Número de hilos escritores.
+        progress (Optional[Callable], optional): Función llamada tras cada lote
+            con su resultado y los contadores acumulados.
+        hooks (Sequence[Any], optional): Objetos avisados con
+            `on_bulk_write()` al terminar, como los del controlador, también
+            si un error corta la importación después de escribir algún lote.
+            Un fallo en un hook se registra pero no anula la importación.
+
+    Returns:
+        ImportStats: Los contadores finales de la importación.
+    """
+    stats = ImportStats()
+    start = time.perf_counter()
+    max_in_flight = max(1, workers) * 2
+
+    def collect(done) -> None:
+        for future in done:
+            batch = future.result()
+            stats.inserted += batch.inserted
+            stats.invalid += batch.invalid
+            stats.failed += batch.failed
+            stats.batches += 1
+            stats.elapsed = time.perf_counter() - start
+            if progress:
+                progress(batch, stats)
+
+    pending: Set[Future] = set()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for index, batch in enumerate(iter_batches(docs, batch_size), start=1):
+                stats.read += len(batch)
+                pending.add(pool.submit(write_batch, col, index, batch))
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+            done, pending = wait(pending)
+            collect(done)
+    finally:
+        # Si un error corta la importación, el pool ya ha esperado a los lotes
+        # en vuelo: se cuentan los que se escribieron para avisar a los hooks
+        for future in pending:
+            if future.done() and future.exception() is None:
+                batch = future.result()
+                stats.inserted += batch.inserted
+                stats.failed += batch.failed
+        if stats.inserted or stats.failed:
+            for hook in hooks:
+                try:
+                    hook.on_bulk_write()
+                except Exception:
+                    logger.exception("Error en el hook de escritura %r", hook)
+        stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def import_file(
+    path="./", batch_size: Optional[int] = None, workers: int = DEFAULT_WORKERS
+) -> ImportStats:
     """
     Importa un archivo JSON de Pokémon a la base de datos.
 
+    Usa el perfil de conexión 'import' (ver `db.py`). Con su confirmación de
+    escritura a 0 los lotes no esperan respuesta del servidor y los
+    documentos que fallen no se contabilizan. Al terminar se recalculan las
+    estadísticas y el catálogo de ataques materializados.
+
     Args:
-        path (str, optional): La ruta al archivo JSON. Defaults to "./".
+        path (str, optional): La ruta al archivo JSON o JSON Lines. Defaults to "./".
+        batch_size (Optional[int], optional): Documentos por lote de
+            escritura. Defaults to None (el del perfil).
+        workers (int, optional): Número de hilos escritores.
+
+    Returns:
+        ImportStats: Los contadores finales de la importación.
     """
-    db = get_db()
-    c = PokemonController(db["pokemons"])
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    inserted = 0
-    for doc in data:
-        c.insert(doc)
-        inserted += 1
-    print(f"{inserted} documentos insertados")
+    batch_size = batch_size or get_profile("import").batch_size
+    db = get_db("import")
+    stats = bulk_import(
+        db["pokemons"],
+        iter_documents(path),
+        batch_size=batch_size,
+        workers=workers,
+        hooks=[StatsService(get_db()), AttackCatalog(get_db())],
+    )
+    print(
+        f"{stats.inserted} documentos insertados, {stats.invalid} inválidos, "
+        f"{stats.failed} fallidos en {stats.elapsed:.1f}s ({stats.rate:.0f} docs/s)"
+    )
+    return stats
 
 
 if __name__ == "__main__":
-    import sys
+    import argparse
 
-    if len(sys.argv) < 2:
-        print("Uso: python import_json.py data/pokemons.json")
-    else:
-        import_file(sys.argv[1])
\ No newline at end of file
+    parser = argparse.ArgumentParser(
+        description="Importa Pokémon desde un array JSON o un archivo JSON Lines."
+    )
+    parser.add_argument("path", help="Ruta al archivo, p. ej. data/pokemons.json")
+    parser.add_argument(
+        "--batch-size", type=int, help="Documentos por lote (por defecto, el del perfil 'import')"
+    )
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args()
+    import_file(args.path, batch_size=args.batch_size, workers=args.workers)
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo de gestión de índices.
+
+Define en un único lugar los índices que necesita cada colección
+(`INDEX_SPEC`) y las funciones para comparar esa especificación con los
+índices que existen en el servidor (detección de desviaciones) y para
+crear los que falten.
+
+Los índices se aplican una vez por proceso desde `services.py`, o de forma
+explícita con `python manage.py ensure-indexes`; el `PokemonController` no
+crea índices.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.database import Database
+
+from attacks import ATTACKS_COLLECTION
+from changes import TOMBSTONE_TTL_DAYS, TOMBSTONES_COLLECTION
+from controller import PAGE_SORT_KEYS, UPSERT_KEYS
+from normalize import NORMALIZED_FIELD
+from sync import CONTENT_HASH_FIELD
+
+logger = logging.getLogger(__name__)
+
+
+def _pokemon_indexes() -> List[IndexModel]:
+    """
+    Índices de la colección 'pokemons'.
+    """
+    models = [
+        # Paginación por cursor: un índice (campo, _id) por ordenación
+        IndexModel([(key, ASCENDING), ("_id", ASCENDING)], background=True)
+        for key in PAGE_SORT_KEYS
+    ]
+    models += [
+        # Nombre normalizado: búsqueda por prefijo (rango) y por palabras (texto)
+        IndexModel([(NORMALIZED_FIELD, ASCENDING)], background=True),
+        IndexModel([(NORMALIZED_FIELD, TEXT)], default_language="none", background=True),
+        # Filtro de región del Listado combinado con el Pokedex mínimo
+        IndexModel(
+            [("region", ASCENDING), ("pokedex_nacional", ASCENDING)], background=True
+        ),
+        IndexModel([("tipo_primario", ASCENDING)], background=True),
+        # Registro de cambios (`changes_since`): recorrido en orden (updated_at, _id)
+        IndexModel([("updated_at", ASCENDING), ("_id", ASCENDING)], background=True),
+        # Multikey: un elemento de índice por ataque, seguido del orden de
+        # las búsquedas por ataque (`controller.ATTACK_SORT`)
+        IndexModel(
+            [("ataques.nombre", ASCENDING), ("pokedex_nacional", ASCENDING), ("_id", ASCENDING)],
+            background=True,
+        ),
+        IndexModel(
+            [("ataques.tipo", ASCENDING), ("pokedex_nacional", ASCENDING), ("_id", ASCENDING)],
+            background=True,
+        ),
+    ]
+    models += [
+        # Sincronización incremental: las huellas de un lote de claves se
+        # leen del índice, sin tocar los documentos
+        IndexModel([(key, ASCENDING), (CONTENT_HASH_FIELD, ASCENDING)], background=True)
+        for key in UPSERT_KEYS
+    ]
+    return models
+
+
+def _attack_indexes() -> List[IndexModel]:
+    """
+    Índices del catálogo de ataques ('attacks').
+    """
+    return [
+        # Un documento por ataque: clave de los `$inc` incrementales
+        IndexModel([("nombre", ASCENDING), ("tipo", ASCENDING)], unique=True, background=True),
+        # Autocompletado: los ataques más usados primero
+        IndexModel([("count", DESCENDING), ("nombre", ASCENDING)], background=True),
+    ]
+
+
+def _tombstone_indexes() -> List[IndexModel]:
+    """
+    Índices de las lápidas de los borrados ('pokemon_tombstones').
+    """
+    return [
+        # TTL: el servidor borra las lápidas pasados `TOMBSTONE_TTL_DAYS` días
+        IndexModel(
+            [("deleted_at", ASCENDING)],
+            expireAfterSeconds=int(TOMBSTONE_TTL_DAYS * 86400),
+            background=True,
+        ),
+        # Registro de cambios: recorrido en orden (deleted_at, _id)
+        IndexModel([("deleted_at", ASCENDING), ("_id", ASCENDING)], background=True),
+    ]
+
+
+# Colección -> índices que debe tener (además del de `_id`)
+INDEX_SPEC: Dict[str, List[IndexModel]] = {
+    "pokemons": _pokemon_indexes(),
+    ATTACKS_COLLECTION: _attack_indexes(),
+    TOMBSTONES_COLLECTION: _tombstone_indexes(),
+}
+
+
+@dataclass
+class IndexReport:
+    """
+    Diferencias entre los índices especificados y los existentes.
+    """
+    missing: List[Tuple[str, str]] = field(default_factory=list)
+    extra: List[Tuple[str, str]] = field(default_factory=list)
+    mismatched: List[Tuple[str, str]] = field(default_factory=list)
+    created: List[Tuple[str, str]] = field(default_factory=list)
+    dropped: List[Tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def in_sync(self) -> bool:
+        """
+        True si los índices existentes coinciden con la especificación.
+        """
+        return not (self.missing or self.extra or self.mismatched)
+
+    def lines(self) -> List[str]:
+        """
+        Descripción legible del informe, una línea por índice.
+        """
+        out = []
+        for label, items in (
+            ("falta", self.missing),
+            ("sobra", self.extra),
+            ("distinto", self.mismatched),
+            ("creado", self.created),
+            ("eliminado", self.dropped),
+        ):
+            out += [f"{label}: {collection}.{name}" for collection, name in items]
+        return out
+
+
+def _key_of(info: Dict[str, Any]) -> Tuple[Tuple[str, Any], ...]:
+    """
+    Patrón de claves comparable de un índice.
+
+    Los índices de texto se guardan en el servidor como `_fts`/`_ftsx` con
+    los campos en 'weights', así que se reconstruye el patrón original.
+    """
+    key = list(info["key"].items()) if isinstance(info["key"], dict) else list(info["key"])
+    if any(k == "_fts" for k, _ in key):
+        return tuple((name, TEXT) for name in sorted(info.get("weights", {})))
+    return tuple((k, v) for k, v in key)
+
+
+def check_indexes(db: Database) -> IndexReport:
+    """
+    Compara los índices del servidor con `INDEX_SPEC`, sin modificar nada.
+
+    Los índices se identifican por nombre; uno con el mismo nombre pero
+    distinto patrón de claves o distinto tiempo de vida (TTL) se informa
+    como distinto.
+
+    Args:
+        db (Database): La base de datos.
+
+    Returns:
+        IndexReport: Los índices que faltan, sobran o no coinciden.
+    """
+    report = IndexReport()
+    for collection, models in INDEX_SPEC.items():
+        existing = {
+            info["name"]: info
+            for info in db[collection].list_indexes()
+            if info["name"] != "_id_"
+        }
+        wanted = {m.document["name"]: m.document for m in models}
+        for name, doc in wanted.items():
+            if name not in existing:
+                report.missing.append((collection, name))
+            elif (
+                _key_of(existing[name]) != _key_of(doc)
+                or existing[name].get("expireAfterSeconds") != doc.get("expireAfterSeconds")
+            ):
+                report.mismatched.append((collection, name))
+        report.extra += [(collection, name) for name in existing if name not in wanted]
+    return report
+
+
+def ensure_indexes(db: Database, drop_extra: bool = False) -> IndexReport:
+    """
+    Crea los índices de `INDEX_SPEC` que falten (construcción en segundo plano).
+
+    Los índices distintos de la especificación no se tocan: hay que
+    revisarlos y eliminarlos a mano, porque reconstruirlos puede ser caro.
+
+    Args:
+        db (Database): La base de datos.
+        drop_extra (bool, optional): Elimina también los índices que no están
+            en la especificación. Defaults to False.
+
+    Returns:
+        IndexReport: El estado previo y los índices creados o eliminados.
+    """
+    report = check_indexes(db)
+    for collection, models in INDEX_SPEC.items():
+        names = {name for coll, name in report.missing if coll == collection}
+        to_create = [m for m in models if m.document["name"] in names]
+        if to_create:
+            db[collection].create_indexes(to_create)
+            report.created += [(collection, m.document["name"]) for m in to_create]
+    if drop_extra:
+        for collection, name in report.extra:
+            db[collection].drop_index(name)
+            report.dropped.append((collection, name))
+    for line in report.lines():
+        logger.info("Índices: %s", line)
+    return report
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+Comandos de administración de la base de datos.
+
+Agrupa en un único punto de entrada las tareas de mantenimiento que no
+tienen sentido dentro de la interfaz de Streamlit.
+
+Uso:
+    python manage.py backfill-search
+    python manage.py rebuild-stats
+    python manage.py rebuild-attacks
+    python manage.py ensure-indexes [--check] [--drop-extra]
+    python manage.py import-sprites DIR
+    python manage.py export OUT [--format jsonl|csv|parquet] [--compression gzip|zstd]
+    python manage.py profiles [--check]
+    python manage.py sync FILE [--key nombre|pokedex_nacional] [--delete-missing]
+    python manage.py changes [--since TOKEN | --since-date FECHA] [--state FILE] [--output FILE]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Any
+
+from attacks import AttackCatalog
+from db import PROFILES, get_client, get_db, get_profile
+from changes import CHANGES_PAGE_SIZE, StaleWatermarkError
+from controller import UPSERT_KEYS, PokemonController, changes_token, listing_filter
+from export import COMPRESSIONS, FORMATS, export_file
+from import_json import iter_documents
+from indexes import check_indexes, ensure_indexes
+from monitoring import pool_monitor
+from sprites import SpriteStore
+from stats import StatsService
+
+
+def cmd_backfill_search(args) -> None:
+    """
+    Calcula el nombre normalizado en los documentos que no lo tienen.
+    """
+    controller = PokemonController(get_db()["pokemons"])
+    result = controller.backfill_search_keys(batch_size=args.batch_size)
+    print(f"{result.matched} documentos actualizados, {result.failed} fallidos")
+
+
+def cmd_rebuild_stats(args) -> None:
+    """
+    Recalcula por completo el documento de estadísticas materializadas.
+    """
+    stats = StatsService(get_db()).rebuild()
+    print(f"Estadísticas reconstruidas: {stats['total']} Pokémon")
+
+
+def cmd_rebuild_attacks(args) -> None:
+    """
+    Recalcula por completo el catálogo de ataques materializado.
+    """
+    total = AttackCatalog(get_db()).rebuild()
+    print(f"Catálogo de ataques reconstruido: {total} ataques distintos")
+
+
+def cmd_ensure_indexes(args) -> None:
+    """
+    Compara los índices con la especificación y crea los que falten.
+
+    Con `--check` solo informa, y termina con error si hay diferencias.
+    """
+    if args.check:
+        report = check_indexes(get_db())
+    else:
+        report = ensure_indexes(get_db(), drop_extra=args.drop_extra)
+    for line in report.lines():
+        print(line)
+    if report.in_sync:
+        print("Los índices coinciden con la especificación.")
+    if args.check and not report.in_sync:
+        sys.exit(1)
+
+
+def cmd_import_sprites(args) -> None:
+    """
+    Importa los sprites de un directorio local y genera sus miniaturas.
+    """
+    store = SpriteStore()
+    result = store.import_dir(args.directory)
+    for error in result.errors:
+        print(error)
+    stats = store.stats()
+    print(
+        f"{result.imported} sprites importados, {result.skipped} omitidos, "
+        f"{result.failed} fallidos; miniaturas en disco: {stats['disk_bytes'] / 1024:.0f} KB"
+    )
+
+
+def cmd_export(args) -> None:
+    """
+    Exporta la colección, o los Pokémon de una región, a un archivo.
+    """
+    filtro = listing_filter(region=args.region, min_pokedex=args.min_pokedex)
+    export_file(
+        args.output, fmt=args.format, compression=args.compression,
+        filter=filtro, batch_size=args.batch_size,
+    )
+
+
+def cmd_profiles(args) -> None:
+    """
+    Muestra los perfiles de conexión y, con `--check`, conecta con cada uno
+    y muestra el estado de su pool.
+    """
+    for name, profile in PROFILES.items():
+        options = {k: v for k, v in profile.options().items() if v is not None}
+        options["batch_size"] = profile.batch_size
+        print(f"{name}: " + ", ".join(f"{k}={v}" for k, v in options.items()))
+        if not args.check:
+            continue
+        start = time.perf_counter()
+        get_client(name).admin.command("ping")
+        stats = pool_monitor(name).stats()
+        print(
+            f"  ping {(time.perf_counter() - start) * 1000:.1f} ms, "
+            f"{stats.servers} servidores, {stats.open} conexiones abiertas, "
+            f"espera media {stats.wait_ms_mean:.2f} ms"
+        )
+
+
+def cmd_sync(args) -> None:
+    """
+    Sincroniza la colección con un archivo JSON: solo escribe los Pokémon
+    nuevos o cambiados desde la última sincronización.
+    """
+    db = get_db("import")
+    controller = PokemonController(
+        db["pokemons"], hooks=[StatsService(db), AttackCatalog(db)]
+    )
+    start = time.perf_counter()
+    result = controller.sync(
+        iter_documents(args.file), key=args.key, delete_missing=args.delete_missing,
+        batch_size=args.batch_size or get_profile("import").batch_size,
+    )
+    print(
+        f"{result.inserted} insertados, {result.updated} actualizados, "
+        f"{result.unchanged} sin cambios, {result.deleted} eliminados, "
+        f"{result.failed} fallidos en {time.perf_counter() - start:.1f}s"
+    )
+
+
+def _json_line(record: Any) -> str:
+    """
+    Serializa un cambio como una línea de JSON Lines, con los `_id` como
+    cadenas y las fechas en ISO 8601.
+    """
+    def default(value: Any) -> Any:
+        return value.isoformat() if isinstance(value, datetime) else str(value)
+
+    return json.dumps(record, default=default, ensure_ascii=False) + "\n"
+
+
+def cmd_changes(args) -> None:
+    """
+    Escribe en JSON Lines los cambios posteriores a una marca: una línea
+    `{"op": "upsert", "pokemon": {...}}` por Pokémon creado o modificado y
+    una `{"op": "delete", "_id": ..., "deleted_at": ...}` por borrado.
+
+    Con `--state`, la marca se lee de ese archivo y, al terminar, se guarda
+    en él la nueva, de modo que cada ejecución continúa donde lo dejó la
+    anterior.
+    """
+    token = args.since
+    if args.since_date:
+        token = changes_token(datetime.fromisoformat(args.since_date))
+    elif not token and args.state and os.path.exists(args.state):
+        with open(args.state, "r", encoding="utf-8") as f:
+            token = f.read().strip() or None
+
+    controller = PokemonController(get_db("analytics")["pokemons"])
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    upserts = deletes = 0
+    try:
+        while True:
+            page = controller.changes_since(token, limit=args.limit)
+            for item in page.items:
+                out.write(_json_line({"op": "upsert", "pokemon": item.to_dict()}))
+            for tombstone in page.deleted:
+                out.write(_json_line({"op": "delete", **tombstone}))
+            upserts += len(page.items)
+            deletes += len(page.deleted)
+            token = page.next_token
+            if not page.has_more:
+                break
+    except StaleWatermarkError as e:
+        print(e, file=sys.stderr)
+        sys.exit(2)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if args.state and token:
+        with open(args.state, "w", encoding="utf-8") as f:
+            f.write(token)
+    print(f"{upserts} Pokémon nuevos o modificados, {deletes} borrados", file=sys.stderr)
+    print(f"Marca: {token}", file=sys.stderr)
+
+
+def main() -> None:
+    """
+    Analiza los argumentos de la línea de comandos y ejecuta el comando.
+    """
+    parser = argparse.ArgumentParser(description="Administración del Pokedex.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser(
+        "backfill-search", help="Rellena 'nombre_norm' en documentos antiguos."
+    )
+    p.add_argument("--batch-size", type=int, default=1000)
+    p.set_defaults(func=cmd_backfill_search)
+
+    p = sub.add_parser(
+        "rebuild-stats", help="Reconstruye la colección 'pokemon_stats'."
+    )
+    p.set_defaults(func=cmd_rebuild_stats)
+
+    p = sub.add_parser(
+        "rebuild-attacks", help="Reconstruye el catálogo de ataques ('attacks')."
+    )
+    p.set_defaults(func=cmd_rebuild_attacks)
+
+    p = sub.add_parser(
+        "ensure-indexes", help="Crea los índices que falten y detecta desviaciones."
+    )
+    p.add_argument("--check", action="store_true", help="Solo comprueba, sin crear nada.")
+    p.add_argument(
+        "--drop-extra", action="store_true", help="Elimina los índices no especificados."
+    )
+    p.set_defaults(func=cmd_ensure_indexes)
+
+    p = sub.add_parser(
+        "import-sprites", help="Importa sprites ('<pokedex>.png') de un directorio local."
+    )
+    p.add_argument("directory", help="Directorio con las imágenes")
+    p.set_defaults(func=cmd_import_sprites)
+
+    p = sub.add_parser(
+        "export", help="Exporta la colección a JSON Lines, CSV o Parquet."
+    )
+    p.add_argument("output", help="Archivo de salida")
+    p.add_argument("--format", choices=FORMATS, default="jsonl")
+    p.add_argument("--compression", choices=COMPRESSIONS, default="none")
+    p.add_argument("--region", default="", help="Solo los Pokémon de esta región")
+    p.add_argument("--min-pokedex", type=int, default=0, help="Pokedex nacional mínimo")
+    p.add_argument(
+        "--batch-size", type=int,
+        help="Documentos por lote (por defecto, el del perfil 'analytics')",
+    )
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("profiles", help="Muestra los perfiles de conexión.")
+    p.add_argument(
+        "--check", action="store_true", help="Conecta con cada perfil y muestra su pool."
+    )
+    p.set_defaults(func=cmd_profiles)
+
+    p = sub.add_parser(
+        "sync", help="Sincroniza la colección con un archivo JSON (solo los cambios)."
+    )
+    p.add_argument("file", help="Archivo JSON con la lista de Pokémon")
+    p.add_argument("--key", choices=UPSERT_KEYS, default="nombre")
+    p.add_argument(
+        "--delete-missing", action="store_true",
+        help="Elimina los Pokémon que no estén en el archivo.",
+    )
+    p.add_argument(
+        "--batch-size", type=int,
+        help="Registros por lote (por defecto, el del perfil 'import')",
+    )
+    p.set_defaults(func=cmd_sync)
+
+    p = sub.add_parser(
+        "changes", help="Cambios posteriores a una marca, en JSON Lines (con lápidas)."
+    )
+    since = p.add_mutually_exclusive_group()
+    since.add_argument("--since", help="Token de una ejecución anterior")
+    since.add_argument("--since-date", help="Fecha UTC de partida, p. ej. 2026-01-31T00:00")
+    p.add_argument("--state", help="Archivo donde se lee y se guarda la marca")
+    p.add_argument("--output", help="Archivo JSON Lines de salida (por defecto, stdout)")
+    p.add_argument("--limit", type=int, default=CHANGES_PAGE_SIZE, help="Cambios por lectura")
+    p.set_defaults(func=cmd_changes)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,501 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo de enfrentamientos entre tipos.
+
+Define `MatchupEngine`, que calcula sobre todos los Pokémon de la colección
+los mejores counters de un Pokémon y la cobertura de un equipo. Los tipos se
+codifican como enteros, la tabla de efectividades es una matriz de NumPy y
+la plantilla completa se guarda codificada en arrays (`Roster`), de modo que
+cada consulta son unas pocas operaciones vectorizadas sobre la plantilla en
+lugar de un bucle de Python por Pokémon.
+
+La plantilla se carga de la colección la primera vez y se mantiene entre
+llamadas; el motor se registra como hook de escritura del
+`PokemonController` para actualizarla con cada escritura.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pyarrow as pa
+from pymongo.collection import Collection
+
+from normalize import normalize_name
+
+# Tipos admitidos, en el orden de sus códigos
+TYPES = (
+    "Normal", "Fuego", "Agua", "Planta", "Eléctrico", "Hielo", "Lucha", "Veneno",
+    "Tierra", "Volador", "Psíquico", "Bicho", "Roca", "Fantasma", "Dragón",
+    "Siniestro", "Acero", "Hada",
+)
+TYPE_CODES = {name: code for code, name in enumerate(TYPES)}
+# Códigos por nombre normalizado, para tipos escritos sin acentos, en otra
+# capitalización o con espacios ("fuego", "Electrico", "Fuego ")
+_NORMALIZED_CODES = {normalize_name(name): code for name, code in TYPE_CODES.items()}
+
+# Código de "sin tipo" (segundo tipo vacío o tipo desconocido): neutro con todo
+NO_TYPE = len(TYPES)
+
+# Efectividades distintas de x1 por tipo atacante: (x2, x0.5, x0)
+_EFFECTIVENESS = {
+    "Normal": ((), ("Roca", "Acero"), ("Fantasma",)),
+    "Fuego": (
+        ("Planta", "Hielo", "Bicho", "Acero"), ("Fuego", "Agua", "Roca", "Dragón"), ()
+    ),
+    "Agua": (("Fuego", "Tierra", "Roca"), ("Agua", "Planta", "Dragón"), ()),
+    "Eléctrico": (("Agua", "Volador"), ("Eléctrico", "Planta", "Dragón"), ("Tierra",)),
+    "Planta": (
+        ("Agua", "Tierra", "Roca"),
+        ("Fuego", "Planta", "Veneno", "Volador", "Bicho", "Dragón", "Acero"),
+        (),
+    ),
+    "Hielo": (
+        ("Planta", "Tierra", "Volador", "Dragón"), ("Fuego", "Agua", "Hielo", "Acero"), ()
+    ),
+    "Lucha": (
+        ("Normal", "Hielo", "Roca", "Siniestro", "Acero"),
+        ("Veneno", "Volador", "Psíquico", "Bicho", "Hada"),
+        ("Fantasma",),
+    ),
+    "Veneno": (("Planta", "Hada"), ("Veneno", "Tierra", "Roca", "Fantasma"), ("Acero",)),
+    "Tierra": (
+        ("Fuego", "Eléctrico", "Veneno", "Roca", "Acero"), ("Planta", "Bicho"), ("Volador",)
+    ),
+    "Volador": (("Planta", "Lucha", "Bicho"), ("Eléctrico", "Roca", "Acero"), ()),
+    "Psíquico": (("Lucha", "Veneno"), ("Psíquico", "Acero"), ("Siniestro",)),
+    "Bicho": (
+        ("Planta", "Psíquico", "Siniestro"),
+        ("Fuego", "Lucha", "Veneno", "Volador", "Fantasma", "Acero", "Hada"),
+        (),
+    ),
+    "Roca": (("Fuego", "Hielo", "Volador", "Bicho"), ("Lucha", "Tierra", "Acero"), ()),
+    "Fantasma": (("Psíquico", "Fantasma"), ("Siniestro",), ("Normal",)),
+    "Dragón": (("Dragón",), ("Acero",), ("Hada",)),
+    "Siniestro": (("Psíquico", "Fantasma"), ("Lucha", "Siniestro", "Hada"), ()),
+    "Acero": (("Hielo", "Roca", "Hada"), ("Fuego", "Agua", "Eléctrico", "Acero"), ()),
+    "Hada": (("Lucha", "Dragón", "Siniestro"), ("Fuego", "Veneno", "Acero"), ()),
+}
+
+# Multiplicador mínimo del daño recibido al puntuar un counter: una
+# inmunidad cuenta como una resistencia muy fuerte en lugar de dividir por 0
+MIN_DAMAGE_TAKEN = 0.125
+
+ROSTER_PROJECTION = {
+    "nombre": 1,
+    "pokedex_nacional": 1,
+    "nivel": 1,
+    "tipo_primario": 1,
+    "tipo_secundario": 1,
+    "ataques.tipo": 1,
+}
+ROSTER_BATCH_SIZE = 10000
+
+
+def build_chart() -> np.ndarray:
+    """
+    Tabla de efectividades: `chart[atacante, defensor]` es el multiplicador
+    de un ataque del tipo atacante contra un tipo defensor.
+
+    Returns:
+        np.ndarray: Matriz float32 de (NO_TYPE + 1) x (NO_TYPE + 1); la fila
+            y la columna de `NO_TYPE` son neutras.
+    """
+    chart = np.ones((NO_TYPE + 1, NO_TYPE + 1), dtype=np.float32)
+    for attacker, groups in _EFFECTIVENESS.items():
+        for multiplier, defenders in zip((2.0, 0.5, 0.0), groups):
+            for defender in defenders:
+                chart[TYPE_CODES[attacker], TYPE_CODES[defender]] = multiplier
+    return chart
+
+
+CHART = build_chart()
+
+
+def type_code(name: Optional[str]) -> int:
+    """
+    Código de un tipo (`NO_TYPE` si está vacío o no se reconoce). El nombre
+    se compara sin mayúsculas, acentos ni espacios, como en `normalize_name`.
+    """
+    if not name:
+        return NO_TYPE
+    code = TYPE_CODES.get(name)
+    if code is None and isinstance(name, str):
+        code = _NORMALIZED_CODES.get(normalize_name(name))
+    return NO_TYPE if code is None else code
+
+
+def _encode(doc: Dict[str, Any]):
+    """
+    Codifica un documento: tipos y máscara de tipos ofensivos.
+
+    Los tipos ofensivos son los de sus ataques; un Pokémon sin ataques
+    conocidos ataca con sus propios tipos.
+    """
+    t1 = type_code(doc.get("tipo_primario"))
+    t2 = type_code(doc.get("tipo_secundario"))
+    if t2 == t1:
+        t2 = NO_TYPE
+    moves = np.zeros(NO_TYPE, dtype=bool)
+    for ataque in doc.get("ataques") or []:
+        code = type_code(ataque.get("tipo")) if isinstance(ataque, dict) else NO_TYPE
+        if code != NO_TYPE:
+            moves[code] = True
+    if not moves.any():
+        for code in (t1, t2):
+            if code != NO_TYPE:
+                moves[code] = True
+    return t1, t2, moves
+
+
+@dataclass
+class Roster:
+    """
+    Plantilla completa codificada en arrays (una posición por Pokémon).
+
+    `damage[t, i]` es el multiplicador que recibe el Pokémon `i` de un ataque
+    de tipo `t` (el producto de la efectividad contra sus dos tipos).
+
+    Los Pokémon nuevos se añaden al final (`append`): tras el primero, los
+    arrays son vistas de otros con espacio de sobra, que duplican su tamaño
+    al llenarse, así que añadir no copia la plantilla en cada inserción.
+    """
+    ids: np.ndarray
+    nombres: np.ndarray
+    pokedex: np.ndarray
+    nivel: np.ndarray
+    t1: np.ndarray
+    t2: np.ndarray
+    moves: np.ndarray
+    damage: np.ndarray
+    active: np.ndarray
+    index: Dict[str, int]
+    _buffers: Dict[str, np.ndarray] = field(default_factory=dict, repr=False)
+
+    def __len__(self) -> int:
+        return int(self.active.sum())
+
+    @classmethod
+    def from_documents(cls, docs: Iterable[Dict[str, Any]]) -> "Roster":
+        """
+        Codifica los documentos de un cursor (con `ROSTER_PROJECTION`).
+        """
+        ids, nombres, pokedex, nivel, t1, t2, moves = [], [], [], [], [], [], []
+        for doc in docs:
+            a, b, m = _encode(doc)
+            ids.append(str(doc["_id"]))
+            nombres.append(doc.get("nombre"))
+            pokedex.append(doc.get("pokedex_nacional") or 0)
+            nivel.append(doc.get("nivel") or 0)
+            t1.append(a)
+            t2.append(b)
+            moves.append(m)
+        t1_arr = np.array(t1, dtype=np.int8)
+        t2_arr = np.array(t2, dtype=np.int8)
+        return cls(
+            ids=np.array(ids, dtype=object),
+            nombres=np.array(nombres, dtype=object),
+            pokedex=np.array(pokedex, dtype=np.int64),
+            nivel=np.array(nivel, dtype=np.int64),
+            t1=t1_arr,
+            t2=t2_arr,
+            moves=np.array(moves, dtype=bool).reshape(len(ids), NO_TYPE),
+            damage=CHART[:NO_TYPE, t1_arr] * CHART[:NO_TYPE, t2_arr],
+            active=np.ones(len(ids), dtype=bool),
+            index={oid: i for i, oid in enumerate(ids)},
+        )
+
+    def patch(self, doc: Dict[str, Any]) -> bool:
+        """
+        Actualiza en su sitio un Pokémon que ya está en la plantilla.
+
+        Returns:
+            bool: False si el Pokémon no está (ver `append`).
+        """
+        i = self.index.get(str(doc["_id"]))
+        if i is None:
+            return False
+        self._set(i, doc)
+        return True
+
+    def append(self, doc: Dict[str, Any]) -> None:
+        """
+        Añade al final de la plantilla un Pokémon que no está en ella.
+        """
+        i = len(self.ids)
+        if not self._buffers or i == self._buffers["ids"].shape[0]:
+            self._grow(max(2 * i, 16))
+        for name, buf in self._buffers.items():
+            # `damage` guarda un Pokémon por columna; el resto, uno por fila
+            setattr(self, name, buf[:, : i + 1] if name == "damage" else buf[: i + 1])
+        self.ids[i] = str(doc["_id"])
+        self.index[self.ids[i]] = i
+        self._set(i, doc)
+
+    def _grow(self, capacity: int) -> None:
+        """
+        Copia los arrays en otros con sitio para `capacity` Pokémon.
+        """
+        n = len(self.ids)
+        for name in ("ids", "nombres", "pokedex", "nivel", "t1", "t2", "moves", "active"):
+            arr = getattr(self, name)
+            buf = np.zeros((capacity,) + arr.shape[1:], dtype=arr.dtype)
+            buf[:n] = arr
+            self._buffers[name] = buf
+        buf = np.ones((NO_TYPE, capacity), dtype=self.damage.dtype)
+        buf[:, :n] = self.damage
+        self._buffers["damage"] = buf
+
+    def _set(self, i: int, doc: Dict[str, Any]) -> None:
+        """
+        Escribe los datos de un documento en la posición `i`.
+        """
+        a, b, m = _encode(doc)
+        self.nombres[i] = doc.get("nombre")
+        self.pokedex[i] = doc.get("pokedex_nacional") or 0
+        self.nivel[i] = doc.get("nivel") or 0
+        self.t1[i], self.t2[i], self.moves[i] = a, b, m
+        self.damage[:, i] = CHART[:NO_TYPE, a] * CHART[:NO_TYPE, b]
+        self.active[i] = True
+
+    def best_attack(self, damage: np.ndarray) -> np.ndarray:
+        """
+        Mejor multiplicador de los ataques de cada Pokémon contra un
+        defensor cuyo daño recibido por tipo es `damage` (vector de NO_TYPE).
+        """
+        # Los multiplicadores posibles son pocos: se comprueba con un producto
+        # de matrices qué niveles alcanza cada Pokémon y se toma el mayor
+        levels = np.unique(damage)[::-1]
+        reached = self.moves.astype(np.float32) @ (damage == levels[:, None]).T > 0
+        best = levels[reached.argmax(axis=1)]
+        return np.where(reached.any(axis=1), best, 0.0).astype(np.float32)
+
+    def best_attack_from(self, i: int) -> np.ndarray:
+        """
+        Mejor multiplicador de los ataques del Pokémon `i` contra cada
+        Pokémon de la plantilla (0 si no tiene ningún tipo ofensivo
+        reconocido).
+        """
+        moves = self.moves[i]
+        if not moves.any():
+            return np.zeros(self.damage.shape[1], dtype=np.float32)
+        return self.damage[moves].max(axis=0)
+
+
+@dataclass
+class Coverage:
+    """
+    Cobertura ofensiva de un equipo sobre toda la plantilla.
+    """
+    total: int
+    super_effective: float
+    neutral: float
+    resisted: float
+    immune: float
+    threats: pa.Table
+
+
+def _type_names(t1: np.ndarray, t2: np.ndarray) -> List[str]:
+    names = np.array(TYPES + ("",), dtype=object)
+    return [a if not b else f"{a} / {b}" for a, b in zip(names[t1], names[t2])]
+
+
+class MatchupEngine:
+    """
+    Counters y cobertura de tipos sobre toda la colección de Pokémon.
+
+    Se registra como hook de escritura del `PokemonController`: las
+    escrituras individuales se aplican sobre la plantilla cargada y las
+    masivas hacen que se recargue en la siguiente consulta. Las consultas
+    leen la plantilla con el cerrojo adquirido, así que una escritura
+    concurrente no puede dejarles una mezcla de datos viejos y nuevos.
+    """
+
+    def __init__(self, collection: Optional[Collection], roster: Optional[Roster] = None):
+        """
+        Inicializa el motor (la plantilla se carga en la primera consulta).
+
+        Args:
+            collection (Optional[Collection]): La colección de Pokémon.
+            roster (Optional[Roster], optional): Una plantilla ya codificada
+                (p. ej. para los benchmarks). Defaults to None.
+        """
+        self.col = collection
+        self._roster = roster
+        self._lock = threading.Lock()
+
+    def roster(self) -> Roster:
+        """
+        Devuelve la plantilla codificada, cargándola si hace falta.
+        """
+        with self._lock:
+            return self._load()
+
+    def _load(self) -> Roster:
+        """
+        Igual que `roster`; se llama con el cerrojo adquirido.
+        """
+        if self._roster is None:
+            cursor = self.col.find({}, ROSTER_PROJECTION, batch_size=ROSTER_BATCH_SIZE)
+            self._roster = Roster.from_documents(cursor)
+        return self._roster
+
+    def counters(self, id_str: str, limit: int = 20) -> Optional[pa.Table]:
+        """
+        Los mejores counters de un Pokémon en toda la plantilla.
+
+        Cada candidato se puntúa con el mejor multiplicador de sus ataques
+        contra el objetivo dividido entre el mejor multiplicador de los
+        ataques del objetivo contra él (como mínimo `MIN_DAMAGE_TAKEN`). A
+        igual puntuación se prefiere el de más nivel.
+
+        Args:
+            id_str (str): El ID del Pokémon objetivo.
+            limit (int, optional): Número de counters. Defaults to 20.
+
+        Returns:
+            Optional[pa.Table]: Una fila por counter, de mejor a peor, o None
+                si el Pokémon no está en la plantilla.
+        """
+        with self._lock:
+            return self._counters(self._load(), id_str, limit)
+
+    @staticmethod
+    def _counters(roster: Roster, id_str: str, limit: int) -> Optional[pa.Table]:
+        """
+        Cálculo de `counters`; se llama con el cerrojo adquirido.
+        """
+        target = roster.index.get(id_str)
+        if target is None or not roster.active[target]:
+            return None
+        dealt = roster.best_attack(roster.damage[:, target])
+        taken = roster.best_attack_from(target)
+        score = dealt / np.maximum(taken, MIN_DAMAGE_TAKEN)
+
+        candidates = roster.active & (dealt > 0)
+        candidates[target] = False
+        score = np.where(candidates, score, -1.0)
+        k = min(limit, int(candidates.sum()))
+        if k == 0:
+            top = np.array([], dtype=np.int64)
+        else:
+            top = np.argpartition(-score, k - 1)[:k]
+            top = top[np.lexsort((-roster.nivel[top], -score[top]))]
+        return pa.table(
+            {
+                "id": pa.array(roster.ids[top].tolist(), pa.string()),
+                "nombre": pa.array(roster.nombres[top].tolist(), pa.string()),
+                "pokedex_nacional": pa.array(roster.pokedex[top]),
+                "tipos": pa.array(_type_names(roster.t1[top], roster.t2[top]), pa.string()),
+                "nivel": pa.array(roster.nivel[top]),
+                "ataca": pa.array(dealt[top]),
+                "recibe": pa.array(taken[top]),
+                "puntuacion": pa.array(score[top]),
+            }
+        )
+
+    def coverage(self, ids: List[str], limit: int = 20) -> Optional[Coverage]:
+        """
+        Cobertura ofensiva de un equipo sobre toda la plantilla.
+
+        Para cada Pokémon de la plantilla se toma el mejor multiplicador que
+        le puede hacer algún miembro del equipo. Las amenazas son los Pokémon
+        a los que el equipo no hace daño súper eficaz, ordenados por cuántos
+        miembros del equipo golpean ellos de forma súper eficaz.
+
+        Args:
+            ids (List[str]): Los IDs de los miembros del equipo.
+            limit (int, optional): Número de amenazas. Defaults to 20.
+
+        Returns:
+            Optional[Coverage]: La cobertura, o None si ningún miembro está
+                en la plantilla.
+        """
+        with self._lock:
+            return self._coverage(self._load(), ids, limit)
+
+    @staticmethod
+    def _coverage(roster: Roster, ids: List[str], limit: int) -> Optional[Coverage]:
+        """
+        Cálculo de `coverage`; se llama con el cerrojo adquirido.
+        """
+        team = [roster.index[i] for i in ids if i in roster.index]
+        team = [i for i in team if roster.active[i]]
+        if not team:
+            return None
+        best = np.max([roster.best_attack_from(i) for i in team], axis=0)
+        # Miembros del equipo a los que cada Pokémon golpea de forma súper
+        # eficaz: tipos x2 contra cada miembro y un producto de matrices con
+        # la máscara de tipos ofensivos de la plantilla
+        weak = (roster.damage[:, team] >= 2).astype(np.float32)
+        hits = (roster.moves.astype(np.float32) @ weak > 0).sum(axis=1)
+
+        active = roster.active.copy()
+        active[team] = False
+        total = int(active.sum())
+
+        def share(mask: np.ndarray) -> float:
+            return float((mask & active).sum()) / total if total else 0.0
+
+        threat = active & (best < 2) & (hits > 0)
+        order = np.flatnonzero(threat)
+        order = order[np.lexsort((best[order], -hits[order]))][:limit]
+        return Coverage(
+            total=total,
+            super_effective=share(best >= 2),
+            neutral=share((best >= 1) & (best < 2)),
+            resisted=share((best > 0) & (best < 1)),
+            immune=share(best == 0),
+            threats=pa.table(
+                {
+                    "id": pa.array(roster.ids[order].tolist(), pa.string()),
+                    "nombre": pa.array(roster.nombres[order].tolist(), pa.string()),
+                    "tipos": pa.array(
+                        _type_names(roster.t1[order], roster.t2[order]), pa.string()
+                    ),
+                    "mejor_ataque": pa.array(best[order]),
+                    "golpea_a": pa.array(hits[order]),
+                }
+            ),
+        )
+
+    # -------------------
+    # HOOKS DE ESCRITURA
+    # -------------------
+    def invalidate(self) -> None:
+        """
+        Descarta la plantilla: se recargará en la siguiente consulta.
+        """
+        with self._lock:
+            self._roster = None
+
+    def on_write(
+        self, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]
+    ) -> None:
+        """
+        Aplica una escritura individual sobre la plantilla cargada.
+
+        Args:
+            before (Optional[Dict[str, Any]]): El documento antes de la
+                escritura (None en inserciones).
+            after (Optional[Dict[str, Any]]): El documento tras la escritura
+                (None en borrados).
+        """
+        with self._lock:
+            roster = self._roster
+            if roster is None:
+                return
+            if after is None:
+                i = roster.index.get(str(before["_id"])) if before else None
+                if i is not None:
+                    roster.active[i] = False
+                return
+            if not roster.patch(after):
+                roster.append(after)
+
+    def on_bulk_write(self) -> None:
+        """
+        Tras una escritura masiva se recarga la plantilla completa.
+        """
+        self.invalidate()
@@ -6,7 +6,7 @@ Este módulo define los modelos de datos utilizados en la aplicación,
 incluyendo el modelo principal `Pokemon` y otros modelos auxiliares.
 """
 
-from typing import List, Optional
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Type
 from pydantic import BaseModel, Field, validator
 from datetime import datetime
 from bson import ObjectId
@@ -71,6 +71,9 @@ class Pokemon(BaseModel):
     ataques: Optional[List[Attack]] = []
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
+    # Se incrementa con cada escritura; las ediciones lo comprueban para no
+    # sobrescribir cambios ajenos (control de concurrencia optimista)
+    version: int = 0
 
     class Config:
         """
@@ -87,4 +90,214 @@ class Pokemon(BaseModel):
         """
         if not v or not v.strip():
             raise ValueError("nombre no puede estar vacío")
-        return v.strip()
\ No newline at end of file
+        return v.strip()
+
+
+class PokemonSummary(BaseModel):
+    """
+    Modelo Pydantic ligero de un Pokémon para listados y búsquedas.
+
+    No incluye los ataques ni las marcas de tiempo, de modo que las consultas
+    que lo usan transfieren y decodifican muchos menos datos.
+    """
+    id: Optional[PyObjectId] = Field(None, alias="_id")
+    nombre: str
+    region: Optional[str] = None
+    pokedex_nacional: Optional[int] = None
+    tipo_primario: Optional[str] = None
+    tipo_secundario: Optional[str] = None
+    nivel: Optional[int] = None
+
+    class Config:
+        """
+        Configuración del modelo Pydantic.
+        """
+        allow_population_by_field_name = True
+        arbitrary_types_allowed = True
+        json_encoders = {ObjectId: str}
+
+
+# Proyección de MongoDB con los campos de `PokemonSummary` (`_id` se incluye siempre)
+SUMMARY_PROJECTION = {
+    name: 1 for name in PokemonSummary.model_fields if name != "id"
+}
+
+
+class AttackRecord(NamedTuple):
+    """
+    Ataque de un `PokemonRecord`, con los mismos atributos que `Attack`.
+    """
+    nombre: str
+    tipo: str
+
+
+class _Record:
+    """
+    Registro de solo lectura con `__slots__` y los mismos atributos que un
+    modelo Pydantic, construido sin validación a partir de un documento.
+
+    Las subclases se generan con `record_type`.
+    """
+    __slots__ = ()
+    model: Type[BaseModel]
+    _fields: Tuple[Tuple[str, str, Any], ...] = ()
+
+    def __init__(self, doc: Dict[str, Any]):
+        get = doc.get
+        for name, key, default in self._fields:
+            setattr(self, name, get(key, default))
+        if "ataques" in self.__slots__:
+            self.ataques = [
+                AttackRecord(a.get("nombre"), a.get("tipo")) for a in self.ataques or ()
+            ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Devuelve el registro como documento, con los nombres de campo de
+        MongoDB ('_id') y los ataques como diccionarios.
+        """
+        data = {key: getattr(self, name) for name, key, _ in self._fields}
+        if "ataques" in data:
+            data["ataques"] = [a._asdict() for a in data["ataques"]]
+        return data
+
+    def to_model(self) -> BaseModel:
+        """
+        Convierte el registro en el modelo Pydantic equivalente, validándolo.
+        """
+        return self.model.model_validate(self.to_dict())
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, n) == getattr(other, n) for n in self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{n}={getattr(self, n)!r}" for n in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+def record_type(model: Type[BaseModel]) -> Type[_Record]:
+    """
+    Crea la clase de registro ligero con los campos de `model`.
+
+    Args:
+        model (Type[BaseModel]): El modelo Pydantic de referencia.
+
+    Returns:
+        Type[_Record]: La clase de registro, p. ej. `PokemonRecord`.
+    """
+    fields = tuple(
+        (name, field.alias or name, field.get_default(call_default_factory=True))
+        for name, field in model.model_fields.items()
+    )
+    return type(
+        f"{model.__name__}Record",
+        (_Record,),
+        {"__slots__": tuple(name for name, _, _ in fields), "model": model, "_fields": fields},
+    )
+
+
+PokemonRecord = record_type(Pokemon)
+PokemonSummaryRecord = record_type(PokemonSummary)
+_RECORD_TYPES = {Pokemon: PokemonRecord, PokemonSummary: PokemonSummaryRecord}
+
+
+def from_trusted(model: Type[BaseModel], doc: Dict[str, Any]) -> _Record:
+    """
+    Construye el registro ligero de `model` a partir de un documento leído de
+    nuestra propia colección, sin validación.
+
+    Los documentos de 'pokemons' solo se escriben tras validarlos con
+    `Pokemon`, así que al leerlos no hace falta volver a hacerlo. Construir
+    instancias de Pydantic sin validar (`model_construct`) resulta más lento
+    que validarlas, y la mayor parte del coste está en los `Attack`
+    anidados; un registro con `__slots__` evita ambas cosas
+    (ver `benchmarks/decode.py`). Los campos que el modelo no declara
+    (p. ej. 'nombre_norm') se descartan.
+
+    Args:
+        model (Type[BaseModel]): `Pokemon` o `PokemonSummary`.
+        doc (Dict[str, Any]): El documento tal y como lo devuelve PyMongo.
+
+    Returns:
+        _Record: Un `PokemonRecord` o `PokemonSummaryRecord`.
+    """
+    return _RECORD_TYPES[model](doc)
+
+
+class BulkResult(BaseModel):
+    """
+    Modelo Pydantic con el resultado agregado de una escritura masiva.
+    """
+    inserted: int = 0
+    updated: int = 0
+    matched: int = 0
+    deleted: int = 0
+    failed: int = 0
+    errors: List[str] = []
+
+    def merge(self, details: Dict[str, Any]) -> None:
+        """
+        Acumula el resultado de un `bulk_write` (o de un `BulkWriteError`).
+
+        Args:
+            details (Dict[str, Any]): El diccionario `bulk_api_result` o el
+                campo `details` de la excepción.
+        """
+        self.inserted += details.get("nInserted", 0) + details.get("nUpserted", 0)
+        self.updated += details.get("nModified", 0)
+        self.matched += details.get("nMatched", 0)
+        self.deleted += details.get("nRemoved", 0)
+        write_errors = details.get("writeErrors", [])
+        self.failed += len(write_errors)
+        self.errors.extend(e.get("errmsg", "") for e in write_errors)
+
+
+class SyncResult(BulkResult):
+    """
+    Resultado de una sincronización incremental (`PokemonController.sync`):
+    los contadores de la escritura masiva más los registros de origen que
+    no habían cambiado y no se escribieron.
+    """
+    unchanged: int = 0
+
+
+class Page(BaseModel):
+    """
+    Modelo Pydantic para una página de resultados con paginación por cursor.
+
+    Los tokens son opacos: se obtienen de una página y se pasan tal cual a
+    `PokemonController.find_page` para pedir la siguiente o la anterior.
+    """
+    # `Pokemon` o `PokemonSummary`, o sus registros de lectura (`from_trusted`)
+    items: List[Any] = []
+    next_token: Optional[str] = None
+    prev_token: Optional[str] = None
+
+
+class ChangesPage(BaseModel):
+    """
+    Modelo Pydantic para una página del registro de cambios
+    (`PokemonController.changes_since`).
+
+    `next_token` es la marca de la copia: se guarda y se pasa a la siguiente
+    llamada. Con `has_more` hay más cambios pendientes ya disponibles.
+    """
+    # Pokémon creados o modificados (`Pokemon` o sus registros de lectura)
+    items: List[Any] = []
+    # Lápidas de los borrados: {'_id', 'deleted_at'}
+    deleted: List[Dict[str, Any]] = []
+    next_token: Optional[str] = None
+    has_more: bool = False
+
+
+class TablePage(BaseModel):
+    """
+    Modelo Pydantic para una página de resultados en formato columnar.
+
+    Equivale a `Page`, pero las filas son una tabla de Arrow (ver `tables.py`).
+    """
+    table: Any = None
+    next_token: Optional[str] = None
+    prev_token: Optional[str] = None
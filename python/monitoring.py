@@ -0,0 +1,462 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo de instrumentación de los comandos de MongoDB.
+
+Define `CommandMonitor`, un `CommandListener` de PyMongo que registra cada
+comando enviado al servidor (nombre, colección, duración, documentos
+devueltos y tamaño de la respuesta) en un buffer circular en memoria. El
+tamaño obliga a volver a serializar la respuesta, así que solo se mide en
+los comandos lentos o con el panel de rendimiento activado. Cada
+registro se etiqueta con la página y la ejecución (rerun) de Streamlit que
+lanzó el comando, y los comandos que superan un umbral se escriben además
+en el log de consultas lentas.
+
+Los clientes de `db.py` (síncrono y asíncrono) registran el monitor del
+proceso (`MONITOR`).
+
+Define también `PoolMonitor`, un `ConnectionPoolListener` que lleva las
+estadísticas del pool de conexiones de cada perfil de conexión (conexiones
+abiertas y en uso, esperas para obtener una conexión y fallos).
+"""
+
+import contextvars
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import bson
+from pymongo import monitoring
+from pymongo.collection import Collection
+
+logger = logging.getLogger(__name__)
+
+# Número de comandos que se conservan en memoria
+DB_MONITOR_BUFFER = int(os.getenv("DB_MONITOR_BUFFER", "2000"))
+
+# Umbral (milisegundos) a partir del cual un comando se considera lento
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+
+# Desactiva la instrumentación con DB_MONITOR=0
+DB_MONITOR_ENABLED = os.getenv("DB_MONITOR", "1") == "1"
+
+# Mide el tamaño de todas las respuestas, que muestra el panel de
+# rendimiento (ver `perf_panel.PERF_PANEL`)
+MEASURE_REPLY_BYTES = os.getenv("PERF_PANEL", "0") == "1"
+
+# Comandos internos del driver que no interesa registrar
+_IGNORED_COMMANDS = {
+    "hello", "ismaster", "isMaster", "ping", "saslStart", "saslContinue", "endSessions",
+}
+
+_BACKGROUND = "(segundo plano)"
+
+
+@dataclass
+class CommandRecord:
+    """
+    Un comando de MongoDB ya completado. `bytes` es 0 si no se midió el
+    tamaño de la respuesta.
+    """
+    name: str
+    database: str
+    collection: Optional[str]
+    duration_ms: float
+    docs: int
+    bytes: int
+    ok: bool
+    page: str
+    rerun: Optional[str]
+    started_at: float
+    error: Optional[str] = None
+
+
+_context: contextvars.ContextVar = contextvars.ContextVar(
+    "db_monitor_context", default=(_BACKGROUND, None)
+)
+
+
+def set_context(page: str, rerun: Optional[str]) -> None:
+    """
+    Etiqueta los comandos que lance a partir de ahora el contexto actual.
+
+    Streamlit ejecuta cada rerun de una sesión en su propio hilo y PyMongo
+    publica los eventos en el hilo (o la tarea de asyncio) que envía el
+    comando. Una variable de contexto es local a cada hilo y, además, a cada
+    tarea, así que las consultas concurrentes del `AsyncPokemonController`
+    conservan la página que las lanzó.
+
+    Args:
+        page (str): Nombre de la página.
+        rerun (Optional[str]): Identificador de la ejecución.
+    """
+    _context.set((page, rerun))
+
+
+def get_context() -> Tuple[str, Optional[str]]:
+    """
+    Devuelve la página y la ejecución asociadas al contexto actual.
+    """
+    return _context.get()
+
+
+def _collection_of(command_name: str, command: Dict[str, Any]) -> Optional[str]:
+    """
+    Colección a la que se dirige un comando (None si no aplica).
+    """
+    if command_name == "getMore":
+        return command.get("collection")
+    target = command.get(command_name)
+    return target if isinstance(target, str) else None
+
+
+def _docs_in(reply: Dict[str, Any]) -> int:
+    """
+    Número de documentos devueltos (o afectados) según la respuesta.
+    """
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        batch = cursor.get("firstBatch", cursor.get("nextBatch"))
+        return len(batch) if batch is not None else 0
+    n = reply.get("n")
+    return int(n) if isinstance(n, (int, float)) else 0
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """
+    Registra los comandos de MongoDB en un buffer circular, seguro para hilos.
+    """
+
+    def __init__(
+        self,
+        max_records: int = DB_MONITOR_BUFFER,
+        slow_ms: float = SLOW_QUERY_MS,
+        measure_bytes: bool = MEASURE_REPLY_BYTES,
+    ):
+        """
+        Inicializa el monitor.
+
+        Args:
+            max_records (int, optional): Tamaño del buffer circular.
+            slow_ms (float, optional): Umbral del log de consultas lentas.
+            measure_bytes (bool, optional): Mide el tamaño de la respuesta de
+                todos los comandos, no solo de los lentos.
+        """
+        self.slow_ms = slow_ms
+        self.measure_bytes = measure_bytes
+        self._lock = threading.Lock()
+        self._records: Deque[CommandRecord] = deque(maxlen=max_records)
+        self._slow: Deque[CommandRecord] = deque(maxlen=max_records)
+        # (conexión, request_id) -> (base de datos, colección, página, rerun, inicio)
+        self._pending: Dict[Tuple[Any, int], Tuple[Any, ...]] = {}
+
+    # -------------------
+    # EVENTOS DE PYMONGO
+    # -------------------
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if event.command_name in _IGNORED_COMMANDS:
+            return
+        page, rerun = get_context()
+        collection = _collection_of(event.command_name, event.command)
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                event.database_name, collection, page, rerun, time.time()
+            )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finish(event, ok=True, reply=event.reply)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event, ok=False, error=str(event.failure.get("errmsg", event.failure)))
+
+    def _finish(
+        self,
+        event: Any,
+        ok: bool,
+        reply: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        database, collection, page, rerun, started_at = pending
+        duration_ms = event.duration_micros / 1000
+        measure = reply and (self.measure_bytes or duration_ms >= self.slow_ms)
+        record = CommandRecord(
+            name=event.command_name,
+            database=database,
+            collection=collection,
+            duration_ms=duration_ms,
+            docs=_docs_in(reply) if reply else 0,
+            bytes=len(bson.encode(reply)) if measure else 0,
+            ok=ok,
+            page=page,
+            rerun=rerun,
+            started_at=started_at,
+            error=error,
+        )
+        with self._lock:
+            self._records.append(record)
+            if record.duration_ms >= self.slow_ms:
+                self._slow.append(record)
+        if record.duration_ms >= self.slow_ms:
+            logger.warning(
+                "Consulta lenta (%.1f ms): %s en %s.%s [página %s]",
+                record.duration_ms, record.name, database, collection, page,
+            )
+
+    # -------------------
+    # CONSULTA DEL BUFFER
+    # -------------------
+    def records(
+        self, rerun: Optional[str] = None, page: Optional[str] = None
+    ) -> List[CommandRecord]:
+        """
+        Devuelve los comandos registrados, opcionalmente de una ejecución o
+        página concretas, del más antiguo al más reciente.
+        """
+        with self._lock:
+            records = list(self._records)
+        if rerun is not None:
+            records = [r for r in records if r.rerun == rerun]
+        if page is not None:
+            records = [r for r in records if r.page == page]
+        return records
+
+    def slow(self) -> List[CommandRecord]:
+        """
+        Devuelve los comandos que superaron el umbral de consulta lenta.
+        """
+        with self._lock:
+            return list(self._slow)
+
+    def clear(self) -> None:
+        """
+        Vacía el buffer.
+        """
+        with self._lock:
+            self._records.clear()
+            self._slow.clear()
+
+    @staticmethod
+    def summary(records: List[CommandRecord]) -> Dict[str, Any]:
+        """
+        Resume un conjunto de comandos.
+
+        Returns:
+            Dict[str, Any]: Número de comandos, tiempo total en la base de
+                datos (ms), documentos y bytes devueltos.
+        """
+        return {
+            "commands": len(records),
+            "total_ms": sum(r.duration_ms for r in records),
+            "docs": sum(r.docs for r in records),
+            "bytes": sum(r.bytes for r in records),
+        }
+
+
+MONITOR = CommandMonitor()
+
+_rerun_ids = itertools.count(1)
+
+
+def new_rerun_id() -> str:
+    """
+    Genera un identificador para una ejecución de página.
+    """
+    return f"r{next(_rerun_ids)}"
+
+
+# -------------------
+# POOL DE CONEXIONES
+# -------------------
+@dataclass
+class PoolStats:
+    """
+    Estado del pool de conexiones de un perfil, sumado sobre sus servidores.
+    """
+    profile: str
+    servers: int = 0
+    open: int = 0
+    in_use: int = 0
+    created: int = 0
+    checkouts: int = 0
+    failures: int = 0
+    cleared: int = 0
+    wait_ms_total: float = 0.0
+    wait_ms_max: float = 0.0
+
+    @property
+    def wait_ms_mean(self) -> float:
+        return self.wait_ms_total / self.checkouts if self.checkouts else 0.0
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """
+    Lleva las estadísticas del pool de conexiones de los clientes de un
+    perfil, seguro para hilos.
+    """
+
+    def __init__(self, profile: str):
+        self._lock = threading.Lock()
+        self._stats = PoolStats(profile=profile)
+
+    def stats(self) -> PoolStats:
+        """
+        Copia de las estadísticas actuales.
+        """
+        with self._lock:
+            return PoolStats(**asdict(self._stats))
+
+    # -------------------
+    # EVENTOS DE PYMONGO
+    # -------------------
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        with self._lock:
+            self._stats.servers += 1
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        with self._lock:
+            self._stats.cleared += 1
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        with self._lock:
+            self._stats.servers -= 1
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        with self._lock:
+            self._stats.open += 1
+            self._stats.created += 1
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        with self._lock:
+            self._stats.open -= 1
+
+    def connection_check_out_started(
+        self, event: monitoring.ConnectionCheckOutStartedEvent
+    ) -> None:
+        pass
+
+    def connection_check_out_failed(
+        self, event: monitoring.ConnectionCheckOutFailedEvent
+    ) -> None:
+        with self._lock:
+            self._stats.failures += 1
+
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent) -> None:
+        # `duration` es la espera hasta obtener la conexión, en segundos
+        wait_ms = event.duration * 1000
+        with self._lock:
+            self._stats.in_use += 1
+            self._stats.checkouts += 1
+            self._stats.wait_ms_total += wait_ms
+            self._stats.wait_ms_max = max(self._stats.wait_ms_max, wait_ms)
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        with self._lock:
+            self._stats.in_use -= 1
+
+
+_pool_monitors: Dict[str, PoolMonitor] = {}
+_pool_monitors_lock = threading.Lock()
+
+
+def pool_monitor(profile: str) -> PoolMonitor:
+    """
+    Devuelve el monitor del pool de un perfil, creándolo la primera vez. Los
+    clientes síncrono y asíncrono de un mismo perfil comparten monitor.
+    """
+    with _pool_monitors_lock:
+        if profile not in _pool_monitors:
+            _pool_monitors[profile] = PoolMonitor(profile)
+        return _pool_monitors[profile]
+
+
+def pool_stats() -> List[PoolStats]:
+    """
+    Estadísticas del pool de cada perfil con algún cliente creado en el proceso.
+    """
+    with _pool_monitors_lock:
+        monitors = list(_pool_monitors.values())
+    return [m.stats() for m in monitors]
+
+
+def as_rows(records: List[CommandRecord]) -> List[Dict[str, Any]]:
+    """
+    Convierte registros en diccionarios (p. ej. para mostrarlos en una tabla).
+    """
+    return [asdict(r) for r in records]
+
+
+# -------------------
+# EXPLAIN
+# -------------------
+def _stages(plan: Dict[str, Any]) -> List[str]:
+    """
+    Etapas de un plan de ejecución, de la raíz a las hojas.
+    """
+    stages = []
+    while plan:
+        stage = plan.get("stage", "?")
+        if plan.get("indexName"):
+            stage += f" ({plan['indexName']})"
+        stages.append(stage)
+        children = plan.get("inputStages")
+        if children:
+            for child in children:
+                stages.extend(_stages(child))
+            break
+        plan = plan.get("inputStage")
+    return stages
+
+
+def explain_find(
+    collection: Collection,
+    filter: Dict[str, Any],
+    sort: Optional[List[Tuple[str, int]]] = None,
+    limit: int = 0,
+) -> Dict[str, Any]:
+    """
+    Ejecuta `explain` (con estadísticas de ejecución) de una consulta `find`.
+
+    Args:
+        collection (Collection): La colección.
+        filter (Dict[str, Any]): El filtro de la consulta.
+        sort (Optional[List[Tuple[str, int]]], optional): La ordenación.
+        limit (int, optional): El límite (0 = sin límite).
+
+    Returns:
+        Dict[str, Any]: Las etapas del plan ganador, si usa algún índice,
+            documentos y claves examinados, documentos devueltos, tiempo y
+            la respuesta completa del servidor en 'raw'.
+    """
+    find: Dict[str, Any] = {"find": collection.name, "filter": filter}
+    if sort:
+        find["sort"] = dict(sort)
+    if limit:
+        find["limit"] = limit
+    raw = collection.database.command({"explain": find, "verbosity": "executionStats"})
+    winning = raw.get("queryPlanner", {}).get("winningPlan", {})
+    # Los servidores recientes anidan el plan en 'queryPlan'
+    stages = _stages(winning.get("queryPlan", winning))
+    execution = raw.get("executionStats", {})
+    return {
+        "stages": stages,
+        "uses_index": any(s.startswith(("IXSCAN", "IDHACK", "EXPRESS")) for s in stages),
+        "docs_examined": execution.get("totalDocsExamined"),
+        "keys_examined": execution.get("totalKeysExamined"),
+        "returned": execution.get("nReturned"),
+        "millis": execution.get("executionTimeMillis"),
+        "raw": raw,
+    }
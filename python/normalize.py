@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo de normalización de nombres para las búsquedas.
+
+Define la clave normalizada que se guarda junto a cada Pokémon
+(`nombre_norm`) y las consultas que la aprovechan a través de un índice.
+"""
+
+import unicodedata
+from typing import Any, Dict, Optional
+
+# Campo del documento donde se guarda el nombre normalizado
+NORMALIZED_FIELD = "nombre_norm"
+
+
+def normalize_name(value: Optional[str]) -> str:
+    """
+    Normaliza un nombre para compararlo sin mayúsculas ni acentos.
+
+    Por ejemplo, "Eléctrico" y "electrico" producen la misma clave.
+
+    Args:
+        value (Optional[str]): El texto a normalizar.
+
+    Returns:
+        str: El texto en minúsculas y sin marcas diacríticas.
+    """
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return stripped.casefold().strip()
+
+
+def prefix_range(prefix: str) -> Dict[str, Any]:
+    """
+    Convierte un prefijo en un rango `[prefix, siguiente)` que MongoDB
+    resuelve como un recorrido acotado del índice.
+
+    Args:
+        prefix (str): El prefijo ya normalizado (no vacío).
+
+    Returns:
+        Dict[str, Any]: La condición `$gte`/`$lt` para el campo.
+    """
+    last = ord(prefix[-1])
+    if last >= 0x10FFFF:
+        return {"$gte": prefix}
+    return {"$gte": prefix, "$lt": prefix[:-1] + chr(last + 1)}
+
+
+def name_prefix_filter(term: str) -> Dict[str, Any]:
+    """
+    Filtro indexado para los Pokémon cuyo nombre empieza por `term`,
+    sin distinguir mayúsculas ni acentos.
+
+    Args:
+        term (str): El texto introducido por el usuario.
+
+    Returns:
+        Dict[str, Any]: El filtro de MongoDB (vacío si `term` está vacío).
+    """
+    prefix = normalize_name(term)
+    return {NORMALIZED_FIELD: prefix_range(prefix)} if prefix else {}
@@ -4,73 +4,136 @@ Página de listado de Pokémon.
 
 Esta página de la aplicación Streamlit muestra una lista de los Pokémon
 almacenados en la base de datos. Permite filtrar los Pokémon por nombre,
-región y número de Pokedex, y también permite eliminar Pokémon.
+región, número de Pokedex y ataques, recorrer la colección completa página a página
+y también permite eliminar Pokémon.
 """
 
 import streamlit as st
-from db import get_db, DB_NAME
-from controller import PokemonController
-
-
-def format_ataques(ataques):
-    """
-    Formatea la lista de ataques de un Pokémon para su visualización.
-
-    Args:
-        ataques (list): Una lista de objetos de ataque.
-
-    Returns:
-        str: Una cadena con los ataques formateados, o "-" si no hay ataques.
-    """
-    if not ataques:
-        return "-"
-    return ", ".join([f"{a.nombre} ({a.tipo})" for a in ataques])
+from db import DB_NAME
+from controller import PAGE_SORT_KEYS, listing_filter
+from services import (
+    get_async_controller,
+    get_attacks,
+    get_controller,
+    get_fuzzy,
+    get_snapshot,
+    get_sprites,
+    run_concurrently,
+)
+import perf_panel
+
+PAGE_SIZE = 50
+
+SORT_LABELS = {
+    "pokedex_nacional": "Pokedex",
+    "nombre": "Nombre",
+    "nivel": "Nivel",
+}
+
+COLUMN_LABELS = {
+    "id": "ID",
+    "nombre": "Nombre",
+    "region": "Región",
+    "pokedex_nacional": "Pokedex",
+    "tipo_primario": "Tipo 1",
+    "tipo_secundario": "Tipo 2",
+    "nivel": "Nivel",
+    "ataques": "Ataques",
+}
 
 
 # Configuración de la página
 st.set_page_config(page_title="Listado de Pokémon", layout="wide")
 
 st.header("Listado de Pokémon")
+perf_panel.track("Listado")
 
 try:
     # Conexión a la base de datos y al controlador
-    db = get_db()
-    controller = PokemonController(db["pokemons"])
+    controller = get_controller()
 
     # Filtros de búsqueda
     with st.expander("Filtros de búsqueda", expanded=True):
-        nombre_filtro = st.text_input("Nombre contiene")
+        nombre_filtro = st.text_input("Nombre empieza por", key="listado_nombre")
         region_filtro = st.text_input("Región")
         min_pokedex = st.number_input("Pokedex mínimo", min_value=0, value=0)
+        # Opciones del catálogo de ataques materializado (ver `attacks.py`)
+        attacks = get_attacks()
+        col_ataque, col_tipo = st.columns(2)
+        ataque_filtro = col_ataque.selectbox(
+            "Conoce el ataque",
+            options=[""] + sorted({a["nombre"] for a in attacks.top()}),
+            format_func=lambda x: x or "Cualquiera",
+        )
+        tipo_ataque_filtro = col_tipo.selectbox(
+            "Con un ataque de tipo",
+            options=[""] + attacks.types(),
+            format_func=lambda x: x or "Cualquiera",
+        )
+        sort_by = st.selectbox(
+            "Ordenar por", options=PAGE_SORT_KEYS, format_func=SORT_LABELS.get
+        )
 
-    # Construcción del filtro para la consulta a la base de datos
-    filtro = {}
-    if nombre_filtro:
-        filtro["nombre"] = {"$regex": nombre_filtro, "$options": "i"}
-    if region_filtro:
-        filtro["region"] = {"$regex": region_filtro, "$options": "i"}
-    if min_pokedex > 0:
-        filtro["pokedex_nacional"] = {"$gte": min_pokedex}
-
-    # Búsqueda de Pokémon con los filtros aplicados
-    pokemons = controller.find(filtro, limit=200)
+    # Al cambiar los filtros o la ordenación se vuelve a la primera página
+    firma = (
+        nombre_filtro, region_filtro, min_pokedex, ataque_filtro, tipo_ataque_filtro, sort_by
+    )
+    if st.session_state.get("listado_firma") != firma:
+        st.session_state.listado_firma = firma
+        st.session_state.listado_cursor = (None, None)
+        st.session_state.listado_pagina = 1
+
+    # Búsqueda de la página actual con los filtros aplicados, como tabla de
+    # Arrow que se muestra sin conversiones por fila
+    after, before = st.session_state.listado_cursor
+    # La instantánea no filtra por ataques: esos filtros van a MongoDB, que
+    # los resuelve con los índices multikey de `ataques`
+    snapshot = None if ataque_filtro or tipo_ataque_filtro else get_snapshot()
+    filtro = listing_filter(
+        nombre_filtro, region_filtro, min_pokedex, ataque_filtro, tipo_ataque_filtro
+    )
+    total = None
+    if snapshot is not None:
+        # Instantánea en memoria; si aún no está caliente, consulta MongoDB
+        page = snapshot.find_page_table(
+            nombre_filtro, region_filtro, min_pokedex,
+            sort_by=sort_by, page_size=PAGE_SIZE, after=after, before=before,
+        )
+    else:
+        # La página y el total de resultados se consultan a la vez
+        async_controller = get_async_controller()
+        page, total = run_concurrently(
+            async_controller.find_page_table(
+                filtro, sort_by=sort_by, page_size=PAGE_SIZE, after=after, before=before,
+            ),
+            async_controller.count(filtro),
+        )
+    table = page.table
 
-    if not pokemons:
+    if table.num_rows == 0:
         st.info("No se encontraron Pokémon con esos filtros.")
+        # ¿Quisiste decir...? con el índice de nombres tolerante a erratas
+        sugerencia = get_fuzzy().suggest_name(nombre_filtro) if nombre_filtro else None
+        if sugerencia:
+            st.button(
+                f"¿Quisiste decir **{sugerencia}**?",
+                on_click=lambda: st.session_state.update(listado_nombre=sugerencia),
+            )
     else:
         # Selección y eliminación de Pokémon
         delete_button_key = "delete_pokemon_button"
+        nombres = dict(
+            zip(table.column("id").to_pylist(), table.column("nombre").to_pylist())
+        )
         pokemon_to_delete_id = st.selectbox(
             "Selecciona un Pokémon para eliminar",
-            options=[""] + [p.id for p in pokemons],
-            format_func=lambda x: next(
-                (p.nombre for p in pokemons if p.id == x), "Seleccionar..."
-            ),
+            options=[""] + list(nombres),
+            format_func=lambda x: nombres.get(x, "Seleccionar..."),
         )
 
         if st.button("Eliminar Pokémon Seleccionado", key=delete_button_key):
             if pokemon_to_delete_id:
-                ok = controller.delete(str(pokemon_to_delete_id))
+                ok = controller.delete(pokemon_to_delete_id)
                 if ok:
                     st.success("Pokémon eliminado correctamente.")
                     st.rerun()
@@ -79,21 +142,10 @@ try:
             else:
                 st.warning("Por favor, selecciona un Pokémon para eliminar.")
 
-        # Preparación de los datos para la tabla
-        data = [
-            {
-                "Imagen": f"https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/{p.pokedex_nacional}.png",
-                "ID": str(p.id),
-                "Nombre": p.nombre,
-                "Región": p.region,
-                "Pokedex": p.pokedex_nacional,
-                "Tipo 1": p.tipo_primario,
-                "Tipo 2": p.tipo_secundario,
-                "Nivel": p.nivel,
-                "Ataques": format_ataques(p.ataques),
-            }
-            for p in pokemons
-        ]
+        # Columnas de la tabla con sus nombres de visualización
+        # Miniaturas locales incrustadas como data URIs (ver `sprites.py`)
+        data = table.add_column(0, "Imagen", get_sprites().column(table))
+        data = data.rename_columns([COLUMN_LABELS.get(c, c) for c in data.column_names])
 
         # Visualización de los datos en una tabla
         st.dataframe(
@@ -105,6 +157,33 @@ try:
             },
         )
 
+    # Controles de paginación
+    col_prev, col_info, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        if st.button("← Anterior", disabled=page.prev_token is None):
+            st.session_state.listado_cursor = (None, page.prev_token)
+            st.session_state.listado_pagina -= 1
+            st.rerun()
+    with col_info:
+        info = f"Página {st.session_state.listado_pagina}"
+        if total is not None:
+            info += f" · {total} Pokémon"
+        st.write(info)
+    with col_next:
+        if st.button("Siguiente →", disabled=page.next_token is None):
+            st.session_state.listado_cursor = (page.next_token, None)
+            st.session_state.listado_pagina += 1
+            st.rerun()
+
+    # Panel de rendimiento, con el explain() de la consulta de la página
+    perf_panel.render(
+        explain=(
+            controller.col,
+            filtro,
+            [(sort_by, 1), ("_id", 1)],
+            PAGE_SIZE + 1,
+        )
+    )
 
 except Exception as e:
     st.error(
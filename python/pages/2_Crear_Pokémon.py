@@ -8,8 +8,8 @@ añadir un nuevo Pokémon a la base de datos.
 
 import streamlit as st
 from pokemon_form import pokemon_form
-from controller import PokemonController
-from db import get_db
+from services import get_attacks, get_controller
+import perf_panel
 
 # Configuración de la página
 st.set_page_config(
@@ -18,13 +18,13 @@ st.set_page_config(
 )
 
 st.header("Crear un Nuevo Pokémon")
+perf_panel.track("Crear Pokémon")
 
 # Obtener el controlador de la base de datos
-db = get_db()
-controller = PokemonController(db["pokemons"])
+controller = get_controller()
 
-# Renderizar el formulario y obtener los datos
-payload = pokemon_form()
+# Renderizar el formulario (con autocompletado de ataques) y obtener los datos
+payload = pokemon_form(attack_options=get_attacks().top())
 
 # Si el formulario fue enviado y contiene datos, procesarlos
 if payload:
@@ -40,3 +40,5 @@ if payload:
             # Insertar el nuevo Pokémon en la base de datos
             created = controller.insert(payload)
             st.success(f"Pokémon '{created.nombre}' creado con ID: {created.id}")
+
+perf_panel.render()
@@ -8,24 +8,54 @@ sus datos a través de un formulario.
 """
 
 import streamlit as st
+from controller import VersionConflictError
+from fuzzy import max_typos
+from normalize import NORMALIZED_FIELD, normalize_name
 from pokemon_form import pokemon_form
-from controller import PokemonController
-from db import get_db
+from services import (
+    get_async_controller,
+    get_attacks,
+    get_controller,
+    get_fuzzy,
+    get_sprites,
+    run_concurrently,
+)
+import perf_panel
 
 # Configuración de la página
 st.set_page_config(page_title="Editar Pokémon", layout="wide")
 
 st.header("Editar Pokémon")
+perf_panel.track("Editar Pokémon")
 
 # Conexión a la base de datos y al controlador
-db = get_db()
-controller = PokemonController(db["pokemons"])
+controller = get_controller()
+async_controller = get_async_controller()
 
 # --- Búsqueda del Pokémon a editar ---
 search_term = st.text_input("Buscar Pokémon por nombre para editar", key="edit_search")
 
+# La búsqueda y el Pokémon que ya estaba seleccionado se consultan a la vez.
+# Para la búsqueda solo se necesitan el nombre y el id: basta con la versión ligera
+selected_id = st.session_state.get("edit_id")
+results, selected = run_concurrently(
+    async_controller.find_by_name(search_term, summary=True) if search_term else None,
+    async_controller.find_by_id(str(selected_id)) if selected_id else None,
+)
+
+if search_term and not results:
+    # Sin coincidencias por prefijo ni por palabras: nombres parecidos del
+    # índice de trigramas (tolerante a erratas), en su orden de cercanía
+    matches = get_fuzzy().search_names(search_term, max_distance=max_typos(search_term))
+    if matches:
+        rank = {m.term: i for i, m in enumerate(matches)}
+        results = controller.find({NORMALIZED_FIELD: {"$in": list(rank)}}, summary=True)
+        # Una copia ordenada: la lista de la caché se comparte entre sesiones
+        results = sorted(results, key=lambda p: rank.get(normalize_name(p.nombre), len(rank)))
+        if results:
+            st.caption(f"Sin coincidencias para '{search_term}': se muestran nombres parecidos.")
+
 if search_term:
-    results = controller.find_by_name(search_term)
     if results:
         # Muestra una lista de resultados para que el usuario elija
         pokemon_to_edit = st.selectbox(
@@ -48,7 +78,11 @@ edit_id = st.session_state.get("edit_id")
 if not edit_id:
     st.warning("Busca y selecciona un Pokémon para empezar a editar.")
 else:
-    pokemon_obj = controller.find_by_id(str(edit_id))
+    if edit_id == selected_id:
+        pokemon_obj = selected
+    else:
+        # Se acaba de elegir otro Pokémon en la lista de resultados
+        pokemon_obj = controller.find_by_id(str(edit_id))
     if not pokemon_obj:
         st.error("El Pokémon seleccionado ya no existe o el ID es inválido.")
         if "edit_id" in st.session_state:
@@ -56,31 +90,52 @@ else:
     else:
         st.subheader(f"Editando a: **{pokemon_obj.nombre}**")
 
-        # Muestra la imagen del Pokémon
+        # Muestra la imagen del Pokémon desde el almacén de sprites local
         col1, col2, col3 = st.columns([1, 2, 1])
         with col2:
-            st.image(
-                f"https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/other/official-artwork/{pokemon_obj.pokedex_nacional}.png",
-                width=200,
+            imagen = get_sprites().image(pokemon_obj.pokedex_nacional)
+            if imagen is not None:
+                st.image(imagen, width=200)
+
+        # Versión cargada al empezar a editar: solo se guardan los campos que
+        # cambian respecto a ella, y el guardado se rechaza si otro usuario ha
+        # modificado el Pokémon entretanto
+        original = st.session_state.get("edit_original")
+        if original is None or original.id != pokemon_obj.id:
+            original = st.session_state.edit_original = pokemon_obj
+
+        if st.session_state.pop("edit_conflict", False):
+            st.error(
+                "Otro usuario ha modificado este Pokémon mientras lo editabas. "
+                "Se han cargado sus datos actuales: revisa y vuelve a guardar tus cambios."
             )
 
-        # Renderiza el formulario de edición y obtiene los datos
-        payload = pokemon_form(pokemon=pokemon_obj)
+        # Renderiza el formulario de edición (con autocompletado de ataques)
+        # y obtiene los datos
+        payload = pokemon_form(pokemon=original, attack_options=get_attacks().top())
 
         if payload:
             # Actualiza el Pokémon en la base de datos
-            updated = controller.update(str(edit_id), payload)
+            try:
+                updated = controller.update(str(edit_id), payload, original=original)
+            except VersionConflictError:
+                # Se vuelve a cargar la versión actual para editar sobre ella
+                st.session_state.pop("edit_original", None)
+                st.session_state.edit_conflict = True
+                st.rerun()
             if updated:
                 st.success(f"Pokémon '{updated.nombre}' actualizado correctamente.")
                 # Limpia el estado de la sesión para la siguiente edición
-                if "edit_id" in st.session_state:
-                    del st.session_state.edit_id
+                st.session_state.pop("edit_id", None)
+                st.session_state.pop("edit_original", None)
                 st.rerun()
             else:
                 st.error("Error al actualizar el Pokémon.")
 
         if st.button("Cancelar Edición"):
             # Limpia el estado de la sesión si se cancela la edición
-            if "edit_id" in st.session_state:
-                del st.session_state.edit_id
-            st.rerun()
\ No newline at end of file
+            st.session_state.pop("edit_id", None)
+            st.session_state.pop("edit_original", None)
+            st.rerun()
+
+perf_panel.render()
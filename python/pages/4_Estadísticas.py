@@ -1,6 +1,19 @@
+# -*- coding: utf-8 -*-
+"""
+Página de estadísticas de Pokémon.
+
+Esta página de la aplicación Streamlit muestra los agregados materializados
+en la colección 'pokemon_stats' (una única lectura por visita), en lugar de
+recalcularlos sobre toda la colección en cada renderizado.
+"""
 
 import streamlit as st
-from db import get_db, DB_NAME
+from pymongo.errors import PyMongoError
+from db import DB_NAME
+from services import get_stats
+import perf_panel
+from stats import CATEGORIES, bucket_start
+from tables import counts_table
 
 st.set_page_config(
     page_title="Estadísticas", 
@@ -8,19 +21,35 @@ st.set_page_config(
 )
 
 st.header("Estadísticas Generales")
+perf_panel.track("Estadísticas")
 
 try:
-    db = get_db()
-    col = db["pokemons"]
-    total = col.count_documents({})
-    st.metric("Total de Pokémon", total)
-
-    tipos_primarios = col.aggregate(
-        [{"$group": {"_id": "$tipo_primario", "count": {"$sum": 1}}}]
-    )
-    st.subheader("Pokémon por Tipo Primario")
-    for t in tipos_primarios:
-        st.write(f"{t['_id'] or 'Desconocido'}: {t['count']}")
-        
-except Exception as e:
+    service = get_stats()
+    stats = service.get()
+    if stats is None:
+        # Primera visita: se construye el documento una única vez
+        with st.spinner("Calculando estadísticas..."):
+            stats = service.rebuild()
+
+    st.metric("Total de Pokémon", stats.get("total", 0))
+    st.caption(f"Actualizado: {stats.get('updated_at')}")
+
+    tabs = st.tabs(list(CATEGORIES.values()))
+    for tab, (category, label) in zip(tabs, CATEGORIES.items()):
+        counts = {k: v for k, v in (stats.get(category) or {}).items() if v > 0}
+        with tab:
+            if not counts:
+                st.info("Sin datos.")
+                continue
+            if category == "histograma_nivel":
+                # Los tramos de nivel se muestran en orden, no por frecuencia
+                counts = dict(sorted(counts.items(), key=lambda kv: bucket_start(kv[0])))
+                table = counts_table(counts, label, sort=False)
+            else:
+                table = counts_table(counts, label)
+            st.dataframe(table, hide_index=True)
+
+except PyMongoError as e:
     st.error(f"No se pudo conectar a la base de datos para cargar estadísticas. Verifica que la base de datos '{DB_NAME}' esté cargada. Error: {e}")
+
+perf_panel.render()
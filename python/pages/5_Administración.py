@@ -1,11 +1,16 @@
 import streamlit as st
-import json
-from db import get_db, get_client, DB_NAME
-from controller import PokemonController
+from db import get_client, get_db, get_profile, DB_NAME
+from services import get_controller, get_query_cache
+import os
+import perf_panel
+from controller import listing_filter
+from export import COMPRESSIONS, EXPORT_DIR, FORMATS, export_collection, export_filename
+from import_json import iter_documents
 
 st.set_page_config(page_title="Administración", layout="wide")
 
 st.header("Panel de Administración de la Base de Datos")
+perf_panel.track("Administración")
 
 st.warning(
     "ADVERTENCIA: Las siguientes acciones son destructivas y no se pueden deshacer."
@@ -15,34 +20,94 @@ st.warning(
 st.subheader("Cargar Colección desde JSON")
 st.markdown(
     "Esto cargará los datos desde `python/data/pokemons.json` en la colección `pokemons`. "
-    "La base de datos y la colección se crearán si no existen."
+    "La base de datos y la colección se crearán si no existen. Solo se escriben los "
+    "Pokémon nuevos o que han cambiado desde la última carga."
 )
+delete_missing = st.checkbox("Eliminar los Pokémon que no estén en el archivo")
 
 if st.button("Cargar Datos"):
     try:
-        db = get_db()
-        controller = PokemonController(db["pokemons"])
+        controller = get_controller()
 
-        with open("data/pokemons.json", "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        inserted_count = 0
-        with st.spinner(f"Insertando {len(data)} documentos..."):
-            for doc in data:
-                # Evitar duplicados por nombre
-                if not controller.find_by_name(doc.get("nombre"), exact=True):
-                    controller.insert(doc)
-                    inserted_count += 1
+        with st.spinner("Sincronizando documentos en lotes..."):
+            # Sincronización por nombre: se comparan las huellas guardadas con
+            # las del archivo y solo se escriben los Pokémon nuevos o cambiados
+            result = controller.sync(
+                iter_documents("data/pokemons.json"),
+                key="nombre",
+                delete_missing=delete_missing,
+            )
 
         st.success(
-            f"¡Proceso completado! Se insertaron {inserted_count} nuevos Pokémon."
+            f"¡Proceso completado! Se insertaron {result.inserted} nuevos Pokémon."
         )
         st.info(
-            f"{len(data) - inserted_count} Pokémon ya existían y no se re-insertaron."
+            f"{result.updated} Pokémon actualizados y {result.unchanged} sin cambios."
         )
+        if result.deleted:
+            st.info(f"{result.deleted} Pokémon eliminados por no estar en el archivo.")
+        if result.failed:
+            st.warning(f"{result.failed} documentos no se pudieron cargar.")
     except Exception as e:
         st.error(f"Ocurrió un error al cargar los datos: {e}")
 
+# --- Caché de Consultas ---
+st.subheader("Caché de Consultas")
+cache = get_query_cache()
+if cache is None:
+    st.info("La caché de consultas está desactivada (QUERY_CACHE_SIZE=0).")
+else:
+    stats = cache.stats()
+    cols = st.columns(5)
+    cols[0].metric("Entradas", stats["entries"])
+    cols[1].metric("Aciertos", stats["hits"])
+    cols[2].metric("Fallos", stats["misses"])
+    cols[3].metric("Desalojos", stats["evictions"])
+    cols[4].metric("Tasa de aciertos", f"{stats['hit_rate']:.0%}")
+    if st.button("Vaciar Caché"):
+        cache.clear()
+        st.rerun()
+
+# --- Exportar Datos ---
+st.subheader("Exportar Colección")
+st.markdown(
+    f"Exporta la colección, o los Pokémon de una región, a `{EXPORT_DIR}`. "
+    "Los documentos se escriben por lotes, sin cargar la colección en memoria."
+)
+col1, col2, col3 = st.columns(3)
+formato = col1.selectbox("Formato", FORMATS, format_func=str.upper)
+compresion = col2.selectbox("Compresión", COMPRESSIONS)
+region_export = col3.text_input("Región (opcional)", key="export_region")
+
+if st.button("Exportar"):
+    try:
+        controller = get_controller()
+        filtro = listing_filter(region=region_export)
+        total = controller.count(filtro)
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        path = os.path.join(EXPORT_DIR, export_filename(formato, compresion))
+        barra = st.progress(0.0, text="Exportando...")
+
+        def progreso(stats):
+            barra.progress(
+                min(stats.written / total, 1.0) if total else 1.0,
+                text=f"{stats.written}/{total} documentos ({stats.rate:.0f} docs/s)",
+            )
+
+        # Lectura de toda la colección: perfil 'analytics' (puede leer de un secundario)
+        result = export_collection(
+            get_db("analytics")["pokemons"], path, fmt=formato, compression=compresion,
+            filter=filtro, batch_size=get_profile("analytics").batch_size, progress=progreso,
+        )
+        st.success(
+            f"Se exportaron {result.written} Pokémon a `{path}` "
+            f"({result.bytes / 1024:.0f} KB, {result.rate:.0f} docs/s)."
+        )
+        with open(path, "rb") as f:
+            st.download_button("Descargar", f, file_name=os.path.basename(path))
+    except Exception as e:
+        st.error(f"Ocurrió un error al exportar los datos: {e}")
+
 # --- Eliminar Datos ---
 st.subheader("Eliminar Base de Datos")
 st.markdown(
@@ -66,3 +131,5 @@ if st.button("Eliminar Base de Datos y Colección"):
         st.rerun()
     except Exception as e:
         st.error(f"Ocurrió un error al eliminar la base de datos: {e}")
+
+perf_panel.render()
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Página de enfrentamientos entre Pokémon.
+
+Esta página de la aplicación Streamlit ordena todos los Pokémon de la
+colección según lo bien que contrarrestan a uno elegido (por sus tipos y los
+tipos de sus ataques) y calcula la cobertura ofensiva de un equipo de hasta
+seis Pokémon sobre toda la plantilla.
+"""
+
+import streamlit as st
+from pymongo.errors import PyMongoError
+from db import DB_NAME
+from services import get_controller, get_matchups
+import perf_panel
+
+TEAM_SIZE = 6
+
+COLUMN_LABELS = {
+    "id": "ID",
+    "nombre": "Nombre",
+    "pokedex_nacional": "Pokedex",
+    "tipos": "Tipos",
+    "nivel": "Nivel",
+    "ataca": "Daño que hace",
+    "recibe": "Daño que recibe",
+    "puntuacion": "Puntuación",
+    "mejor_ataque": "Mejor ataque del equipo",
+    "golpea_a": "Miembros a los que golpea x2",
+}
+
+
+def show_table(table):
+    data = table.drop_columns(["id"])
+    st.dataframe(
+        data.rename_columns([COLUMN_LABELS.get(c, c) for c in data.column_names]),
+        use_container_width=True,
+    )
+
+
+st.set_page_config(page_title="Enfrentamientos", layout="wide")
+
+st.header("Enfrentamientos")
+perf_panel.track("Enfrentamientos")
+
+try:
+    controller = get_controller()
+    engine = get_matchups()
+
+    # --- Mejores counters ---
+    st.subheader("Mejores counters")
+    search_term = st.text_input("Buscar Pokémon por nombre", key="matchup_search")
+    results = controller.find_by_name(search_term, summary=True) if search_term else []
+
+    if search_term and not results:
+        st.info(f"No se encontraron Pokémon con el nombre '{search_term}'.")
+    elif results:
+        objetivo = st.selectbox(
+            "Pokémon a contrarrestar",
+            options=results,
+            format_func=lambda p: f"{p.nombre} (#{p.pokedex_nacional})",
+        )
+        limite = st.slider("Número de counters", min_value=5, max_value=100, value=20)
+
+        with st.spinner("Calculando enfrentamientos..."):
+            counters = engine.counters(str(objetivo.id), limit=limite)
+        if counters is None:
+            st.error("El Pokémon seleccionado ya no existe.")
+        else:
+            st.caption(
+                f"Entre los {len(engine.roster())} Pokémon de la colección. La puntuación "
+                "es el daño que hace al objetivo dividido entre el que recibe de él."
+            )
+            show_table(counters)
+
+        equipo = st.session_state.setdefault("equipo", {})
+        if st.button("Añadir al equipo", disabled=len(equipo) >= TEAM_SIZE):
+            equipo[str(objetivo.id)] = objetivo.nombre
+            st.rerun()
+
+    # --- Cobertura del equipo ---
+    st.subheader("Cobertura del equipo")
+    equipo = st.session_state.setdefault("equipo", {})
+    if not equipo:
+        st.info(
+            f"Busca un Pokémon y pulsa 'Añadir al equipo' (hasta {TEAM_SIZE}) "
+            "para calcular su cobertura."
+        )
+    else:
+        st.write(", ".join(equipo.values()))
+        if st.button("Vaciar equipo"):
+            equipo.clear()
+            st.rerun()
+
+        cobertura = engine.coverage(list(equipo))
+        if cobertura is None:
+            st.warning("Ningún miembro del equipo sigue en la colección.")
+        else:
+            cols = st.columns(4)
+            cols[0].metric("Súper eficaz", f"{cobertura.super_effective:.0%}")
+            cols[1].metric("Neutro", f"{cobertura.neutral:.0%}")
+            cols[2].metric("Poco eficaz", f"{cobertura.resisted:.0%}")
+            cols[3].metric("Inmunes", f"{cobertura.immune:.0%}")
+            st.caption(f"Mejor ataque del equipo contra cada uno de {cobertura.total} Pokémon.")
+            if cobertura.threats.num_rows:
+                st.markdown(
+                    "**Amenazas**: Pokémon a los que el equipo no golpea de forma "
+                    "súper eficaz y que sí golpean así a algún miembro."
+                )
+                show_table(cobertura.threats)
+
+except PyMongoError as e:
+    st.error(
+        f"No se pudo conectar a la base de datos. Verifica que la base de datos '{DB_NAME}' exista y esté cargada. Error: {e}"
+    )
+
+perf_panel.render()
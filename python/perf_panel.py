@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Componente del panel de rendimiento de las páginas.
+
+Cada página llama a `track` al empezar, para etiquetar los comandos de
+MongoDB de esa ejecución, y a `render` al terminar. Con `PERF_PANEL=1`, el
+panel muestra en la barra lateral el número de consultas y el tiempo en la
+base de datos de la ejecución actual, los comandos más lentos, el estado de
+los pools de conexiones de cada perfil, la duración del precalentamiento
+del proceso (ver `startup.py`) y, si la página lo indica, el `explain()` de
+su consulta principal.
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import streamlit as st
+from pymongo.collection import Collection
+
+from monitoring import (
+    MONITOR,
+    as_rows,
+    explain_find,
+    get_context,
+    new_rerun_id,
+    pool_stats,
+    set_context,
+)
+from startup import start_prewarm
+
+# Muestra el panel de rendimiento en la barra lateral
+PERF_PANEL = os.getenv("PERF_PANEL", "0") == "1"
+
+# Número de comandos más lentos que se muestran
+SLOWEST_SHOWN = 5
+
+ExplainSpec = Tuple[Collection, Dict[str, Any], Optional[List[Tuple[str, int]]], int]
+
+
+def track(page: str) -> str:
+    """
+    Empieza a etiquetar los comandos de MongoDB con esta página y una nueva
+    ejecución. Debe llamarse al principio de la página.
+
+    Args:
+        page (str): Nombre de la página.
+
+    Returns:
+        str: El identificador de la ejecución.
+    """
+    rerun = new_rerun_id()
+    set_context(page, rerun)
+    return rerun
+
+
+def render(explain: Optional[ExplainSpec] = None) -> None:
+    """
+    Muestra el panel de rendimiento de la ejecución actual (si está activado).
+
+    Args:
+        explain (Optional[ExplainSpec], optional): Colección, filtro,
+            ordenación y límite de la consulta principal de la página, para
+            ofrecer su `explain()`. Defaults to None.
+    """
+    if not PERF_PANEL:
+        return
+    page, rerun = get_context()
+    records = MONITOR.records(rerun=rerun)
+    summary = MONITOR.summary(records)
+
+    with st.sidebar.expander("Rendimiento", expanded=True):
+        col_n, col_ms = st.columns(2)
+        col_n.metric("Consultas", summary["commands"])
+        col_ms.metric("Tiempo en BD", f"{summary['total_ms']:.1f} ms")
+        st.caption(
+            f"{summary['docs']} documentos, {summary['bytes'] / 1024:.1f} KB "
+            f"| ejecución {rerun} de {page}"
+        )
+
+        slowest = sorted(records, key=lambda r: r.duration_ms, reverse=True)[:SLOWEST_SHOWN]
+        if slowest:
+            st.dataframe(
+                [
+                    {
+                        "Comando": r["name"],
+                        "Colección": r["collection"],
+                        "ms": round(r["duration_ms"], 2),
+                        "Docs": r["docs"],
+                        "Bytes": r["bytes"],
+                    }
+                    for r in as_rows(slowest)
+                ],
+                hide_index=True,
+            )
+
+        slow = MONITOR.slow()
+        if slow:
+            st.caption(f"{len(slow)} consultas lentas (≥ {MONITOR.slow_ms:.0f} ms) en el proceso")
+
+        prewarm = start_prewarm()
+        if prewarm is not None and prewarm.is_ready:
+            st.caption(
+                f"Precalentamiento del proceso: {prewarm.total_ms:.0f} ms ("
+                + ", ".join(f"{k} {v:.0f} ms" for k, v in prewarm.timings.items())
+                + ")"
+            )
+
+        pools = pool_stats()
+        if pools:
+            st.caption("Pools de conexiones del proceso, por perfil")
+            st.dataframe(
+                [
+                    {
+                        "Perfil": p.profile,
+                        "Abiertas": p.open,
+                        "En uso": p.in_use,
+                        "Préstamos": p.checkouts,
+                        "Espera media ms": round(p.wait_ms_mean, 2),
+                        "Espera máx. ms": round(p.wait_ms_max, 2),
+                        "Fallos": p.failures,
+                    }
+                    for p in pools
+                ],
+                hide_index=True,
+            )
+
+        if explain is not None and st.button("Explain de la consulta"):
+            collection, filter, sort, limit = explain
+            result = explain_find(collection, filter, sort, limit)
+            if result["uses_index"]:
+                st.success(" → ".join(result["stages"]))
+            else:
+                st.warning("Sin índice: " + " → ".join(result["stages"]))
+            st.write(
+                f"Claves examinadas: {result['keys_examined']} · "
+                f"documentos examinados: {result['docs_examined']} · "
+                f"devueltos: {result['returned']} · {result['millis']} ms"
+            )
+            st.json(result["raw"], expanded=False)
@@ -1,7 +1,30 @@
+import re
+
 import streamlit as st
 
+# Ataque escrito como "Nombre (Tipo)"
+_ATTACK_LABEL = re.compile(r"^(.*\S)\s*\(([^()]*)\)$")
+
+
+def attack_label(nombre, tipo):
+    return f"{nombre} ({tipo})" if tipo else nombre
+
+
+def parse_attack(text):
+    """
+    Convierte "Nombre (Tipo)", "Nombre||Tipo" o "Nombre" en un ataque
+    (tipo "Normal" si no se indica).
+    """
+    text = text.strip()
+    if "||" in text:
+        nombre_a, tipo_a = text.split("||", 1)
+    else:
+        match = _ATTACK_LABEL.match(text)
+        nombre_a, tipo_a = match.groups() if match else (text, "Normal")
+    return {"nombre": nombre_a.strip(), "tipo": tipo_a.strip() or "Normal"}
+
 
-def pokemon_form(pokemon=None):
+def pokemon_form(pokemon=None, attack_options=None):
 
     if pokemon:
         nombre_val = pokemon.nombre
@@ -29,19 +52,37 @@ def pokemon_form(pokemon=None):
         nivel = st.number_input(
             "Nivel", min_value=1, max_value=100, value=int(nivel_val)
         )
-        st.markdown("**Ataques** (una línea por ataque, formato: nombre||tipo)")
-        ataques_raw = st.text_area("Ataques", value=ataques_val, height=150)
+        if attack_options is None:
+            st.markdown("**Ataques** (una línea por ataque, formato: nombre||tipo)")
+            ataques_raw = st.text_area("Ataques", value=ataques_val, height=150)
+        else:
+            # Autocompletado con el catálogo de ataques; se pueden escribir
+            # ataques nuevos como "Nombre (Tipo)"
+            ataques_actuales = (pokemon.ataques or []) if pokemon else []
+            actuales = [attack_label(a.nombre, a.tipo) for a in ataques_actuales]
+            opciones = [attack_label(a["nombre"], a.get("tipo")) for a in attack_options]
+            opciones += [a for a in actuales if a not in opciones]
+            ataques_sel = st.multiselect(
+                "Ataques",
+                options=opciones,
+                default=actuales,
+                accept_new_options=True,
+                placeholder="Busca un ataque o escribe uno nuevo: Nombre (Tipo)",
+            )
 
         submitted = st.form_submit_button("Guardar Pokémon")
 
     if submitted:
-        ataques_list = []
-        for line in ataques_raw.splitlines():
-            if "||" in line:
-                nombre_a, tipo_a = line.split("||", 1)
-            else:
-                nombre_a, tipo_a = line, "Normal"
-            ataques_list.append({"nombre": nombre_a.strip(), "tipo": tipo_a.strip()})
+        if attack_options is None:
+            ataques_list = []
+            for line in ataques_raw.splitlines():
+                if "||" in line:
+                    nombre_a, tipo_a = line.split("||", 1)
+                else:
+                    nombre_a, tipo_a = line, "Normal"
+                ataques_list.append({"nombre": nombre_a.strip(), "tipo": tipo_a.strip()})
+        else:
+            ataques_list = [parse_attack(a) for a in ataques_sel if a.strip()]
 
         payload = {
             "nombre": nombre.strip(),
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo de servicios compartidos de la aplicación.
+
+Construye los objetos que deben existir una sola vez por proceso (como la
+caché de consultas) y ensambla el `PokemonController` que usan las páginas
+y su versión asíncrona, el `AsyncPokemonController`.
+"""
+
+import logging
+import os
+from typing import Any, Awaitable, List, Optional
+
+import streamlit as st
+from pymongo.errors import PyMongoError
+
+from async_controller import AsyncPokemonController, AsyncRunner
+from attacks import AttackCatalog
+from cache import QUERY_CACHE_SIZE, QUERY_CACHE_TTL, QueryCache
+from controller import STRICT_READS, PokemonController
+from db import DB_NAME, get_db, make_async_client
+from fuzzy import FuzzySearch
+from indexes import IndexReport, ensure_indexes
+from matchups import MatchupEngine
+from snapshot import PokemonSnapshot
+from sprites import SpriteStore
+from stats import StatsService
+
+logger = logging.getLogger(__name__)
+
+# Intervalo (segundos) de reconstrucción programada de las estadísticas;
+# 0 desactiva la programación y deja solo la actualización incremental
+STATS_REFRESH_SECONDS = float(os.getenv("STATS_REFRESH_SECONDS", "0"))
+
+# Activa la instantánea en memoria de la colección (requiere replica set)
+SNAPSHOT_ENABLED = os.getenv("SNAPSHOT_ENABLED", "0") == "1"
+
+
+@st.cache_resource(show_spinner=False)
+def get_query_cache() -> Optional[QueryCache]:
+    """
+    Devuelve la caché de consultas del proceso, compartida entre sesiones.
+
+    Returns:
+        Optional[QueryCache]: La caché, o None si está desactivada.
+    """
+    if QUERY_CACHE_SIZE <= 0:
+        return None
+    return QueryCache(max_entries=QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL)
+
+
+@st.cache_resource(show_spinner=False)
+def get_stats() -> StatsService:
+    """
+    Devuelve el servicio de estadísticas materializadas del proceso.
+
+    Returns:
+        StatsService: El servicio, con la reconstrucción programada en marcha
+            si `STATS_REFRESH_SECONDS` es mayor que 0.
+    """
+    stats = StatsService(get_db())
+    if STATS_REFRESH_SECONDS > 0:
+        stats.start_scheduler(STATS_REFRESH_SECONDS)
+    return stats
+
+
+@st.cache_resource(show_spinner=False)
+def get_attacks() -> AttackCatalog:
+    """
+    Devuelve el catálogo de ataques materializado del proceso.
+
+    Si el catálogo está vacío (p. ej. en una base de datos cargada antes de
+    que existiera) se construye la primera vez, para que las actualizaciones
+    incrementales partan de los recuentos completos.
+
+    Returns:
+        AttackCatalog: El catálogo.
+    """
+    attacks = AttackCatalog(get_db(), cache=get_query_cache())
+    if attacks.target.estimated_document_count() == 0:
+        attacks.rebuild()
+    return attacks
+
+
+@st.cache_resource(show_spinner=False)
+def get_matchups() -> MatchupEngine:
+    """
+    Devuelve el motor de enfrentamientos del proceso, cuya plantilla
+    codificada se comparte entre sesiones y llamadas.
+
+    Returns:
+        MatchupEngine: El motor.
+    """
+    return MatchupEngine(get_db()["pokemons"])
+
+
+@st.cache_resource(show_spinner=False)
+def get_fuzzy() -> FuzzySearch:
+    """
+    Devuelve la búsqueda aproximada de nombres del proceso, con su índice de
+    trigramas construyéndose en segundo plano.
+
+    Returns:
+        FuzzySearch: La búsqueda (sin resultados hasta que `is_ready`).
+    """
+    return FuzzySearch(get_db()["pokemons"]).start()
+
+
+@st.cache_resource(show_spinner=False)
+def get_indexes() -> Optional[IndexReport]:
+    """
+    Comprueba y crea los índices de `indexes.INDEX_SPEC` una vez por proceso.
+
+    Un fallo (p. ej. por falta de permisos) se registra pero no impide usar
+    la aplicación, que funcionará sin los índices que falten.
+
+    Returns:
+        Optional[IndexReport]: El informe, o None si no se pudo aplicar.
+    """
+    try:
+        return ensure_indexes(get_db())
+    except PyMongoError:
+        logger.exception("No se pudieron aplicar los índices")
+        return None
+
+
+def get_controller() -> PokemonController:
+    """
+    Devuelve un controlador de la colección 'pokemons' conectado a la caché
+    de consultas compartida y a los servicios que se actualizan con cada
+    escritura. La primera llamada del proceso aplica además los índices.
+
+    Returns:
+        PokemonController: El controlador listo para usar.
+    """
+    get_indexes()
+    return PokemonController(
+        get_db()["pokemons"],
+        cache=get_query_cache(),
+        hooks=[get_stats(), get_attacks(), get_matchups(), get_fuzzy()],
+        strict_reads=STRICT_READS,
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def get_snapshot() -> Optional[PokemonSnapshot]:
+    """
+    Devuelve la instantánea en memoria del proceso, arrancándola la primera vez.
+
+    Returns:
+        Optional[PokemonSnapshot]: La instantánea, o None si está desactivada.
+    """
+    if not SNAPSHOT_ENABLED:
+        return None
+    return PokemonSnapshot(get_db()["pokemons"], fallback=get_controller()).start()
+
+
+@st.cache_resource(show_spinner=False)
+def get_sprites() -> SpriteStore:
+    """
+    Devuelve el almacén de sprites locales del proceso, con sus cachés de
+    miniaturas compartidas entre sesiones.
+
+    Returns:
+        SpriteStore: El almacén.
+    """
+    return SpriteStore()
+
+
+@st.cache_resource(show_spinner=False)
+def get_async_runner() -> AsyncRunner:
+    """
+    Devuelve el bucle de eventos del proceso, en su propio hilo.
+
+    Returns:
+        AsyncRunner: El bucle, ya arrancado.
+    """
+    return AsyncRunner().start()
+
+
+@st.cache_resource(show_spinner=False)
+def get_async_controller() -> AsyncPokemonController:
+    """
+    Devuelve el controlador asíncrono de la colección 'pokemons', con un
+    `AsyncMongoClient` creado en el bucle de `get_async_runner` y la misma
+    caché de consultas y hooks que `get_controller`.
+
+    Sus métodos son corrutinas: se ejecutan con `run_concurrently`.
+
+    Returns:
+        AsyncPokemonController: El controlador listo para usar.
+    """
+    get_indexes()
+    client = get_async_runner().call(make_async_client)
+    return AsyncPokemonController(
+        client[DB_NAME]["pokemons"],
+        cache=get_query_cache(),
+        hooks=[get_stats(), get_attacks(), get_matchups(), get_fuzzy()],
+        strict_reads=STRICT_READS,
+    )
+
+
+def run_concurrently(*awaitables: Optional[Awaitable[Any]]) -> List[Any]:
+    """
+    Lanza a la vez varias consultas del `AsyncPokemonController` y espera a
+    todas, p. ej.:
+
+        page, total = run_concurrently(
+            controller.find_page_table(filtro), controller.count(filtro)
+        )
+
+    Una consulta que no haga falta se puede pasar como None (su resultado
+    es None).
+
+    Returns:
+        List[Any]: El resultado de cada consulta, en el mismo orden.
+    """
+    return get_async_runner().gather(*awaitables)
@@ -0,0 +1,467 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo de la instantánea en memoria de la colección de Pokémon.
+
+Define `PokemonSnapshot`, una copia completa de la colección 'pokemons' en
+la memoria del proceso. Se carga una vez y se mantiene al día siguiendo un
+change stream de MongoDB (requiere un replica set; basta con uno de un solo
+nodo). Tras una desconexión se reanuda desde el último resume token.
+
+Los filtros del Listado (nombre, región y Pokedex mínimo) se resuelven con
+índices secundarios en memoria, sin ir a la base de datos, y las páginas se
+recorren sobre una lista ya ordenada por cada ordenación del Listado, como
+haría MongoDB con sus índices. Mientras la
+instantánea no está caliente, las consultas se delegan en el controlador.
+"""
+
+import bisect
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from bson import ObjectId
+from pydantic import ValidationError
+from pymongo.collection import Collection
+from pymongo.errors import OperationFailure, PyMongoError
+
+from controller import (
+    PAGE_SORT_KEYS,
+    InvalidPageError,
+    PokemonController,
+    decode_cursor,
+    encode_cursor,
+    listing_filter,
+)
+from models import Page, Pokemon, TablePage
+from normalize import normalize_name
+from tables import ATTACKS_TEXT, from_objects
+
+logger = logging.getLogger(__name__)
+
+# Códigos de error de MongoDB relevantes para el change stream
+_NOT_REPLICA_SET = 40573
+_HISTORY_LOST = 286
+
+# Eventos tras los cuales la instantánea debe recargarse por completo
+_RESET_EVENTS = {"drop", "dropDatabase", "rename", "invalidate"}
+
+_MIN_OID = ObjectId("0" * 24)
+
+
+def _sort_key(value: Any) -> Tuple:
+    """
+    Clave de ordenación que coloca los nulos antes que cualquier otro valor,
+    igual que MongoDB.
+    """
+    return (0,) if value is None else (1, value)
+
+
+def _scan(
+    index: List[Tuple[Tuple, ObjectId]],
+    start: int,
+    step: int,
+    allowed: Optional[Set[ObjectId]],
+    limit: int,
+) -> List[ObjectId]:
+    """
+    Recorre un índice de ordenación desde `start` hacia delante (`step` 1) o
+    hacia atrás (-1) y devuelve los primeros `limit` ids de `allowed` (o
+    cualquiera, si es None).
+    """
+    found: List[ObjectId] = []
+    i = start
+    while 0 <= i < len(index) and len(found) < limit:
+        oid = index[i][1]
+        if allowed is None or oid in allowed:
+            found.append(oid)
+        i += step
+    return found
+
+
+class PokemonSnapshot:
+    """
+    Copia en memoria de la colección 'pokemons' sincronizada por change stream.
+    """
+
+    def __init__(
+        self,
+        collection: Collection,
+        fallback: PokemonController,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+    ):
+        """
+        Inicializa la instantánea (vacía y fría hasta llamar a `start`).
+
+        Args:
+            collection (Collection): La colección de MongoDB a reflejar.
+            fallback (PokemonController): Controlador que responde mientras la
+                instantánea no está caliente.
+            reconnect_delay (float, optional): Espera inicial entre reintentos.
+            max_reconnect_delay (float, optional): Espera máxima entre reintentos.
+        """
+        self.col = collection
+        self.fallback = fallback
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.last_error: Optional[str] = None
+
+        self._lock = threading.RLock()
+        self._warm = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._resume_token: Optional[Dict[str, Any]] = None
+
+        self._docs: Dict[ObjectId, Pokemon] = {}
+        # Índices secundarios: listas ordenadas de (clave, _id) y región -> ids
+        self._by_name: List[Tuple[str, ObjectId]] = []
+        self._by_pokedex: List[Tuple[int, ObjectId]] = []
+        self._by_region: Dict[str, Set[ObjectId]] = {}
+        # Índices de las páginas: ordenación -> lista ordenada de (clave, _id)
+        self._by_sort: Dict[str, List[Tuple[Tuple, ObjectId]]] = {
+            key: [] for key in PAGE_SORT_KEYS
+        }
+
+    # -------------------
+    # CICLO DE VIDA
+    # -------------------
+    @property
+    def is_warm(self) -> bool:
+        """
+        True cuando la instantánea está cargada y siguiendo los cambios.
+        """
+        return self._warm.is_set()
+
+    def start(self) -> "PokemonSnapshot":
+        """
+        Arranca el hilo que carga la colección y sigue el change stream.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="pokemon-snapshot", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Detiene el seguimiento de cambios; la instantánea deja de estar caliente.
+        """
+        self._stop.set()
+        self._warm.clear()
+
+    def _run(self) -> None:
+        """
+        Bucle del hilo: abre el change stream, carga la colección si hace
+        falta y aplica los cambios. Se reconecta con espera exponencial.
+        """
+        delay = self.reconnect_delay
+        while not self._stop.is_set():
+            try:
+                # El stream se abre antes de la carga inicial para no perder
+                # cambios concurrentes; aplicarlos dos veces es inocuo.
+                with self.col.watch(
+                    full_document="updateLookup",
+                    resume_after=self._resume_token,
+                    max_await_time_ms=1000,
+                ) as stream:
+                    if not self.is_warm:
+                        self._load()
+                        self._warm.set()
+                    delay = self.reconnect_delay
+                    while not self._stop.is_set() and stream.alive:
+                        change = stream.try_next()
+                        if change is not None and not self._apply(change):
+                            break
+                        self._resume_token = stream.resume_token
+            except OperationFailure as e:
+                self.last_error = str(e)
+                if e.code == _NOT_REPLICA_SET:
+                    logger.warning("Change streams no disponibles: %s", e)
+                    return
+                if e.code == _HISTORY_LOST:
+                    # El oplog ya no contiene el resume token: recarga completa
+                    self._reset()
+                    continue
+                self._stop.wait(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+            except PyMongoError as e:
+                self.last_error = str(e)
+                logger.warning("Change stream interrumpido, reintentando: %s", e)
+                self._stop.wait(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _reset(self) -> None:
+        """
+        Olvida el resume token para forzar una recarga completa.
+        """
+        self._resume_token = None
+        self._warm.clear()
+
+    # -------------------
+    # MANTENIMIENTO DE ÍNDICES
+    # -------------------
+    def _load(self) -> None:
+        """
+        Carga la colección completa y reconstruye los índices en memoria.
+        """
+        docs: Dict[ObjectId, Pokemon] = {}
+        for raw in self.col.find():
+            try:
+                docs[raw["_id"]] = self.fallback.decode(Pokemon, raw)
+            except ValidationError:
+                continue
+        by_region: Dict[str, Set[ObjectId]] = {}
+        for oid, pokemon in docs.items():
+            by_region.setdefault((pokemon.region or "").casefold(), set()).add(oid)
+        # Ordenar una vez es mucho más barato que insertar en orden uno a uno
+        by_name = sorted((normalize_name(p.nombre), oid) for oid, p in docs.items())
+        by_pokedex = sorted(
+            (p.pokedex_nacional, oid)
+            for oid, p in docs.items()
+            if p.pokedex_nacional is not None
+        )
+        by_sort = {
+            key: sorted((_sort_key(getattr(p, key)), oid) for oid, p in docs.items())
+            for key in PAGE_SORT_KEYS
+        }
+        with self._lock:
+            self._docs = docs
+            self._by_name = by_name
+            self._by_pokedex = by_pokedex
+            self._by_region = by_region
+            self._by_sort = by_sort
+
+    def _index(self, pokemon: Pokemon) -> None:
+        """
+        Añade un Pokémon a los índices (sustituyendo su versión anterior).
+        """
+        self._unindex(pokemon.id)
+        oid = pokemon.id
+        self._docs[oid] = pokemon
+        bisect.insort(self._by_name, (normalize_name(pokemon.nombre), oid))
+        if pokemon.pokedex_nacional is not None:
+            bisect.insort(self._by_pokedex, (pokemon.pokedex_nacional, oid))
+        region = (pokemon.region or "").casefold()
+        self._by_region.setdefault(region, set()).add(oid)
+        for key, index in self._by_sort.items():
+            bisect.insort(index, (_sort_key(getattr(pokemon, key)), oid))
+
+    def _unindex(self, oid: ObjectId) -> None:
+        """
+        Quita un Pokémon de los índices, si estaba.
+        """
+        pokemon = self._docs.pop(oid, None)
+        if pokemon is None:
+            return
+        self._remove_sorted(self._by_name, (normalize_name(pokemon.nombre), oid))
+        if pokemon.pokedex_nacional is not None:
+            self._remove_sorted(self._by_pokedex, (pokemon.pokedex_nacional, oid))
+        region = (pokemon.region or "").casefold()
+        ids = self._by_region.get(region)
+        if ids is not None:
+            ids.discard(oid)
+            if not ids:
+                del self._by_region[region]
+        for key, index in self._by_sort.items():
+            self._remove_sorted(index, (_sort_key(getattr(pokemon, key)), oid))
+
+    @staticmethod
+    def _remove_sorted(items: List[Tuple[Any, ObjectId]], item: Tuple[Any, ObjectId]) -> None:
+        """
+        Elimina `item` de una lista ordenada por búsqueda binaria.
+        """
+        i = bisect.bisect_left(items, item)
+        if i < len(items) and items[i] == item:
+            del items[i]
+
+    def _apply(self, change: Dict[str, Any]) -> bool:
+        """
+        Aplica un evento del change stream a la instantánea.
+
+        Returns:
+            bool: False si el evento obliga a recargar la colección.
+        """
+        op = change.get("operationType")
+        if op in _RESET_EVENTS:
+            self._reset()
+            return False
+        oid = change.get("documentKey", {}).get("_id")
+        with self._lock:
+            if op == "delete":
+                self._unindex(oid)
+            elif op in ("insert", "replace", "update"):
+                full = change.get("fullDocument")
+                if full is None:
+                    # El documento se borró antes de poder leerlo
+                    self._unindex(oid)
+                    return True
+                try:
+                    self._index(self.fallback.decode(Pokemon, full))
+                except ValidationError:
+                    self._unindex(oid)
+        return True
+
+    # -------------------
+    # CONSULTAS
+    # -------------------
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def query(
+        self, nombre: str = "", region: str = "", min_pokedex: int = 0
+    ) -> List[Pokemon]:
+        """
+        Resuelve los filtros del Listado en memoria.
+
+        Usa el índice más selectivo disponible (prefijo de nombre o Pokedex
+        mínimo) para obtener candidatos y comprueba el resto de condiciones.
+
+        Args:
+            nombre (str, optional): Prefijo del nombre, sin acentos ni mayúsculas.
+            region (str, optional): Texto contenido en la región.
+            min_pokedex (int, optional): Pokedex nacional mínimo (0 = sin filtro).
+
+        Returns:
+            List[Pokemon]: Los Pokémon que cumplen todos los filtros.
+        """
+        prefix = normalize_name(nombre)
+        region = region.casefold()
+        with self._lock:
+            if prefix:
+                lo = bisect.bisect_left(self._by_name, (prefix, _MIN_OID))
+                ids = []
+                for key, oid in self._by_name[lo:]:
+                    if not key.startswith(prefix):
+                        break
+                    ids.append(oid)
+            elif min_pokedex > 0:
+                lo = bisect.bisect_left(self._by_pokedex, (min_pokedex, _MIN_OID))
+                ids = [oid for _, oid in self._by_pokedex[lo:]]
+            else:
+                ids = list(self._docs)
+
+            allowed: Optional[Set[ObjectId]] = None
+            if region:
+                allowed = set()
+                for key, region_ids in self._by_region.items():
+                    if region in key:
+                        allowed |= region_ids
+
+            result = []
+            for oid in ids:
+                if allowed is not None and oid not in allowed:
+                    continue
+                pokemon = self._docs[oid]
+                if min_pokedex > 0 and (pokemon.pokedex_nacional or 0) < min_pokedex:
+                    continue
+                result.append(pokemon)
+            return result
+
+    def find_page(
+        self,
+        nombre: str = "",
+        region: str = "",
+        min_pokedex: int = 0,
+        sort_by: str = "pokedex_nacional",
+        page_size: int = 50,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        summary: bool = False,
+    ) -> Page:
+        """
+        Devuelve una página del Listado con la misma semántica y los mismos
+        tokens que `PokemonController.find_page`.
+
+        Si la instantánea no está caliente, delega en el controlador (con la
+        proyección ligera si `summary` es True). En memoria se devuelven
+        siempre los documentos completos, que no tienen coste adicional.
+
+        La página se lee del índice de `sort_by` desde la posición del token,
+        sin ordenar los resultados: sin filtros cuesta lo mismo que
+        `page_size`, y con ellos se descartan los que no los cumplen.
+
+        Returns:
+            Page: Los Pokémon de la página y los tokens de las páginas vecinas.
+        """
+        if not self.is_warm:
+            return self.fallback.find_page(
+                listing_filter(nombre, region, min_pokedex),
+                sort_by=sort_by,
+                page_size=page_size,
+                after=after,
+                before=before,
+                summary=summary,
+            )
+        if sort_by not in PAGE_SORT_KEYS:
+            raise InvalidPageError(f"Ordenación no admitida: {sort_by}")
+
+        allowed: Optional[Set[ObjectId]] = None
+        if nombre or region or min_pokedex > 0:
+            allowed = {p.id for p in self.query(nombre, region, min_pokedex)}
+
+        with self._lock:
+            index = self._by_sort[sort_by]
+            if before:
+                value, oid = decode_cursor(before, sort_by)
+                pos = bisect.bisect_left(index, (_sort_key(value), oid))
+                ids = _scan(index, pos - 1, -1, allowed, page_size + 1)
+                has_prev = len(ids) > page_size
+                ids = ids[:page_size][::-1]
+                has_next = bool(_scan(index, pos, 1, allowed, 1))
+            else:
+                pos = 0
+                if after:
+                    value, oid = decode_cursor(after, sort_by)
+                    pos = bisect.bisect_right(index, (_sort_key(value), oid))
+                ids = _scan(index, pos, 1, allowed, page_size + 1)
+                has_next = len(ids) > page_size
+                ids = ids[:page_size]
+                has_prev = bool(_scan(index, pos - 1, -1, allowed, 1))
+            page = Page(items=[self._docs[oid] for oid in ids])
+
+        if page.items:
+            first, last = page.items[0], page.items[-1]
+            if has_prev:
+                page.prev_token = encode_cursor(sort_by, getattr(first, sort_by), first.id)
+            if has_next:
+                page.next_token = encode_cursor(sort_by, getattr(last, sort_by), last.id)
+        return page
+
+    def find_page_table(
+        self,
+        nombre: str = "",
+        region: str = "",
+        min_pokedex: int = 0,
+        sort_by: str = "pokedex_nacional",
+        page_size: int = 50,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        attacks: Optional[str] = ATTACKS_TEXT,
+    ) -> TablePage:
+        """
+        Igual que `find_page`, pero con las filas en una tabla de Arrow, como
+        `PokemonController.find_page_table`.
+
+        Returns:
+            TablePage: La tabla de la página y los tokens de las páginas vecinas.
+        """
+        if not self.is_warm:
+            return self.fallback.find_page_table(
+                listing_filter(nombre, region, min_pokedex),
+                sort_by=sort_by,
+                page_size=page_size,
+                after=after,
+                before=before,
+                attacks=attacks,
+            )
+        page = self.find_page(
+            nombre, region, min_pokedex,
+            sort_by=sort_by, page_size=page_size, after=after, before=before,
+        )
+        return TablePage(
+            table=from_objects(page.items, attacks=attacks),
+            prev_token=page.prev_token,
+            next_token=page.next_token,
+        )
@@ -0,0 +1,384 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo de sprites locales de los Pokémon.
+
+Define `SpriteStore`, un almacén en disco de las imágenes de cada Pokémon,
+identificadas por su número de Pokedex nacional. Las imágenes se cargan una
+vez desde un directorio local (`python manage.py import-sprites DIR`), de
+modo que la aplicación no descarga nada de internet al mostrar las páginas.
+
+Estructura del almacén:
+
+    SPRITES_DIR/original/<n>.png         imagen importada (fuente de verdad)
+    SPRITES_DIR/thumbs/<tamaño>/<n>.png  miniatura cuadrada de tamaño fijo
+
+Las miniaturas se generan con Pillow al importar y forman una caché en disco
+acotada por tamaño (`SPRITE_CACHE_MB`): al superarlo se borran las menos
+usadas, que se regeneran desde el original si se vuelven a pedir. Las
+páginas las reciben como data URIs (`data:image/png;base64,...`) incrustadas
+en la tabla, servidas desde una caché LRU en memoria (`SPRITE_MEMORY_MB`).
+"""
+
+import base64
+import io
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import pyarrow as pa
+from PIL import Image
+
+from tables import sprite_urls
+
+# Directorio del almacén de sprites
+SPRITES_DIR = os.getenv(
+    "SPRITES_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "sprites")
+)
+
+# Tamaño máximo (MB) de las miniaturas en disco y de los data URIs en memoria
+SPRITE_CACHE_MB = float(os.getenv("SPRITE_CACHE_MB", "64"))
+SPRITE_MEMORY_MB = float(os.getenv("SPRITE_MEMORY_MB", "16"))
+
+# Con 1, los Pokémon sin sprite local usan la imagen remota de PokeAPI; por
+# defecto la celda queda vacía y no se hace ninguna petición externa
+SPRITE_REMOTE_FALLBACK = os.getenv("SPRITE_REMOTE_FALLBACK", "0") == "1"
+
+ARTWORK_URL = (
+    "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/"
+    "other/official-artwork/"
+)
+
+# Tamaños de miniatura (lado en píxeles): tabla del Listado y ficha de Editar
+THUMB_SIZES = {"list": 96, "detail": 200}
+
+# Extensiones de imagen que se importan
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+
+_NUMBER = re.compile(r"^(\d+)")
+
+
+@dataclass
+class SpriteImportResult:
+    """
+    Resultado de importar un directorio de sprites.
+    """
+    imported: int = 0
+    skipped: int = 0
+    failed: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+def pokedex_number(filename: str) -> Optional[int]:
+    """
+    Número de Pokedex de un archivo de sprite, tomado de los dígitos con los
+    que empieza su nombre ("25.png", "025.png" o "0025-pikachu.png").
+
+    Returns:
+        Optional[int]: El número, o None si el nombre no empieza por dígitos.
+    """
+    stem, ext = os.path.splitext(os.path.basename(filename))
+    match = _NUMBER.match(stem)
+    if ext.lower() not in IMAGE_EXTENSIONS or not match:
+        return None
+    return int(match.group(1)) or None
+
+
+def make_thumbnail(image: Image.Image, side: int) -> bytes:
+    """
+    Reduce una imagen a un PNG cuadrado de `side` píxeles, centrada sobre
+    fondo transparente y sin deformarla.
+
+    Args:
+        image (Image.Image): La imagen original.
+        side (int): El lado de la miniatura en píxeles.
+
+    Returns:
+        bytes: El PNG de la miniatura.
+    """
+    thumb = image.convert("RGBA")
+    thumb.thumbnail((side, side), Image.Resampling.LANCZOS)
+    canvas = Image.new("RGBA", (side, side), (0, 0, 0, 0))
+    canvas.paste(thumb, ((side - thumb.width) // 2, (side - thumb.height) // 2))
+    out = io.BytesIO()
+    canvas.save(out, format="PNG", optimize=True)
+    return out.getvalue()
+
+
+class SpriteStore:
+    """
+    Almacén de sprites en disco con miniaturas y cachés acotadas, seguro
+    para hilos y compartido entre sesiones.
+    """
+
+    def __init__(
+        self,
+        root: str = SPRITES_DIR,
+        cache_bytes: int = int(SPRITE_CACHE_MB * 1024 * 1024),
+        memory_bytes: int = int(SPRITE_MEMORY_MB * 1024 * 1024),
+        remote_fallback: bool = SPRITE_REMOTE_FALLBACK,
+    ):
+        """
+        Inicializa el almacén; crea sus directorios si no existen.
+
+        Args:
+            root (str, optional): Directorio del almacén. Defaults to `SPRITES_DIR`.
+            cache_bytes (int, optional): Tamaño máximo de las miniaturas en disco.
+            memory_bytes (int, optional): Tamaño máximo de los data URIs en memoria.
+            remote_fallback (bool, optional): Usa la imagen remota de PokeAPI
+                para los Pokémon sin sprite local.
+        """
+        self.root = root
+        self.cache_bytes = cache_bytes
+        self.memory_bytes = memory_bytes
+        self.remote_fallback = remote_fallback
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[tuple, str]" = OrderedDict()
+        self._memory_used = 0
+        os.makedirs(os.path.join(root, "original"), exist_ok=True)
+        for size in THUMB_SIZES:
+            os.makedirs(os.path.join(root, "thumbs", size), exist_ok=True)
+        # Miniaturas en disco -> bytes, de la usada hace más tiempo a la más
+        # reciente; el directorio solo se recorre aquí
+        self._disk: "OrderedDict[str, int]" = OrderedDict(
+            (path, size) for _, path, size in sorted(self._thumb_files())
+        )
+        self._disk_used = sum(self._disk.values())
+
+    def _original_path(self, number: int) -> str:
+        """
+        Ruta de la imagen original de un Pokémon.
+        """
+        return os.path.join(self.root, "original", f"{number}.png")
+
+    def _thumb_path(self, number: int, size: str) -> str:
+        """
+        Ruta de una miniatura de un Pokémon.
+        """
+        return os.path.join(self.root, "thumbs", size, f"{number}.png")
+
+    def _thumb_files(self) -> List[Tuple[float, str, int]]:
+        """
+        Fecha de último uso, ruta y tamaño de todas las miniaturas en disco.
+        """
+        files = []
+        for size in THUMB_SIZES:
+            folder = os.path.join(self.root, "thumbs", size)
+            for entry in os.scandir(folder):
+                if entry.is_file():
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, entry.path, stat.st_size))
+        return files
+
+    # -------------------
+    # IMPORTACIÓN
+    # -------------------
+    def import_image(self, number: int, source: str) -> None:
+        """
+        Importa la imagen de un Pokémon: guarda el original como PNG y genera
+        sus miniaturas.
+
+        Args:
+            number (int): El número de Pokedex nacional.
+            source (str): Ruta del archivo de imagen.
+
+        Raises:
+            OSError: Si la imagen no se puede leer o escribir.
+        """
+        with Image.open(source) as image:
+            image.load()
+            image.convert("RGBA").save(self._original_path(number), format="PNG")
+            for size, side in THUMB_SIZES.items():
+                self._write_thumb(number, size, make_thumbnail(image, side))
+        self._forget(number)
+
+    def import_dir(
+        self, directory: str, progress: Optional[Callable[[int], None]] = None
+    ) -> SpriteImportResult:
+        """
+        Importa todos los sprites de un directorio local.
+
+        Cada archivo debe llamarse con el número de Pokedex ("25.png",
+        "0025-pikachu.png"...); el resto se omiten.
+
+        Args:
+            directory (str): El directorio de origen.
+            progress (Optional[Callable[[int], None]], optional): Se llama con
+                el número de archivos procesados. Defaults to None.
+
+        Returns:
+            SpriteImportResult: Los contadores de la importación.
+        """
+        result = SpriteImportResult()
+        for i, name in enumerate(sorted(os.listdir(directory)), start=1):
+            number = pokedex_number(name)
+            if number is None:
+                result.skipped += 1
+            else:
+                try:
+                    self.import_image(number, os.path.join(directory, name))
+                    result.imported += 1
+                except OSError as e:
+                    result.failed += 1
+                    result.errors.append(f"{name}: {e}")
+            if progress:
+                progress(i)
+        return result
+
+    # -------------------
+    # CACHÉ EN DISCO
+    # -------------------
+    def _write_thumb(self, number: int, size: str, data: bytes) -> None:
+        """
+        Guarda una miniatura y desaloja las menos usadas si se supera el
+        tamaño máximo de la caché en disco.
+        """
+        path = self._thumb_path(number, size)
+        with self._lock:
+            with open(path, "wb") as f:
+                f.write(data)
+            self._disk_used += len(data) - self._disk.pop(path, 0)
+            self._disk[path] = len(data)
+            self._evict()
+
+    def _evict(self) -> None:
+        """
+        Borra las miniaturas usadas hace más tiempo hasta quedar por debajo
+        del tamaño máximo, sin tocar la última escrita. Se llama con el
+        cerrojo adquirido.
+        """
+        while self._disk_used > self.cache_bytes and len(self._disk) > 1:
+            path, size = self._disk.popitem(last=False)
+            self._disk_used -= size
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def thumbnail(self, number: int, size: str = "list") -> Optional[bytes]:
+        """
+        Devuelve la miniatura PNG de un Pokémon, regenerándola desde el
+        original si se desalojó de la caché en disco.
+
+        Args:
+            number (int): El número de Pokedex nacional.
+            size (str, optional): Uno de `THUMB_SIZES`. Defaults to "list".
+
+        Returns:
+            Optional[bytes]: El PNG, o None si no hay sprite local.
+        """
+        path = self._thumb_path(number, size)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # Marca el uso para el desalojo LRU (en disco, para el próximo arranque)
+            os.utime(path)
+            with self._lock:
+                if path in self._disk:
+                    self._disk.move_to_end(path)
+            return data
+        except FileNotFoundError:
+            pass
+        original = self._original_path(number)
+        if not os.path.exists(original):
+            return None
+        with Image.open(original) as image:
+            data = make_thumbnail(image, THUMB_SIZES[size])
+        self._write_thumb(number, size, data)
+        return data
+
+    # -------------------
+    # DATA URIS
+    # -------------------
+    def _forget(self, number: int) -> None:
+        """
+        Descarta los data URIs en memoria de un Pokémon (tras reimportarlo).
+        """
+        with self._lock:
+            for size in THUMB_SIZES:
+                uri = self._memory.pop((number, size), None)
+                if uri is not None:
+                    self._memory_used -= len(uri)
+
+    def data_uri(self, number: int, size: str = "list") -> Optional[str]:
+        """
+        Devuelve la miniatura como data URI, desde la caché en memoria.
+
+        Args:
+            number (int): El número de Pokedex nacional.
+            size (str, optional): Uno de `THUMB_SIZES`. Defaults to "list".
+
+        Returns:
+            Optional[str]: El data URI, o None si no hay sprite local.
+        """
+        key = (number, size)
+        with self._lock:
+            uri = self._memory.get(key)
+            if uri is not None:
+                self._memory.move_to_end(key)
+                return uri
+        data = self.thumbnail(number, size)
+        if data is None:
+            return None
+        uri = "data:image/png;base64," + base64.b64encode(data).decode("ascii")
+        with self._lock:
+            if key not in self._memory:
+                self._memory[key] = uri
+                self._memory_used += len(uri)
+            while self._memory_used > self.memory_bytes and self._memory:
+                _, old = self._memory.popitem(last=False)
+                self._memory_used -= len(old)
+        return uri
+
+    def column(self, table: pa.Table, size: str = "list") -> pa.Array:
+        """
+        Calcula la imagen de cada fila de una tabla de Pokémon a partir de su
+        Pokedex nacional, para una columna `st.column_config.ImageColumn`.
+
+        Args:
+            table (pa.Table): Tabla con la columna 'pokedex_nacional'.
+            size (str, optional): Uno de `THUMB_SIZES`. Defaults to "list".
+
+        Returns:
+            pa.Array: Un data URI por fila; para las filas sin sprite local,
+                la URL remota (con `remote_fallback`) o nulo.
+        """
+        numbers = table.column("pokedex_nacional").to_pylist()
+        uris = [self.data_uri(n, size) if n else None for n in numbers]
+        if self.remote_fallback and None in uris:
+            remote = sprite_urls(table).to_pylist()
+            uris = [uri or url for uri, url in zip(uris, remote)]
+        return pa.array(uris, type=pa.string())
+
+    def image(self, number: Optional[int], size: str = "detail") -> Union[bytes, str, None]:
+        """
+        Imagen de un Pokémon para `st.image`: el PNG local o, con
+        `remote_fallback`, la URL de su ilustración oficial.
+
+        Returns:
+            Union[bytes, str, None]: El PNG, una URL o None si no hay imagen.
+        """
+        if not number:
+            return None
+        data = self.thumbnail(number, size)
+        if data is None and self.remote_fallback:
+            return f"{ARTWORK_URL}{number}.png"
+        return data
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Devuelve la ocupación de las cachés.
+
+        Returns:
+            Dict[str, int]: Sprites importados, bytes de miniaturas en disco y
+                bytes y entradas de data URIs en memoria.
+        """
+        with self._lock:
+            return {
+                "originals": len(os.listdir(os.path.join(self.root, "original"))),
+                "disk_bytes": self._disk_used,
+                "memory_bytes": self._memory_used,
+                "memory_entries": len(self._memory),
+            }
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo de arranque rápido de la aplicación.
+
+La página de inicio (`app.py`) solo necesita Streamlit: no importa pymongo,
+pydantic, pyarrow ni numpy, y se muestra sin esperar a la base de datos. La
+primera vez que se carga en el proceso, `start_prewarm` lanza en un hilo en
+segundo plano el precalentamiento de lo que necesitan las demás páginas:
+
+1. importa sus módulos;
+2. aplica los índices (`services.get_indexes`);
+3. construye los servicios compartidos del controlador (caché de consultas,
+   estadísticas, catálogo de ataques, enfrentamientos y búsqueda aproximada);
+4. carga la primera página del Listado y su total en la caché de consultas,
+   con el mismo controlador asíncrono y los mismos argumentos que la página;
+5. lee el documento de estadísticas.
+
+Así, mientras el primer usuario lee la portada, el proceso se conecta a
+MongoDB y llena sus cachés. Si el usuario abre otra página antes de que
+termine, los objetos de `st.cache_resource` se esperan en lugar de
+construirse dos veces.
+
+Este módulo solo importa la biblioteca estándar y Streamlit: los demás se
+importan dentro del hilo.
+"""
+
+import importlib
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+# Activa el precalentamiento al cargar la página de inicio
+PREWARM_ENABLED = os.getenv("PREWARM_ENABLED", "1") == "1"
+
+# Tamaño de la página del Listado que se precarga (`PAGE_SIZE` de
+# pages/1_Listado.py)
+PREWARM_PAGE_SIZE = 50
+
+# Módulos que importan las páginas, además de Streamlit
+PAGE_MODULES = ("services", "perf_panel", "pokemon_form", "export", "import_json")
+
+
+def _import_modules() -> None:
+    """
+    Importa los módulos de las páginas (y con ellos pymongo, pydantic,
+    pyarrow y numpy).
+    """
+    for name in PAGE_MODULES:
+        importlib.import_module(name)
+
+
+def _warm_indexes() -> None:
+    """
+    Aplica los índices que falten.
+    """
+    import services
+
+    services.get_indexes()
+
+
+def _warm_services() -> None:
+    """
+    Construye el controlador y los servicios que usa como hooks.
+    """
+    import services
+
+    services.get_controller()
+
+
+def _warm_listing() -> None:
+    """
+    Carga en la caché de consultas la primera página del Listado sin
+    filtros y su total.
+    """
+    import services
+    from controller import PAGE_SORT_KEYS, listing_filter
+
+    # Con la instantánea activada, el Listado lee de memoria
+    if services.get_snapshot() is not None:
+        return
+    controller = services.get_async_controller()
+    filtro = listing_filter()
+    services.run_concurrently(
+        controller.find_page_table(
+            filtro, sort_by=PAGE_SORT_KEYS[0], page_size=PREWARM_PAGE_SIZE
+        ),
+        controller.count(filtro),
+    )
+
+
+def _warm_stats() -> None:
+    """
+    Lee el documento de estadísticas materializadas.
+    """
+    import services
+
+    services.get_stats().get()
+
+
+# Pasos del precalentamiento, en orden
+PREWARM_STEPS: Dict[str, Callable[[], None]] = {
+    "imports": _import_modules,
+    "índices": _warm_indexes,
+    "servicios": _warm_services,
+    "listado": _warm_listing,
+    "estadísticas": _warm_stats,
+}
+
+
+class Prewarm:
+    """
+    Precalentamiento del proceso en un hilo en segundo plano.
+
+    Guarda la duración de cada paso en `timings` (en milisegundos). Un paso
+    que falla (p. ej. porque MongoDB no responde) se registra y se pasa al
+    siguiente: las páginas harán lo que falte al usarse.
+    """
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_ready(self) -> bool:
+        """
+        True cuando han terminado todos los pasos.
+        """
+        return self._done.is_set()
+
+    @property
+    def total_ms(self) -> float:
+        """
+        Duración de los pasos terminados, en milisegundos.
+        """
+        return sum(self.timings.values())
+
+    def start(self) -> "Prewarm":
+        """
+        Ejecuta los pasos en un hilo en segundo plano.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="prewarm", daemon=True)
+            self._thread.start()
+        return self
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Espera a que terminen los pasos.
+
+        Returns:
+            bool: True si terminaron antes de `timeout` segundos.
+        """
+        return self._done.wait(timeout)
+
+    def _run(self) -> None:
+        """
+        Bucle del hilo: ejecuta los pasos en orden y mide cada uno.
+        """
+        for name, step in PREWARM_STEPS.items():
+            start = time.perf_counter()
+            try:
+                step()
+            except Exception as e:
+                logger.exception("Falló el paso '%s' del precalentamiento", name)
+                self.errors[name] = str(e)
+            self.timings[name] = (time.perf_counter() - start) * 1000
+        self._done.set()
+        logger.info(
+            "Precalentamiento terminado en %.0f ms (%s)",
+            self.total_ms,
+            ", ".join(f"{k} {v:.0f} ms" for k, v in self.timings.items()),
+        )
+
+
+@st.cache_resource(show_spinner=False)
+def start_prewarm() -> Optional[Prewarm]:
+    """
+    Lanza el precalentamiento una sola vez por proceso.
+
+    Returns:
+        Optional[Prewarm]: El precalentamiento en curso (o terminado), o None
+            si está desactivado (`PREWARM_ENABLED=0`).
+    """
+    if not PREWARM_ENABLED:
+        return None
+    return Prewarm().start()
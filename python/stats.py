@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo de estadísticas materializadas.
+
+Define `StatsService`, que mantiene en la colección 'pokemon_stats' un único
+documento con los agregados que muestra la página de Estadísticas: recuentos
+por tipo primario y secundario, por región, por pareja de tipos, histograma
+de niveles y frecuencia de tipos de ataque.
+
+El documento se reconstruye por completo con una agregación que termina en
+`$merge` (comando `rebuild-stats` o programado) y se mantiene al día de forma
+incremental con `$inc` desde las escrituras del `PokemonController`.
+"""
+
+import logging
+import re
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pymongo.database import Database
+
+logger = logging.getLogger(__name__)
+
+STATS_COLLECTION = "pokemon_stats"
+STATS_ID = "global"
+
+# Categorías de agregados del documento de estadísticas
+CATEGORIES = {
+    "por_tipo_primario": "Tipo primario",
+    "por_tipo_secundario": "Tipo secundario",
+    "por_region": "Región",
+    "por_par_tipos": "Pareja de tipos",
+    "histograma_nivel": "Nivel",
+    "tipos_ataque": "Tipo de ataque",
+}
+
+UNKNOWN = "Desconocido"
+NO_SECONDARY = "Ninguno"
+LEVEL_BUCKET = 10
+_BUCKET_START = re.compile(r"-?\d+")
+
+
+def _key(value: Any, default: str) -> str:
+    """
+    Convierte un valor en un nombre de campo válido para MongoDB.
+    """
+    if value is None or value == "":
+        return default
+    return str(value).replace(".", "·")
+
+
+def level_bucket(nivel: Optional[int]) -> str:
+    """
+    Etiqueta del tramo del histograma de niveles, p. ej. "11-20".
+    """
+    if not isinstance(nivel, (int, float)):
+        return UNKNOWN
+    lo = int((nivel - 1) // LEVEL_BUCKET) * LEVEL_BUCKET + 1
+    return f"{lo}-{lo + LEVEL_BUCKET - 1}"
+
+
+def bucket_start(label: str) -> float:
+    """
+    Nivel inicial de un tramo de `level_bucket`, para ordenar el histograma;
+    el tramo desconocido va al final. Los extremos pueden ser negativos
+    ("-9-0", "-19--10"), así que no basta con separar por el guion.
+    """
+    match = _BUCKET_START.match(label)
+    return int(match.group()) if match else float("inf")
+
+
+def contributions(doc: Optional[Dict[str, Any]]) -> Counter:
+    """
+    Calcula lo que aporta un documento de Pokémon a cada agregado.
+
+    Args:
+        doc (Optional[Dict[str, Any]]): El documento (None no aporta nada).
+
+    Returns:
+        Counter: Rutas del documento de estadísticas -> incremento.
+    """
+    inc: Counter = Counter()
+    if not doc:
+        return inc
+    t1 = _key(doc.get("tipo_primario"), UNKNOWN)
+    t2 = _key(doc.get("tipo_secundario"), NO_SECONDARY)
+    inc["total"] += 1
+    inc[f"por_tipo_primario.{t1}"] += 1
+    inc[f"por_tipo_secundario.{t2}"] += 1
+    inc[f"por_region.{_key(doc.get('region'), UNKNOWN)}"] += 1
+    inc[f"por_par_tipos.{t1} / {t2}"] += 1
+    inc[f"histograma_nivel.{level_bucket(doc.get('nivel'))}"] += 1
+    for ataque in doc.get("ataques") or []:
+        tipo = ataque.get("tipo") if isinstance(ataque, dict) else None
+        inc[f"tipos_ataque.{_key(tipo, UNKNOWN)}"] += 1
+    return inc
+
+
+# -------------------
+# AGREGACIÓN COMPLETA
+# -------------------
+def _key_expr(field: str, default: str) -> Dict[str, Any]:
+    """
+    Equivalente en el pipeline de agregación de `_key`.
+    """
+    value = {"$ifNull": [field, default]}
+    value = {"$cond": [{"$eq": [value, ""]}, default, value]}
+    return {
+        "$replaceAll": {"input": {"$toString": value}, "find": ".", "replacement": "·"}
+    }
+
+
+def _level_expr() -> Dict[str, Any]:
+    """
+    Equivalente en el pipeline de agregación de `level_bucket`.
+    """
+    lo = {
+        "$toInt": {
+            "$add": [
+                {
+                    "$multiply": [
+                        {"$floor": {"$divide": [{"$subtract": ["$nivel", 1]}, LEVEL_BUCKET]}},
+                        LEVEL_BUCKET,
+                    ]
+                },
+                1,
+            ]
+        }
+    }
+    return {
+        "$cond": [
+            {"$isNumber": "$nivel"},
+            {
+                "$concat": [
+                    {"$toString": lo},
+                    "-",
+                    {"$toString": {"$add": [lo, LEVEL_BUCKET - 1]}},
+                ]
+            },
+            UNKNOWN,
+        ]
+    }
+
+
+def _count_by(expr: Any) -> List[Dict[str, Any]]:
+    return [{"$group": {"_id": expr, "n": {"$sum": 1}}}]
+
+
+def _as_object(facet: str) -> Dict[str, Any]:
+    return {
+        "$arrayToObject": {
+            "$map": {"input": f"${facet}", "in": {"k": "$$this._id", "v": "$$this.n"}}
+        }
+    }
+
+
+def rebuild_pipeline() -> List[Dict[str, Any]]:
+    """
+    Pipeline que recalcula todos los agregados y los escribe con `$merge`.
+
+    Returns:
+        List[Dict[str, Any]]: Las etapas de la agregación.
+    """
+    t1 = _key_expr("$tipo_primario", UNKNOWN)
+    t2 = _key_expr("$tipo_secundario", NO_SECONDARY)
+    facets = {
+        "total": [{"$count": "n"}],
+        "por_tipo_primario": _count_by(t1),
+        "por_tipo_secundario": _count_by(t2),
+        "por_region": _count_by(_key_expr("$region", UNKNOWN)),
+        "por_par_tipos": _count_by({"$concat": [t1, " / ", t2]}),
+        "histograma_nivel": _count_by(_level_expr()),
+        "tipos_ataque": [{"$unwind": "$ataques"}]
+        + _count_by(_key_expr("$ataques.tipo", UNKNOWN)),
+    }
+    project = {"_id": {"$literal": STATS_ID}, "updated_at": "$$NOW"}
+    project["total"] = {"$ifNull": [{"$arrayElemAt": ["$total.n", 0]}, 0]}
+    for category in CATEGORIES:
+        project[category] = _as_object(category)
+    return [
+        {"$facet": facets},
+        {"$project": project},
+        {
+            "$merge": {
+                "into": STATS_COLLECTION,
+                "on": "_id",
+                "whenMatched": "replace",
+                "whenNotMatched": "insert",
+            }
+        },
+    ]
+
+
+class StatsService:
+    """
+    Mantiene y lee el documento de estadísticas materializadas.
+
+    Se registra como hook de escritura del `PokemonController`: cada
+    escritura individual aplica su diferencia con `$inc`, y las escrituras
+    masivas lanzan una reconstrucción completa.
+    """
+
+    def __init__(self, db: Database, source: str = "pokemons"):
+        """
+        Inicializa el servicio.
+
+        Args:
+            db (Database): La base de datos.
+            source (str, optional): La colección de Pokémon. Defaults to "pokemons".
+        """
+        self.source = db[source]
+        self.target = db[STATS_COLLECTION]
+        self._scheduler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def get(self) -> Optional[Dict[str, Any]]:
+        """
+        Lee el documento de estadísticas (una única lectura por `_id`).
+
+        Returns:
+            Optional[Dict[str, Any]]: El documento, o None si nunca se ha
+                construido.
+        """
+        return self.target.find_one({"_id": STATS_ID})
+
+    def rebuild(self) -> Optional[Dict[str, Any]]:
+        """
+        Recalcula todos los agregados en el servidor y los guarda con `$merge`.
+
+        Returns:
+            Optional[Dict[str, Any]]: El documento recién construido.
+        """
+        self.source.aggregate(rebuild_pipeline())
+        return self.get()
+
+    # -------------------
+    # HOOKS DE ESCRITURA
+    # -------------------
+    def on_write(
+        self, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]
+    ) -> None:
+        """
+        Aplica la diferencia entre la versión anterior y la nueva de un documento.
+
+        Si el documento de estadísticas aún no existe no se hace nada: se
+        creará completo en la primera reconstrucción.
+
+        Args:
+            before (Optional[Dict[str, Any]]): El documento antes de la
+                escritura (None en inserciones).
+            after (Optional[Dict[str, Any]]): El documento tras la escritura
+                (None en borrados).
+        """
+        inc = contributions(after)
+        inc.subtract(contributions(before))
+        inc = {path: n for path, n in inc.items() if n}
+        if not inc:
+            return
+        self.target.update_one(
+            {"_id": STATS_ID},
+            {"$inc": inc, "$set": {"updated_at": datetime.utcnow()}},
+        )
+
+    def on_bulk_write(self) -> None:
+        """
+        Tras una escritura masiva los documentos afectados no se conocen:
+        se reconstruyen las estadísticas completas.
+        """
+        self.rebuild()
+
+    # -------------------
+    # PROGRAMACIÓN
+    # -------------------
+    def start_scheduler(self, interval: float) -> None:
+        """
+        Reconstruye las estadísticas cada `interval` segundos en segundo plano,
+        para recoger escrituras hechas fuera del controlador.
+
+        Args:
+            interval (float): Segundos entre reconstrucciones.
+        """
+        if self._scheduler is not None and self._scheduler.is_alive():
+            return
+
+        def loop() -> None:
+            while not self._stop.wait(interval):
+                try:
+                    self.rebuild()
+                except Exception:
+                    logger.exception("Error al reconstruir las estadísticas")
+
+        self._stop.clear()
+        self._scheduler = threading.Thread(target=loop, name="stats-rebuild", daemon=True)
+        self._scheduler.start()
+
+    def stop_scheduler(self) -> None:
+        """
+        Detiene las reconstrucciones programadas.
+        """
+        self._stop.set()
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo de huellas de contenido para la sincronización incremental.
+
+`PokemonController.sync` guarda en cada Pokémon que escribe la huella
+(`content_hash`) de los datos de origen de los que procede. Al volver a
+sincronizar el mismo origen, los registros cuya huella coincide con la
+guardada se omiten sin validarlos ni escribirlos, de modo que repetir la
+carga de un origen sin cambios no escribe nada.
+
+Las demás escrituras del controlador eliminan la huella: un Pokémon editado
+desde la aplicación ya no coincide con su origen y la siguiente
+sincronización lo vuelve a escribir.
+
+La clave de cada registro (`nombre` o `pokedex_nacional`) se convierte con
+el modelo `Pokemon` antes de buscarla y de calcular la huella (ver
+`sync_key`), así que "25" y 25 identifican al mismo Pokémon.
+"""
+
+import hashlib
+import json
+from functools import lru_cache
+from typing import Any, Dict
+
+from pydantic import TypeAdapter
+
+from models import Pokemon
+
+CONTENT_HASH_FIELD = "content_hash"
+
+# Campos de origen que forman la huella (los que se pueden escribir)
+SYNC_FIELDS = tuple(
+    name
+    for name in Pokemon.model_fields
+    if name not in ("id", "created_at", "updated_at", "version")
+)
+
+
+@lru_cache(maxsize=None)
+def _key_adapter(key: str) -> TypeAdapter:
+    """
+    Validador del tipo del campo `key` del modelo `Pokemon`.
+    """
+    return TypeAdapter(Pokemon.model_fields[key].annotation)
+
+
+def sync_key(value: Any, key: str) -> Any:
+    """
+    Convierte la clave de un registro de origen al tipo del campo `key` del
+    modelo `Pokemon` (p. ej. "25" -> 25 en 'pokedex_nacional'), sin los
+    espacios de alrededor, igual que se guardará.
+
+    Args:
+        value (Any): El valor de la clave en el registro de origen.
+        key (str): El campo que identifica a los Pokémon.
+
+    Raises:
+        ValueError: Si el valor no es válido para el campo.
+
+    Returns:
+        Any: La clave convertida, o None si falta o está vacía.
+    """
+    if isinstance(value, str):
+        value = value.strip()
+    if value is None or value == "":
+        return None
+    return _key_adapter(key).validate_python(value)
+
+
+def content_hash(doc: Dict[str, Any]) -> str:
+    """
+    Huella de los datos de un Pokémon de origen.
+
+    Se calcula sobre el registro tal como llega (sin validarlo) y solo con
+    `SYNC_FIELDS`, en un JSON canónico (claves ordenadas y sin espacios), de
+    modo que no depende del orden de las claves ni de campos ajenos.
+
+    Args:
+        doc (Dict[str, Any]): El registro de origen.
+
+    Returns:
+        str: La huella BLAKE2b de 128 bits en hexadecimal.
+    """
+    content = {k: doc[k] for k in SYNC_FIELDS if k in doc}
+    data = json.dumps(
+        content, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str
+    )
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo de resultados en formato columnar (Apache Arrow).
+
+Construye tablas de `pyarrow` directamente a partir de los documentos de un
+cursor de MongoDB, columna a columna y por lotes, sin pasar por un modelo ni
+por un diccionario por fila. `st.dataframe` acepta estas tablas tal cual, de
+modo que los listados grandes se muestran sin conversiones intermedias.
+"""
+
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from models import SUMMARY_PROJECTION
+
+# Formas de representar los ataques en la tabla
+ATTACKS_TEXT = "text"  # Una cadena legible: "Placaje (Normal), Látigo Cepa (Planta)"
+ATTACKS_LIST = "list"  # Una columna de listas de structs {nombre, tipo}
+
+ATTACK_TYPE = pa.struct([("nombre", pa.string()), ("tipo", pa.string())])
+
+# Columnas escalares de la tabla (además de 'id' y, opcionalmente, 'ataques')
+SCALAR_COLUMNS = {
+    "nombre": pa.string(),
+    "region": pa.string(),
+    "pokedex_nacional": pa.int64(),
+    "tipo_primario": pa.string(),
+    "tipo_secundario": pa.string(),
+    "nivel": pa.int64(),
+}
+
+SPRITE_URL = "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/"
+
+
+def table_projection(attacks: Optional[str] = ATTACKS_TEXT) -> Dict[str, int]:
+    """
+    Proyección de MongoDB con los campos que necesita la tabla.
+
+    Args:
+        attacks (Optional[str], optional): `ATTACKS_TEXT`, `ATTACKS_LIST` o
+            None para no incluir los ataques. Defaults to `ATTACKS_TEXT`.
+
+    Returns:
+        Dict[str, int]: La proyección.
+    """
+    projection = dict(SUMMARY_PROJECTION)
+    if attacks:
+        projection["ataques"] = 1
+    return projection
+
+
+def table_schema(attacks: Optional[str] = ATTACKS_TEXT) -> pa.Schema:
+    """
+    Esquema de Arrow de las tablas de Pokémon.
+
+    Args:
+        attacks (Optional[str], optional): Representación de los ataques.
+
+    Raises:
+        ValueError: Si `attacks` no es una representación admitida.
+
+    Returns:
+        pa.Schema: El esquema.
+    """
+    fields = [("id", pa.string())] + list(SCALAR_COLUMNS.items())
+    if attacks == ATTACKS_TEXT:
+        fields.append(("ataques", pa.string()))
+    elif attacks == ATTACKS_LIST:
+        fields.append(("ataques", pa.list_(ATTACK_TYPE)))
+    elif attacks is not None:
+        raise ValueError(f"Representación de ataques no admitida: {attacks}")
+    return pa.schema(fields)
+
+
+def format_attacks(ataques: Optional[List[Any]]) -> str:
+    """
+    Formatea los ataques de un documento o modelo para su visualización.
+
+    Args:
+        ataques (Optional[List[Any]]): Ataques como diccionarios u objetos
+            con atributos `nombre` y `tipo`.
+
+    Returns:
+        str: Una cadena con los ataques formateados, o "-" si no hay ataques.
+    """
+    if not ataques:
+        return "-"
+    parts = []
+    for a in ataques:
+        if isinstance(a, dict):
+            parts.append(f"{a.get('nombre')} ({a.get('tipo')})")
+        else:
+            parts.append(f"{a.nombre} ({a.tipo})")
+    return ", ".join(parts)
+
+
+def _record_batch(
+    ids: List[str], columns: Dict[str, List[Any]], schema: pa.Schema
+) -> pa.RecordBatch:
+    """
+    Construye un `RecordBatch` a partir de listas de valores por columna.
+    """
+    arrays = [pa.array(ids, pa.string())]
+    arrays += [pa.array(columns[f.name], f.type) for f in schema if f.name != "id"]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _docs_batch(
+    batch: List[Dict[str, Any]], attacks: Optional[str], schema: pa.Schema
+) -> pa.RecordBatch:
+    """
+    Convierte un lote de documentos de MongoDB en un `RecordBatch`.
+    """
+    columns = {name: [d.get(name) for d in batch] for name in SCALAR_COLUMNS}
+    if attacks == ATTACKS_TEXT:
+        columns["ataques"] = [format_attacks(d.get("ataques")) for d in batch]
+    elif attacks == ATTACKS_LIST:
+        columns["ataques"] = [d.get("ataques") or [] for d in batch]
+    ids = [str(d["_id"]) for d in batch]
+    return _record_batch(ids, columns, schema)
+
+
+def to_arrow(
+    docs: Iterable[Dict[str, Any]],
+    attacks: Optional[str] = ATTACKS_TEXT,
+    batch_size: int = 1000,
+) -> pa.Table:
+    """
+    Construye una tabla de Arrow a partir de documentos de MongoDB.
+
+    Los documentos se consumen por lotes (p. ej. directamente de un cursor) y
+    cada lote se convierte columna a columna en un `RecordBatch`, así que
+    solo se mantienen en memoria los documentos de un lote.
+
+    Args:
+        docs (Iterable[Dict[str, Any]]): Los documentos (p. ej. un cursor con
+            la proyección de `table_projection`).
+        attacks (Optional[str], optional): Representación de los ataques.
+        batch_size (int, optional): Documentos por `RecordBatch`.
+
+    Returns:
+        pa.Table: La tabla, con el esquema de `table_schema(attacks)`.
+    """
+    schema = table_schema(attacks)
+    batches = []
+    docs = iter(docs)
+    while True:
+        batch = list(islice(docs, batch_size))
+        if not batch:
+            break
+        batches.append(_docs_batch(batch, attacks, schema))
+    return pa.Table.from_batches(batches, schema=schema)
+
+
+def from_objects(items: Iterable[Any], attacks: Optional[str] = ATTACKS_TEXT) -> pa.Table:
+    """
+    Construye una tabla de Arrow a partir de modelos o registros de Pokémon
+    ya cargados en memoria (p. ej. los de la instantánea).
+
+    Args:
+        items (Iterable[Any]): Objetos con los atributos de `Pokemon`.
+        attacks (Optional[str], optional): Representación de los ataques.
+
+    Returns:
+        pa.Table: La tabla, con el esquema de `table_schema(attacks)`.
+    """
+    schema = table_schema(attacks)
+    items = list(items)
+    columns = {name: [getattr(p, name) for p in items] for name in SCALAR_COLUMNS}
+    if attacks == ATTACKS_TEXT:
+        columns["ataques"] = [format_attacks(getattr(p, "ataques", None)) for p in items]
+    elif attacks == ATTACKS_LIST:
+        columns["ataques"] = [
+            [{"nombre": a.nombre, "tipo": a.tipo} for a in getattr(p, "ataques", None) or []]
+            for p in items
+        ]
+    ids = [str(p.id) for p in items]
+    return pa.Table.from_batches([_record_batch(ids, columns, schema)], schema=schema)
+
+
+def sprite_urls(table: pa.Table) -> pa.Array:
+    """
+    Calcula la URL del sprite de cada fila a partir de su Pokedex nacional,
+    de forma vectorizada.
+    """
+    numbers = pc.cast(table.column("pokedex_nacional"), pa.string())
+    return pc.binary_join_element_wise(SPRITE_URL, numbers, ".png", "")
+
+
+def counts_table(counts: Dict[str, int], label: str, sort: bool = True) -> pa.Table:
+    """
+    Tabla de dos columnas (`label`, "Total") a partir de un recuento.
+
+    Args:
+        counts (Dict[str, int]): Valor -> número de Pokémon.
+        label (str): Nombre de la columna de valores.
+        sort (bool, optional): Si es True, se ordena de mayor a menor
+            recuento; si no, se respeta el orden de `counts`. Defaults to True.
+
+    Returns:
+        pa.Table: La tabla.
+    """
+    table = pa.table(
+        {
+            label: pa.array(list(counts), pa.string()),
+            "Total": pa.array(list(counts.values()), pa.int64()),
+        }
+    )
+    if not sort:
+        return table
+    return table.sort_by([("Total", "descending"), (label, "ascending")])
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Fixtures compartidas de las pruebas.
+
+Las pruebas usan mongomock en lugar de un servidor de MongoDB y un reloj
+controlable en lugar de la hora real, para que las marcas de tiempo del
+registro de cambios sean deterministas.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import mongomock
+import pytest
+from mongomock.collection import BulkOperationBuilder
+
+# Los módulos de la aplicación se importan desde python/, como en las páginas
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache import QueryCache  # noqa: E402
+from controller import PokemonController  # noqa: E402
+
+# PyMongo 4.x pasa a las actualizaciones de `bulk_write` un argumento `sort`
+# que mongomock todavía no acepta
+_add_update = BulkOperationBuilder.add_update
+
+
+def _add_update_without_sort(self, *args, sort=None, **kwargs):
+    return _add_update(self, *args, **kwargs)
+
+
+BulkOperationBuilder.add_update = _add_update_without_sort
+
+
+class Clock:
+    """
+    Reloj de prueba: devuelve siempre la misma hora hasta que se adelanta.
+    """
+
+    def __init__(self, now: datetime = datetime(2026, 1, 1)):
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += timedelta(seconds=seconds)
+
+
+@pytest.fixture
+def clock() -> Clock:
+    return Clock()
+
+
+@pytest.fixture
+def collection():
+    return mongomock.MongoClient()["pokedex_test"]["pokemons"]
+
+
+@pytest.fixture
+def controller(collection, clock) -> PokemonController:
+    ctrl = PokemonController(collection, cache=QueryCache())
+    ctrl._now = clock
+    return ctrl
+
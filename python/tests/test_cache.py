@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la caché de consultas y de su invalidación en las escrituras.
+"""
+
+from cache import QueryCache, make_key
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_keys_ignore_dictionary_order():
+    assert make_key({"a": 1, "b": 2}) == make_key({"b": 2, "a": 1})
+
+
+def test_invalidating_a_tag_drops_only_its_entries():
+    cache = QueryCache()
+    cache.set("a", 1, tags=["x"])
+    cache.set("b", 2, tags=["x", "y"])
+    cache.set("c", 3, tags=["y"])
+
+    assert cache.invalidate("x") == 2
+
+    assert cache.get("a") is None and cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_entries_expire_and_lru_is_evicted():
+    clock = FakeTime()
+    cache = QueryCache(max_entries=2, ttl=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)  # desaloja "b", la menos usada
+    assert cache.get("b") is None and cache.get("a") == 1
+
+    clock.now = 11
+    assert cache.get("a") is None
+
+
+def test_loads_overlapping_an_invalidation_are_not_stored():
+    cache = QueryCache()
+
+    def loader():
+        cache.invalidate("x")
+        return "viejo"
+
+    assert cache.get_or_load("k", loader, tags=["x"]) == "viejo"
+    assert cache.get("k") is None
+
+
+def test_reads_are_cached_until_a_write(controller, collection):
+    created = controller.insert({"nombre": "Pikachu", "nivel": 5})
+    assert controller.find_by_id(str(created.id)).nivel == 5
+    first_page = controller.find_page(page_size=10)
+
+    # Una escritura por fuera del controlador no se ve: se sirve la caché
+    collection.update_one({"_id": created.id}, {"$set": {"nivel": 6}})
+    assert controller.find_by_id(str(created.id)).nivel == 5
+    assert controller.find_page(page_size=10) is first_page
+
+    # Una escritura del controlador invalida el documento y las listas
+    controller.update(str(created.id), {"nivel": 7})
+    assert controller.find_by_id(str(created.id)).nivel == 7
+    assert controller.find_page(page_size=10).items[0].nivel == 7
+
+
+def test_bulk_writes_invalidate_every_list(controller):
+    controller.insert({"nombre": "Pikachu"})
+    assert controller.count() == 1
+    controller.bulk_insert([{"nombre": "Raichu"}, {"nombre": "Pichu"}])
+    assert controller.count() == 3
+
+
+def test_uncached_pages_skip_the_cache(controller):
+    controller.insert({"nombre": "Pikachu"})
+    controller.find_page(page_size=10, cached=False)
+    assert controller.cache.stats()["entries"] == 0
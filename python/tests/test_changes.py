@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas del registro de cambios (`changes_since`) y de las lápidas.
+"""
+
+from datetime import timedelta
+
+import pytest
+
+from changes import CHANGES_SETTLE_SECONDS, TOMBSTONE_TTL_DAYS, StaleWatermarkError
+from controller import changes_token
+
+SETTLE = CHANGES_SETTLE_SECONDS + 1
+
+
+def _drain(controller, token=None, limit=1000):
+    """
+    Lee páginas hasta agotar los cambios; devuelve los nombres escritos, los
+    `_id` borrados y la última marca.
+    """
+    names, deleted = [], []
+    while True:
+        page = controller.changes_since(token, limit=limit)
+        names += [p.nombre for p in page.items]
+        deleted += [d["_id"] for d in page.deleted]
+        token = page.next_token
+        if not page.has_more:
+            return names, deleted, token
+
+
+def test_recent_writes_wait_for_the_settle_window(controller, clock):
+    controller.insert({"nombre": "Pikachu"})
+    assert _drain(controller)[0] == []
+    clock.advance(SETTLE)
+    assert _drain(controller)[0] == ["Pikachu"]
+
+
+def test_changes_resume_from_the_watermark(controller, clock):
+    a = controller.insert({"nombre": "A"})
+    controller.insert({"nombre": "B"})
+    clock.advance(SETTLE)
+    names, _, token = _drain(controller)
+    assert names == ["A", "B"]
+
+    controller.update(str(a.id), {"nivel": 9})
+    c = controller.insert({"nombre": "C"})
+    controller.delete(str(c.id))
+    clock.advance(SETTLE)
+    names, deleted, token = _drain(controller, token)
+    assert names == ["A"]
+    assert deleted == [c.id]
+
+    # Sin escrituras nuevas la marca no devuelve nada más
+    assert _drain(controller, token)[:2] == ([], [])
+
+
+@pytest.mark.parametrize("limit", [1, 2, 5])
+def test_small_pages_return_every_change_once(controller, clock, limit):
+    ids = [controller.insert({"nombre": f"P{i}"}).id for i in range(6)]
+    clock.advance(1)
+    controller.delete_many({"_id": {"$in": ids[:2]}})
+    controller.bulk_delete([str(ids[2]), "no-es-un-id"])
+    clock.advance(SETTLE)
+
+    names, deleted, _ = _drain(controller, limit=limit)
+
+    assert sorted(deleted) == sorted(ids[:3])
+    assert names == ["P3", "P4", "P5"]
+
+
+def test_single_and_bulk_writes_share_the_clock(controller, clock, collection):
+    controller.insert({"nombre": "A"})
+    controller.bulk_insert([{"nombre": "B"}])
+    clock.advance(SETTLE)
+    names, _, token = _drain(controller)
+    assert sorted(names) == ["A", "B"]
+
+    # Escrituras alternas después de la marca: todas llegan una sola vez
+    controller.bulk_upsert([{"nombre": "A", "nivel": 5}])
+    clock.advance(1)
+    controller.insert({"nombre": "C"})
+    clock.advance(1)
+    controller.sync([{"nombre": "D"}])
+    clock.advance(1)
+    b = collection.find_one({"nombre": "B"})
+    controller.update(str(b["_id"]), {"nivel": 7})
+    clock.advance(1)
+    controller.bulk_insert([{"nombre": "E"}])
+
+    # Antes de asentarse no se entrega ninguna, ni siquiera las masivas
+    assert _drain(controller, token)[0] == []
+    clock.advance(SETTLE)
+    names, _, token = _drain(controller, token)
+    assert names == ["A", "C", "D", "B", "E"]
+    assert _drain(controller, token)[:2] == ([], [])
+
+
+def test_tombstones_use_the_controller_clock(controller, clock, collection):
+    created = controller.insert({"nombre": "Pikachu"})
+    clock.advance(60)
+    controller.delete(str(created.id))
+    tombstone = collection.database["pokemon_tombstones"].find_one({"_id": created.id})
+    assert tombstone["deleted_at"] == clock.now
+
+
+def test_failed_deletes_leave_no_tombstone(controller, collection):
+    controller.bulk_delete(["no-es-un-id"])
+    assert collection.database["pokemon_tombstones"].count_documents({}) == 0
+
+
+def test_stale_watermark_is_rejected(controller, clock):
+    token = changes_token(clock.now - timedelta(days=TOMBSTONE_TTL_DAYS + 1))
+    with pytest.raises(StaleWatermarkError):
+        controller.changes_since(token)
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de `diff_update` y de las actualizaciones parciales con control de
+versión.
+"""
+
+import pytest
+
+from controller import VersionConflictError, diff_update
+from models import Pokemon
+
+RAYO = {"nombre": "Rayo", "tipo": "Eléctrico"}
+PLACAJE = {"nombre": "Placaje", "tipo": "Normal"}
+SURF = {"nombre": "Surf", "tipo": "Agua"}
+
+
+def _original(ataques):
+    return Pokemon(nombre="Pikachu", nivel=10, ataques=ataques)
+
+
+def test_unchanged_fields_produce_no_update():
+    original = _original([RAYO])
+    assert diff_update(original, {"nombre": "Pikachu", "nivel": 10, "ataques": [RAYO]}) == {}
+
+
+def test_only_changed_fields_are_set():
+    update = diff_update(_original([RAYO]), {"nombre": "Pikachu", "nivel": 12})
+    assert update == {"$set": {"nivel": 12}}
+
+
+def test_renaming_updates_the_normalized_name():
+    update = diff_update(_original([]), {"nombre": "Raichú"})
+    assert update["$set"] == {"nombre": "Raichú", "nombre_norm": "raichu"}
+
+
+def test_appended_attacks_are_pushed():
+    update = diff_update(_original([RAYO]), {"ataques": [RAYO, PLACAJE, SURF]})
+    assert update == {"$push": {"ataques": {"$each": [PLACAJE, SURF]}}}
+
+
+def test_removed_attacks_are_pulled():
+    update = diff_update(_original([RAYO, PLACAJE, SURF]), {"ataques": [RAYO, SURF]})
+    assert update == {"$pull": {"ataques": {"$in": [PLACAJE]}}}
+
+
+@pytest.mark.parametrize(
+    "old, new",
+    [
+        ([RAYO, PLACAJE], [PLACAJE, RAYO]),  # reordenar
+        ([RAYO, PLACAJE], [RAYO, SURF]),  # quitar y añadir a la vez
+        ([RAYO, PLACAJE], [SURF, RAYO, PLACAJE]),  # añadir al principio
+    ],
+)
+def test_other_attack_changes_rewrite_the_list(old, new):
+    update = diff_update(_original(old), {"ataques": new})
+    assert update == {"$set": {"ataques": new}}
+
+
+def test_removing_every_attack_is_a_pull():
+    update = diff_update(_original([RAYO]), {"ataques": []})
+    assert update == {"$pull": {"ataques": {"$in": [RAYO]}}}
+
+
+def test_update_applies_the_diff_and_bumps_the_version(controller, collection):
+    created = controller.insert({"nombre": "Pikachu", "ataques": [RAYO]})
+    updated = controller.update(
+        str(created.id), {"nivel": 20, "ataques": [RAYO, SURF]}, original=created
+    )
+    stored = collection.find_one({"_id": created.id})
+    assert updated.version == stored["version"] == 1
+    assert stored["nivel"] == 20
+    assert stored["ataques"] == [RAYO, SURF]
+
+
+def test_update_from_a_stale_original_is_rejected(controller):
+    created = controller.insert({"nombre": "Pikachu"})
+    controller.update(str(created.id), {"nivel": 20}, original=created)
+    with pytest.raises(VersionConflictError):
+        controller.update(str(created.id), {"nivel": 30}, original=created)
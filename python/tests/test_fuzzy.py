@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas del índice de trigramas de la búsqueda aproximada.
+"""
+
+import pytest
+
+from fuzzy import FuzzyIndex, edit_distance, max_typos
+
+NAMES = ["Pikachu", "Raichu", "Pichu", "Charmander", "Charmeleon", "Charizard", "Bulbasaur"]
+
+
+@pytest.fixture
+def index():
+    index = FuzzyIndex()
+    for name in NAMES:
+        index.add(name)
+    return index
+
+
+@pytest.mark.parametrize(
+    "a, b, expected",
+    [("", "abc", 3), ("abc", "abc", 0), ("kitten", "sitting", 3), ("pikachu", "pikahcu", 2)],
+)
+def test_edit_distance(a, b, expected):
+    assert edit_distance(a, b) == expected == edit_distance(b, a)
+
+
+def test_typos_find_the_closest_name_first(index):
+    matches = index.search("Pikahcu")
+    assert matches[0].text == "Pikachu"
+    assert matches[0].distance <= max_typos("Pikahcu")
+
+
+def test_accents_and_case_are_ignored(index):
+    assert index.search("CHÁRIZARD")[0].distance == 0
+
+
+def test_max_distance_filters_results(index):
+    assert [m.text for m in index.search("Charmander", max_distance=0)] == ["Charmander"]
+
+
+def test_removed_terms_are_not_returned_until_added_again(index):
+    index.remove("Raichu")
+    assert "Raichu" not in [m.text for m in index.search("Raichu")]
+    index.add("Raichu")
+    assert index.search("Raichu")[0].text == "Raichu"
+
+
+def test_counts_track_documents(index):
+    index.add("Pikachu", 2)
+    index.remove("Pikachu")
+    assert index.search("Pikachu")[0].count == 2
+    assert len(index) == len(NAMES)
+
+
+def test_unrelated_text_finds_nothing(index):
+    assert index.search("xyzzy") == []
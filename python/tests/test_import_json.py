@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas del lector en streaming y de la importación masiva.
+"""
+
+import io
+import json
+
+import pytest
+
+from import_json import _iter_json_array, bulk_import, iter_documents
+
+DOCS = [
+    {"nombre": "Pikachu", "pokedex_nacional": 25, "nivel": -3},
+    {"nombre": "Ñandú \"raro\"", "pokedex_nacional": 1e3, "ataques": []},
+    {"nombre": "Mew", "pokedex_nacional": 151, "region": None},
+]
+
+
+class Hook:
+    def __init__(self):
+        self.bulk_writes = 0
+
+    def on_bulk_write(self):
+        self.bulk_writes += 1
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 1 << 16])
+def test_array_elements_survive_any_chunk_boundary(chunk_size):
+    text = " [\n" + ",\n".join(json.dumps(d, ensure_ascii=False) for d in DOCS) + "\n] "
+    assert list(_iter_json_array(io.StringIO(text), chunk_size)) == DOCS
+
+
+def test_numbers_split_across_chunks_are_not_truncated():
+    assert list(_iter_json_array(io.StringIO("[123456, -7.5e10]"), 3)) == [123456, -7.5e10]
+
+
+def test_empty_array():
+    assert list(_iter_json_array(io.StringIO("[ ]"), 1)) == []
+
+
+@pytest.mark.parametrize("text", ["[1,,2]", "[1 2]", "[1, 2", "{}", "[1, tru]"])
+def test_malformed_arrays_are_rejected(text):
+    with pytest.raises(ValueError):
+        list(_iter_json_array(io.StringIO(text), 2))
+
+
+def test_syntax_errors_stop_before_the_end_of_the_file():
+    class Source(io.StringIO):
+        reads = 0
+
+        def read(self, size=-1):
+            Source.reads += 1
+            return super().read(size)
+
+    text = "[" + "1," * 10 + "{bad}" + ",1" * 100000 + "]"
+    with pytest.raises(ValueError):
+        list(_iter_json_array(Source(text), 64))
+    assert Source.reads < 10
+
+
+def test_json_lines_are_detected(tmp_path):
+    path = tmp_path / "docs.jsonl"
+    path.write_text("\n".join(json.dumps(d) for d in DOCS) + "\n\n", encoding="utf-8")
+    assert list(iter_documents(str(path))) == DOCS
+
+
+def test_bulk_import_counts_invalid_documents_and_notifies_hooks(collection):
+    hook = Hook()
+    stats = bulk_import(
+        collection, DOCS + [{"region": "sin nombre"}, "no es un objeto"],
+        batch_size=2, workers=2, progress=None, hooks=[hook],
+    )
+    assert (stats.read, stats.inserted, stats.invalid) == (5, 3, 2)
+    assert collection.count_documents({"nombre_norm": "pikachu"}) == 1
+    assert hook.bulk_writes == 1
+
+
+def test_aborted_import_still_notifies_hooks(collection):
+    hook = Hook()
+    text = "[" + ",".join(json.dumps({"nombre": f"P{i}"}) for i in range(50)) + ", {bad} ]"
+    with pytest.raises(ValueError):
+        bulk_import(
+            collection, _iter_json_array(io.StringIO(text), 128),
+            batch_size=10, workers=2, progress=None, hooks=[hook],
+        )
+    assert collection.count_documents({}) == 50
+    assert hook.bulk_writes == 1
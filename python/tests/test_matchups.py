@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas del motor de enfrentamientos.
+"""
+
+import numpy as np
+import pytest
+from bson import ObjectId
+
+from matchups import CHART, NO_TYPE, MatchupEngine, Roster, type_code
+
+
+def _doc(nombre, t1, t2=None, ataques=(), nivel=10):
+    return {
+        "_id": ObjectId(),
+        "nombre": nombre,
+        "tipo_primario": t1,
+        "tipo_secundario": t2,
+        "nivel": nivel,
+        "ataques": [{"nombre": f"{nombre}-{t}", "tipo": t} for t in ataques],
+    }
+
+
+@pytest.fixture
+def docs():
+    return [
+        _doc("Charmander", "Fuego"),
+        _doc("Squirtle", "Agua"),
+        _doc("Bulbasaur", "Planta", "Veneno"),
+        _doc("Geodude", "Roca", "Tierra", ataques=["Roca"]),
+        _doc("Pikachu", "Eléctrico", ataques=["Eléctrico", "Normal"]),
+    ]
+
+
+@pytest.fixture
+def engine(docs):
+    return MatchupEngine(None, Roster.from_documents(docs))
+
+
+def test_type_codes_are_normalized():
+    assert type_code("fuego") == type_code("Fuego ") == type_code("Fuego")
+    assert type_code("Electrico") == type_code("Eléctrico")
+    assert type_code("Desconocido") == type_code(None) == NO_TYPE
+
+
+def test_chart_multipliers():
+    assert CHART[type_code("Agua"), type_code("Fuego")] == 2.0
+    assert CHART[type_code("Eléctrico"), type_code("Tierra")] == 0.0
+    assert CHART[NO_TYPE].tolist() == [1.0] * (NO_TYPE + 1)
+
+
+def test_counters_rank_the_best_matchup_first(engine, docs):
+    table = engine.counters(str(docs[0]["_id"]))  # contra Charmander
+    assert table.column("nombre")[0].as_py() in ("Squirtle", "Geodude")
+    assert "Charmander" not in table.column("nombre").to_pylist()
+
+
+def test_counters_of_unknown_or_deleted_pokemon(engine, docs):
+    assert engine.counters(str(ObjectId())) is None
+    engine.on_write(docs[0], None)
+    assert engine.counters(str(docs[0]["_id"])) is None
+
+
+def test_pokemon_without_known_types_attack_with_nothing(docs):
+    docs.append(_doc("Misterio", "??", ataques=["raro"]))
+    roster = Roster.from_documents(docs)
+    taken = roster.best_attack_from(len(docs) - 1)
+    assert taken.shape == (len(docs),)
+    assert not taken.any()
+    assert MatchupEngine(None, roster).counters(str(docs[-1]["_id"])) is not None
+
+
+def test_inserts_are_appended_without_reloading(engine, docs):
+    roster = engine.roster()
+    new = [_doc(f"Nuevo{i}", "Agua", ataques=["Agua"]) for i in range(40)]
+    for doc in new:
+        engine.on_write(None, doc)
+
+    assert engine.roster() is roster
+    assert len(roster) == len(docs) + len(new)
+    fresh = MatchupEngine(None, Roster.from_documents(docs + new))
+    for doc in docs + new:
+        assert engine.counters(str(doc["_id"])).equals(fresh.counters(str(doc["_id"])))
+
+
+def test_updates_change_the_ranking(engine, docs):
+    squirtle = docs[1]
+    engine.on_write(squirtle, dict(squirtle, tipo_primario="Planta"))
+    table = engine.counters(str(docs[0]["_id"]))
+    assert "Squirtle" not in table.column("nombre").to_pylist()[:1]
+
+
+def test_coverage_of_a_team(engine, docs):
+    coverage = engine.coverage([str(docs[4]["_id"])])  # Pikachu
+    assert coverage.total == len(docs) - 1
+    assert coverage.super_effective == pytest.approx(1 / 4)  # Squirtle
+    assert coverage.immune == 0
+    assert np.isclose(
+        coverage.super_effective + coverage.neutral + coverage.resisted + coverage.immune, 1.0
+    )
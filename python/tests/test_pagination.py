@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de los tokens de paginación por cursor y de `find_page`.
+"""
+
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from controller import InvalidPageError, decode_cursor, encode_cursor
+
+
+@pytest.mark.parametrize("value", [25, "Pikachu", None, datetime(2026, 1, 2, 3, 4, 5)])
+def test_cursor_round_trip(value):
+    oid = ObjectId()
+    token = encode_cursor("nivel", value, oid)
+    assert decode_cursor(token, "nivel") == (value, oid)
+
+
+def test_cursor_of_another_sort_is_rejected():
+    token = encode_cursor("nombre", "Pikachu", ObjectId())
+    with pytest.raises(InvalidPageError):
+        decode_cursor(token, "nivel")
+
+
+@pytest.mark.parametrize("token", ["", "zzz", "e30", "!!!"])
+def test_malformed_cursor_is_rejected(token):
+    with pytest.raises(InvalidPageError):
+        decode_cursor(token, "nivel")
+
+
+def test_unknown_sort_is_rejected(controller):
+    with pytest.raises(InvalidPageError):
+        controller.find_page(sort_by="region")
+
+
+def _walk(controller, sort_by, page_size):
+    """
+    Recorre todas las páginas hacia delante y luego hacia atrás.
+    """
+    forward, pages, token = [], [], None
+    while True:
+        page = controller.find_page(sort_by=sort_by, page_size=page_size, after=token)
+        pages.append(page)
+        forward += [p.nombre for p in page.items]
+        token = page.next_token
+        if not token:
+            break
+    backward = []
+    token = pages[-1].prev_token
+    while token:
+        page = controller.find_page(sort_by=sort_by, page_size=page_size, before=token)
+        backward = [p.nombre for p in page.items] + backward
+        token = page.prev_token
+    return forward, backward, pages
+
+
+@pytest.mark.parametrize("page_size", [1, 3, 4, 20])
+def test_pages_follow_sort_order_with_ties_and_nulls(controller, collection, page_size):
+    # Niveles repetidos y ausentes: el `_id` desempata y los nulos van primero
+    niveles = [5, None, 5, 3, None, 7, 5, 3, 10, None]
+    for i, nivel in enumerate(niveles):
+        controller.insert({"nombre": f"P{i}", "nivel": nivel})
+    expected = [
+        d["nombre"] for d in collection.find().sort([("nivel", 1), ("_id", 1)])
+    ]
+
+    forward, backward, pages = _walk(controller, "nivel", page_size)
+
+    assert forward == expected
+    assert backward == expected[: len(expected) - len(pages[-1].items)]
+    assert pages[0].prev_token is None
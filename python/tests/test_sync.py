@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la sincronización incremental (`PokemonController.sync`).
+"""
+
+import pytest
+
+from controller import PokemonController
+
+SOURCE = [
+    {"nombre": "Bulbasaur", "pokedex_nacional": 1, "tipo_primario": "Planta"},
+    {"nombre": "Charmander", "pokedex_nacional": 4, "tipo_primario": "Fuego"},
+    {"nombre": "Squirtle", "pokedex_nacional": 7, "tipo_primario": "Agua"},
+    {"nombre": "Pikachu", "pokedex_nacional": 25, "tipo_primario": "Eléctrico"},
+]
+
+
+class Hook:
+    def __init__(self):
+        self.bulk_writes = 0
+
+    def on_write(self, before, after):
+        pass
+
+    def on_bulk_write(self):
+        self.bulk_writes += 1
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 1000])
+def test_first_sync_inserts_and_second_writes_nothing(controller, collection, batch_size):
+    first = controller.sync(SOURCE, batch_size=batch_size)
+    assert (first.inserted, first.unchanged, first.failed) == (4, 0, 0)
+
+    second = controller.sync(SOURCE, batch_size=batch_size)
+    assert (second.inserted, second.updated, second.unchanged) == (0, 0, 4)
+    assert collection.count_documents({}) == 4
+
+
+def test_changed_records_are_updated(controller, collection):
+    controller.sync(SOURCE)
+    changed = [dict(SOURCE[0], nivel=5)] + SOURCE[1:]
+
+    result = controller.sync(changed)
+
+    assert (result.updated, result.unchanged) == (1, 3)
+    assert collection.find_one({"nombre": "Bulbasaur"})["nivel"] == 5
+
+
+def test_missing_records_are_deleted_only_when_asked(controller, collection):
+    controller.sync(SOURCE)
+
+    kept = controller.sync(SOURCE[:2])
+    assert kept.deleted == 0 and collection.count_documents({}) == 4
+
+    pruned = controller.sync(SOURCE[:2], delete_missing=True)
+    assert (pruned.deleted, pruned.unchanged) == (2, 2)
+    assert sorted(d["nombre"] for d in collection.find()) == ["Bulbasaur", "Charmander"]
+
+
+def test_sync_notifies_hooks_once(collection, clock):
+    hook = Hook()
+    controller = PokemonController(collection, hooks=[hook])
+    controller._now = clock
+    controller.sync(SOURCE, batch_size=1)
+    assert hook.bulk_writes == 1
+    controller.sync(SOURCE, batch_size=1)
+    assert hook.bulk_writes == 1  # sin cambios no se avisa
+
+
+def test_keys_are_coerced_through_the_model(controller):
+    controller.sync(SOURCE, key="pokedex_nacional")
+    as_text = [dict(d, pokedex_nacional=str(d["pokedex_nacional"])) for d in SOURCE]
+
+    result = controller.sync(as_text, key="pokedex_nacional", delete_missing=True)
+
+    assert (result.unchanged, result.deleted, result.inserted) == (4, 0, 0)
+
+
+def test_duplicate_and_invalid_keys_are_failed(controller):
+    result = controller.sync(
+        SOURCE + [SOURCE[0], {"nombre": "Raro", "pokedex_nacional": "abc"}],
+        key="pokedex_nacional",
+    )
+    assert (result.inserted, result.failed) == (4, 2)
+    assert any("repetida" in e for e in result.errors)
+    assert any("inválida" in e for e in result.errors)
+
+
+def test_unknown_key_is_rejected(controller):
+    with pytest.raises(ValueError):
+        controller.sync(SOURCE, key="region")